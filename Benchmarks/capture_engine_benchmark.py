@@ -0,0 +1,113 @@
+# File: Benchmarks/capture_engine_benchmark.py
+#
+# Compare the pandas and DuckDB capture engines (Utils.capture_engine).
+#
+# For each scale a synthetic TM / Originals / Changed Data dataset is
+# written once. Each engine then runs run_originals_capture and
+# run_changed_data_capture against its own copy of the Originals and
+# Changed Data files, and the script reports wall time per job and checks
+# that both engines wrote byte-identical files.
+#
+# Usage:
+#   python Benchmarks/capture_engine_benchmark.py
+#   python Benchmarks/capture_engine_benchmark.py --scales 1000000 5000000 --days-back 60
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Ensure project root is on PYTHONPATH
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from Utils.capture_engine import CAPTURE_ENGINES
+from Utils.changed_data_csv import run_changed_data_capture
+from Utils.date_parsing import clear_date_cache
+from Utils.originals_capture_csv import run_originals_capture
+from Utils.pretty_print import step_header, sub
+from Utils.synthetic_data import write_synthetic_dataset
+
+DEFAULT_SCALES = [200_000, 1_000_000]
+
+
+def _timed(func, verbose, **kwargs):
+    sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    # Each engine starts with a cold date cache
+    clear_date_cache()
+    start = time.perf_counter()
+    with sink:
+        result = func(**kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_engine(engine, paths, work_dir, args):
+    """Run both capture jobs with `engine` on private copies; return timings and file bytes."""
+    originals = os.path.join(work_dir, f"originals_{engine}.csv")
+    changed = os.path.join(work_dir, f"changed_{engine}.csv")
+    shutil.copy(paths["originals"], originals)
+    shutil.copy(paths["changed"], changed)
+
+    # Changed Data first, against the Originals it was generated with
+    changed_rows, changed_seconds = _timed(
+        run_changed_data_capture,
+        args.verbose,
+        transaction_master_csv=paths["transaction_master"],
+        originals_csv=originals,
+        changed_csv=changed,
+        engine=engine,
+    )
+    originals_rows, originals_seconds = _timed(
+        run_originals_capture,
+        args.verbose,
+        transaction_master_csv=paths["transaction_master"],
+        originals_csv=originals,
+        days_back=args.days_back,
+        engine=engine,
+    )
+
+    with open(originals, "rb") as f_orig, open(changed, "rb") as f_changed:
+        outputs = (f_orig.read(), f_changed.read())
+    return {
+        "originals_capture": (originals_rows, originals_seconds),
+        "changed_data_capture": (changed_rows, changed_seconds),
+    }, outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pandas and DuckDB capture engines.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--churn-rate", type=float, default=0.02)
+    parser.add_argument("--days-back", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Show job output.")
+    args = parser.parse_args(argv)
+
+    for n_rows in args.scales:
+        step_header(f"BENCHMARK: capture engines, {n_rows:,} Transaction Master rows")
+        work_dir = tempfile.mkdtemp(prefix=f"capture_engine_bench_{n_rows}_")
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                paths = write_synthetic_dataset(
+                    os.path.join(work_dir, "data"), n_rows, seed=args.seed, churn_rate=args.churn_rate
+                )
+
+            outputs = {}
+            for engine in CAPTURE_ENGINES:
+                timings, outputs[engine] = run_engine(engine, paths, work_dir, args)
+                for job, (rows, seconds) in timings.items():
+                    sub(f"{job:<22} {engine:<7} rows written: {rows:>9,} | {seconds:8.2f}s")
+
+            identical = len(set(outputs.values())) == 1
+            sub(f"Output files identical across engines: {identical}")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
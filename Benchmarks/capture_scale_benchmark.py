@@ -0,0 +1,175 @@
+# File: Benchmarks/capture_scale_benchmark.py
+#
+# Scale benchmark for the CSV-based capture jobs.
+#
+# For each requested scale (Transaction Master row count) this script:
+#   1. Generates a synthetic TM / Originals / Changed Data dataset
+#   2. Runs run_originals_capture and run_changed_data_capture on it
+#   3. Records wall time and peak traced memory for each job
+#
+# Usage:
+#   python Benchmarks/capture_scale_benchmark.py
+#   python Benchmarks/capture_scale_benchmark.py --scales 100000 1000000 5000000 --churn-rate 0.05
+#
+# Results are printed and appended to Benchmarks/results/capture_scale.csv
+# so degradation can be tracked as history grows.
+
+import argparse
+import contextlib
+import csv
+import io
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+# Ensure project root is on PYTHONPATH
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from Utils.changed_data_csv import run_changed_data_capture
+from Utils.originals_capture_csv import run_originals_capture
+from Utils.pretty_print import step_header, sub
+from Utils.synthetic_data import write_synthetic_dataset
+
+DEFAULT_SCALES = [100_000, 1_000_000, 5_000_000]
+RESULTS_CSV = os.path.join(ROOT, "Benchmarks", "results", "capture_scale.csv")
+
+
+def _traced_call(func, args, kwargs, verbose):
+    """Child-process body for measure(): run `func` under tracemalloc."""
+    sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with sink:
+        result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # pandas string columns may live in Arrow buffers, which tracemalloc
+    # does not see. The child process starts with a fresh Arrow pool, so its
+    # high-water mark belongs to this job alone.
+    try:
+        import pyarrow
+
+        peak += pyarrow.default_memory_pool().max_memory() or 0
+    except ImportError:
+        pass
+
+    return result, elapsed, peak / (1024 * 1024)
+
+
+def measure(func, *args, verbose=False, **kwargs):
+    """
+    Run `func` in a fresh process and return (result, elapsed_seconds, peak_mb).
+
+    Peak memory is measured with tracemalloc (plus the Arrow memory pool when
+    pyarrow is installed), which works the same on Windows and Linux. Using a
+    fresh process per job keeps one job's allocations out of the next one's peak.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(_traced_call, (func, args, kwargs, verbose))
+
+
+def run_scale(n_rows, args):
+    """Generate a dataset of `n_rows` TM rows and benchmark both capture jobs."""
+    work_dir = tempfile.mkdtemp(prefix=f"capture_bench_{n_rows}_", dir=args.workdir)
+    try:
+        gen_start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            paths = write_synthetic_dataset(
+                work_dir,
+                n_rows,
+                seed=args.seed,
+                churn_rate=args.churn_rate,
+                duplicate_rate=args.duplicate_rate,
+                leading_zero_rate=args.leading_zero_rate,
+                terminal_rate=args.terminal_rate,
+            )
+        sub(f"Generated {n_rows:,} row dataset in {time.perf_counter() - gen_start:.1f}s")
+
+        results = []
+
+        written, elapsed, peak = measure(
+            run_originals_capture,
+            transaction_master_csv=paths["transaction_master"],
+            originals_csv=paths["originals"],
+            days_back=args.days_back,
+            verbose=args.verbose,
+        )
+        results.append(("originals_capture", n_rows, written, elapsed, peak))
+
+        written, elapsed, peak = measure(
+            run_changed_data_capture,
+            transaction_master_csv=paths["transaction_master"],
+            originals_csv=paths["originals"],
+            changed_csv=paths["changed"],
+            verbose=args.verbose,
+        )
+        results.append(("changed_data_capture", n_rows, written, elapsed, peak))
+
+        return results
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def save_results(rows, args):
+    """Append benchmark rows to the results CSV (header written once)."""
+    os.makedirs(os.path.dirname(args.results), exist_ok=True)
+    file_exists = os.path.exists(args.results)
+    run_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    with open(args.results, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(
+                ["RUN_AT", "JOB", "TM_ROWS", "ROWS_WRITTEN", "SECONDS", "PEAK_MB", "CHURN_RATE"]
+            )
+        for job, n_rows, written, elapsed, peak in rows:
+            writer.writerow(
+                [run_at, job, n_rows, written, f"{elapsed:.3f}", f"{peak:.1f}", args.churn_rate]
+            )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark capture jobs at increasing scale.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--churn-rate", type=float, default=0.02)
+    parser.add_argument("--duplicate-rate", type=float, default=0.001)
+    parser.add_argument("--leading-zero-rate", type=float, default=0.5)
+    parser.add_argument("--terminal-rate", type=float, default=0.85)
+    parser.add_argument("--days-back", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="Folder for generated datasets (default: system temp).")
+    parser.add_argument("--results", default=RESULTS_CSV)
+    parser.add_argument("--keep", action="store_true", help="Keep generated datasets.")
+    parser.add_argument("--verbose", action="store_true", help="Show job output.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    all_rows = []
+
+    for n_rows in args.scales:
+        step_header(f"BENCHMARK: {n_rows:,} Transaction Master rows")
+        rows = run_scale(n_rows, args)
+        for job, _, written, elapsed, peak in rows:
+            sub(f"{job:<22} rows written: {written:>9,} | {elapsed:8.2f}s | peak {peak:9.1f} MB")
+        all_rows.extend(rows)
+
+    save_results(all_rows, args)
+    print(f"\nResults appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
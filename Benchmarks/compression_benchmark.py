@@ -0,0 +1,91 @@
+# File: Benchmarks/compression_benchmark.py
+#
+# Compare export codecs for the large CSV outputs.
+#
+# A synthetic Transaction Master is streamed through export_to_csv in the
+# same 10,000-row batches the SQL export jobs use, once per codec. For each
+# codec the script reports write time, read time (pd.read_csv dtype=str,
+# as the capture jobs read it) and file size.
+#
+# Usage:
+#   python Benchmarks/compression_benchmark.py
+#   python Benchmarks/compression_benchmark.py --rows 1000000 --codecs none gzip zstd
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Ensure project root is on PYTHONPATH
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pandas as pd
+
+from Utils import export
+from Utils.export import compressed_filename, export_to_csv, resolve_compression
+from Utils.pretty_print import step_header, sub
+from Utils.synthetic_data import generate_transaction_master
+
+BATCH_SIZE = 10_000
+
+
+def benchmark_codec(tm, codec, work_dir):
+    """Write `tm` in batches with `codec`, read it back, return the timings."""
+    compression = resolve_compression(codec)
+    filename = compressed_filename("transaction_master.csv", compression)
+    columns = list(tm.columns)
+    batches = [
+        list(tm.iloc[start:start + BATCH_SIZE].itertuples(index=False, name=None))
+        for start in range(0, len(tm), BATCH_SIZE)
+    ]
+
+    export.EXPORT_DIR = work_dir
+    start = time.perf_counter()
+    for i, rows in enumerate(batches):
+        path = export_to_csv(columns, rows, filename=filename, append=i > 0, compression=compression)
+    write_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df = pd.read_csv(path, dtype=str, low_memory=False)
+    read_seconds = time.perf_counter() - start
+
+    assert len(df) == len(tm), f"{codec}: read back {len(df)} of {len(tm)} rows"
+    return compression or "none", write_seconds, read_seconds, os.path.getsize(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark export compression codecs.")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--codecs", nargs="+", default=["none", "gzip", "zstd"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    step_header(f"BENCHMARK: export compression ({args.rows:,} rows)")
+    tm = generate_transaction_master(args.rows, seed=args.seed)
+
+    work_dir = tempfile.mkdtemp(prefix="compression_bench_")
+    try:
+        results = []
+        for codec in args.codecs:
+            with contextlib.redirect_stdout(io.StringIO()):
+                results.append(benchmark_codec(tm, codec, work_dir))
+
+        baseline = next((r[3] for r in results if r[0] == "none"), None)
+        for name, write_s, read_s, size in results:
+            ratio = f" | {baseline / size:5.1f}x smaller" if baseline else ""
+            sub(
+                f"{name:<5} write {write_s:7.2f}s | read {read_s:7.2f}s | "
+                f"{size / (1024 * 1024):8.1f} MB{ratio}"
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
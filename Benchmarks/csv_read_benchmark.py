@@ -0,0 +1,96 @@
+# File: Benchmarks/csv_read_benchmark.py
+#
+# Compare the CSV readers used by the capture jobs and Debug scripts.
+#
+# A synthetic Transaction Master and Originals file are written once per
+# scale, then each is read with:
+#   - pandas:  pd.read_csv(dtype=str, low_memory=False), the previous loader
+#   - mmap:    Utils.csv_io.read_csv_mmap (pyarrow, memory map, all cores)
+# The script reports the median read time, throughput and peak Python heap
+# (tracemalloc; Arrow's own buffers are not traced), and checks both readers
+# return identical frames.
+#
+# Usage:
+#   python Benchmarks/csv_read_benchmark.py
+#   python Benchmarks/csv_read_benchmark.py --rows 200000 1000000 --repeat 5
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Ensure project root is on PYTHONPATH
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pandas as pd
+
+from Utils.csv_io import read_csv_mmap
+from Utils.pretty_print import step_header, sub
+from Utils.synthetic_data import generate_originals, generate_transaction_master
+
+READERS = {
+    "pandas": lambda path: pd.read_csv(path, dtype=str, low_memory=False),
+    "mmap": read_csv_mmap,
+}
+
+
+def time_reader(reader, path, repeat):
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = reader(path)
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    reader(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, statistics.median(seconds), peak
+
+
+def benchmark_file(label, path, repeat):
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    frames = {}
+    for name, reader in READERS.items():
+        df, seconds, peak = time_reader(reader, path, repeat)
+        frames[name] = df
+        sub(
+            f"{label:<18} {name:<7} {seconds:7.2f}s | {size_mb / seconds:7.1f} MB/s | "
+            f"peak Python heap {peak / (1024 * 1024):8.1f} MB"
+        )
+    pd.testing.assert_frame_equal(frames["mmap"], frames["pandas"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CSV readers on pipeline-shaped files.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[200_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    step_header(f"BENCHMARK: CSV read (median of {args.repeat})")
+    work_dir = tempfile.mkdtemp(prefix="csv_read_bench_")
+    try:
+        for n_rows in args.rows:
+            tm = generate_transaction_master(n_rows, seed=args.seed)
+            tm_path = os.path.join(work_dir, "transaction_master.csv")
+            tm.to_csv(tm_path, index=False)
+
+            originals_path = os.path.join(work_dir, "Original_Invoice_Data_CSV.csv")
+            generate_originals(tm, seed=args.seed).to_csv(originals_path, index=False)
+            del tm
+
+            benchmark_file(f"TM {n_rows:,}", tm_path, args.repeat)
+            benchmark_file(f"Originals {n_rows:,}", originals_path, args.repeat)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
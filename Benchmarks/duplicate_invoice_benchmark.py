@@ -0,0 +1,97 @@
+# File: Benchmarks/duplicate_invoice_benchmark.py
+#
+# Time the duplicate-invoice check (Utils.duplicate_invoices) on a first
+# run, which indexes the whole Transaction Master, and on a daily run,
+# which probes the new invoices against the saved index (and re-checks the
+# STRICT key of every indexed one for corrections).
+#
+# A synthetic Transaction Master gets a share of re-posted invoices (new
+# DOC_ID; the invoice number either unchanged or with its punctuation and
+# leading zeros changed), so both STRICT and RELAXED groups are found.
+#
+# Usage:
+#   python Benchmarks/duplicate_invoice_benchmark.py
+#   python Benchmarks/duplicate_invoice_benchmark.py --scales 5000000 --daily 20000
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Ensure project root is on PYTHONPATH
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from Utils.duplicate_invoices import run_duplicate_invoice_detection
+from Utils.pretty_print import step_header, sub
+from Utils.synthetic_data import generate_transaction_master
+
+DEFAULT_SCALES = [500_000, 2_000_000]
+
+
+def with_reposted_invoices(tm: pd.DataFrame, rate: float, seed: int) -> pd.DataFrame:
+    """`tm` plus re-posted copies of a `rate` share of its invoices, spread through the file."""
+    rng = np.random.default_rng(seed)
+    copies = tm.sample(frac=rate, random_state=seed).copy()
+    copies["DOC_ID"] = (10**11 + np.arange(len(copies))).astype(str)
+    relaxed = rng.random(len(copies)) < 0.5
+    number = copies.loc[relaxed, "INVOICE_NUMBER"].astype(str)
+    copies.loc[relaxed, "INVOICE_NUMBER"] = "00" + number.str[:3] + "-" + number.str[3:]
+
+    positions = np.concatenate([np.arange(len(tm)), rng.integers(0, len(tm), len(copies))])
+    combined = pd.concat([tm, copies], ignore_index=True)
+    return combined.iloc[np.argsort(positions, kind="stable")].reset_index(drop=True)
+
+
+def _timed(func, verbose, **kwargs):
+    sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    start = time.perf_counter()
+    with sink:
+        result = func(**kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the duplicate-invoice check.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--daily", type=int, default=10_000, help="New invoices in the daily run.")
+    parser.add_argument("--repost-rate", type=float, default=0.001)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Show job output.")
+    args = parser.parse_args(argv)
+
+    for n_rows in args.scales:
+        step_header(f"BENCHMARK: duplicate invoices, {n_rows:,} Transaction Master rows")
+        work_dir = tempfile.mkdtemp(prefix=f"duplicate_invoice_bench_{n_rows}_")
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                tm = with_reposted_invoices(
+                    generate_transaction_master(n_rows, seed=args.seed), args.repost_rate, args.seed
+                )
+            tm_csv = os.path.join(work_dir, "transaction_master.csv")
+            candidates_csv = os.path.join(work_dir, "Duplicate_Invoice_Candidates.csv")
+
+            # Day 1: everything but the last `daily` invoices; day 2: all of them
+            for label, rows in (("first run", len(tm) - args.daily), ("daily run", len(tm))):
+                tm.iloc[:rows].to_csv(tm_csv, index=False)
+                written, seconds = _timed(
+                    run_duplicate_invoice_detection,
+                    args.verbose,
+                    transaction_master_csv=tm_csv,
+                    candidates_csv=candidates_csv,
+                )
+                sub(f"{label:<10} invoices: {rows:>10,} | candidate rows: {written:>7,} | {seconds:8.2f}s")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
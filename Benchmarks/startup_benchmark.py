@@ -0,0 +1,128 @@
+# File: Benchmarks/startup_benchmark.py
+#
+# Track import-time cost of the entry points.
+#
+# Each target module is imported in a fresh interpreter with
+# `python -X importtime`, several times, and the median cumulative import
+# time is reported together with the slowest imported packages and whether
+# any heavy dependency (pandas, numpy, pyarrow, oracledb, dotenv) was loaded
+# at import. Results are printed and appended to
+# Benchmarks/results/startup.csv so regressions show up over time.
+#
+# Usage:
+#   python Benchmarks/startup_benchmark.py
+#   python Benchmarks/startup_benchmark.py --modules main Job_Runner.changed_data_runner --repeat 10
+
+import argparse
+import csv
+import os
+import re
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+# Ensure project root is on PYTHONPATH
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from Utils.pretty_print import step_header, sub
+
+RESULTS_CSV = os.path.join(ROOT, "Benchmarks", "results", "startup.csv")
+
+DEFAULT_MODULES = [
+    "main",
+    "Job_Runner.orchestration_runner",
+    "Job_Runner.async_orchestration_runner",
+    "Job_Runner.originals_capture_runner",
+    "Job_Runner.changed_data_runner",
+    "Job_Runner.vendor_master_runner",
+]
+
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "oracledb", "dotenv"]
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_once(module):
+    """
+    Import `module` in a fresh interpreter.
+
+    Returns (cumulative microseconds for `module`, {top-level package: self us},
+    list of heavy modules that were loaded).
+    """
+    probe = (
+        f"import {module}, sys; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total_us = 0
+    packages = {}
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative, name = int(match.group(1)), int(match.group(2)), match.group(4)
+        if name == module:
+            total_us = cumulative
+        top = name.split(".")[0]
+        packages[top] = packages.get(top, 0) + self_us
+
+    heavy = [m for m in completed.stdout.strip().split(",") if m]
+    return total_us, packages, heavy
+
+
+def benchmark_module(module, repeat):
+    runs = [import_once(module) for _ in range(repeat)]
+    median_ms = statistics.median(r[0] for r in runs) / 1000
+    packages = runs[-1][1]
+    heavy = runs[-1][2]
+    slowest = sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:3]
+    return median_ms, slowest, heavy
+
+
+def save_results(rows, results_csv):
+    """Append benchmark rows to the results CSV (header written once)."""
+    os.makedirs(os.path.dirname(results_csv), exist_ok=True)
+    file_exists = os.path.exists(results_csv)
+    run_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    with open(results_csv, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(["RUN_AT", "MODULE", "IMPORT_MS", "HEAVY_IMPORTS", "PYTHON"])
+        for module, median_ms, heavy in rows:
+            writer.writerow(
+                [run_at, module, f"{median_ms:.1f}", " ".join(heavy), sys.version.split()[0]]
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark import time of the entry points.")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--results", default=RESULTS_CSV)
+    args = parser.parse_args(argv)
+
+    step_header(f"BENCHMARK: import time (median of {args.repeat})")
+    rows = []
+    for module in args.modules:
+        median_ms, slowest, heavy = benchmark_module(module, args.repeat)
+        top = ", ".join(f"{name} {us / 1000:.0f}ms" for name, us in slowest)
+        sub(f"{module:<40} {median_ms:8.1f} ms | heavy: {' '.join(heavy) or '-'} | top: {top}")
+        rows.append((module, median_ms, heavy))
+
+    save_results(rows, args.results)
+    print(f"\nResults appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
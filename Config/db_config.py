@@ -1,17 +1,34 @@
 import os
-from dotenv import load_dotenv
+from functools import lru_cache
 
-# load .env file
+# .env sits next to this file
 env_path = os.path.join(os.path.dirname(__file__), ".env")
-load_dotenv(dotenv_path="Config/.env")
 
 
-# Extract values into a dictonary
-DB_CONFIG = {
-    "hostname": os.getenv("DB_HOST"),
-    "port": int(os.getenv("DB_PORT", 1521)),
-    "service_name": os.getenv("DB_SERVICE"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASS"),
-}
+@lru_cache(maxsize=None)
+def get_db_config() -> dict:
+    """
+    Load the .env file and return the connection settings.
 
+    Resolved on first use (not at import) so that importing a runner, or
+    collecting the tests, does not read the environment or import dotenv.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path=env_path)
+
+    # Extract values into a dictonary
+    return {
+        "hostname": os.getenv("DB_HOST"),
+        "port": int(os.getenv("DB_PORT", 1521)),
+        "service_name": os.getenv("DB_SERVICE"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASS"),
+    }
+
+
+def __getattr__(name):
+    # Keeps `from Config.db_config import DB_CONFIG` working (loads on access)
+    if name == "DB_CONFIG":
+        return get_db_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,78 @@
+from Core.database import DEFAULT_STMT_CACHE_SIZE, OracleConnection
+
+# asyncio counterpart of Core.database.OracleConnection.
+#
+# Backed by an oracledb async connection pool (thin mode), so several
+# queries can stream at the same time from one process and one event loop:
+# every call acquires its own pooled connection and releases it when done.
+
+DEFAULT_POOL_MAX = 4
+
+
+class AsyncOracleConnection:
+    def __init__(self, config: dict, pool_max: int = DEFAULT_POOL_MAX):
+        import oracledb
+
+        # Define the connection authentication details from credential dictionary
+        self.dsn = oracledb.makedsn(
+            config["hostname"],
+            config["port"],
+            service_name=config["service_name"]
+        )
+        self.user = config["user"]
+        self.password = config["password"]
+        self.stmt_cache_size = int(config.get("stmt_cache_size", DEFAULT_STMT_CACHE_SIZE))
+        self.pool_max = pool_max
+        self.pool = None
+
+    # Create the pool; connections are opened on demand up to pool_max
+    async def connect(self):
+        import oracledb
+
+        self.pool = oracledb.create_pool_async(
+            user=self.user,
+            password=self.password,
+            dsn=self.dsn,
+            min=1,
+            max=self.pool_max,
+            stmtcachesize=self.stmt_cache_size,
+        )
+        # Open one connection now so bad credentials fail fast
+        async with self.pool.acquire() as conn:
+            await conn.ping()
+        return self.pool
+
+    # Run query and fetch all rows and headers
+    async def run_query(self, query: str, params=None):
+        async with self.pool.acquire() as conn:
+            with conn.cursor() as cursor:
+                await cursor.execute(query, params or {})
+                columns = [col[0] for col in cursor.description]
+                rows = await cursor.fetchall()
+                return columns, rows
+
+    # Stream a query in batches (async generator). The pooled connection is
+    # held until the generator is exhausted, closed or cancelled.
+    async def run_in_batches(self, query: str, batch_size: int = 10000, params=None):
+        async with self.pool.acquire() as conn:
+            with conn.cursor() as cursor:
+                cursor.arraysize = batch_size
+                await cursor.execute(query, params or {})
+                columns = [col[0] for col in cursor.description]
+                while True:
+                    rows = await cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield columns, rows
+
+    async def get_row_count(self, query: str, params=None) -> int:
+        """
+        Returns the total number of rows the original query would return.
+        """
+        _, rows = await self.run_query(OracleConnection.build_count_query(query), params)
+        return rows[0][0]
+
+    # Close the pool and every connection in it
+    async def close(self):
+        if self.pool:
+            await self.pool.close()
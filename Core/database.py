@@ -1,7 +1,15 @@
-import oracledb
+# oracledb is imported when a connection is created, so modules that only
+# reference OracleConnection (runners, tests) import quickly.
+
+# Statements kept parsed per connection. The export, count and window queries
+# are re-executed with bind variables, so their cursors are reused instead of
+# being hard-parsed on every run.
+DEFAULT_STMT_CACHE_SIZE = 40
 
 class OracleConnection:
     def __init__(self, config: dict):
+        import oracledb
+
         # Define the connection authentication details from credential dictionary
         self.dsn = oracledb.makedsn(
             config["hostname"],
@@ -10,23 +18,28 @@ class OracleConnection:
         )
         self.user = config["user"]
         self.password = config["password"]
+        self.stmt_cache_size = int(config.get("stmt_cache_size", DEFAULT_STMT_CACHE_SIZE))
         self.conn = None
 
      # Connect to the database and return connection for reuseability
     def connect(self):
+        import oracledb
+
         self.conn = oracledb.connect(
             user=self.user,
             password=self.password,
-            dsn=self.dsn
+            dsn=self.dsn,
+            stmtcachesize=self.stmt_cache_size,
          )
         return self.conn
         
     # Run query and fetch all rows and headers
-    def run_query(self, query: str):
+    # params: optional dict of bind variables (see Utils.sql_loader.load_sql)
+    def run_query(self, query: str, params=None):
         # set cursor connection
         cursor = self.conn.cursor()
         try:
-            cursor.execute(query)
+            cursor.execute(query, params or {})
             # List of column names
             columns = [col[0] for col in cursor.description] 
             # List of tuples
@@ -37,9 +50,11 @@ class OracleConnection:
             cursor.close()
 
     # Run query and fetch in batches for improve performance
-    def run_in_batches(self, query: str, batch_size: int = 10000):
+    # params: optional dict of bind variables (see Utils.sql_loader.load_sql)
+    def run_in_batches(self, query: str, batch_size: int = 10000, params=None):
         cursor = self.conn.cursor()
-        cursor.execute(query)
+        cursor.arraysize = batch_size
+        cursor.execute(query, params or {})
         columns = [col[0] for col in cursor.description]
         while True:
             rows = cursor.fetchmany(batch_size)
@@ -50,14 +65,15 @@ class OracleConnection:
 
 
     
-    def get_row_count(self, query: str) -> int:
+    def get_row_count(self, query: str, params=None) -> int:
         """
         Returns the total number of rows the original query would return.
+        The same bind variables as the original query are passed through.
         """
         count_query = self.build_count_query(query)
         cursor = self.conn.cursor()
         try:
-            cursor.execute(count_query)
+            cursor.execute(count_query, params or {})
             count = cursor.fetchone()[0]
             return count
         finally:
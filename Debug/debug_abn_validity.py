@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+
+# Ensure project root is on PYTHONPATH
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+print(f"[debug] Project root on sys.path: {ROOT}")
+
+from Utils.abn import abn_invalid_flags
+from Utils.csv_io import read_table, resolve_csv_path
+
+# ABN columns to check per export. The vendor master export has no ABN
+# column today; it is checked as soon as one is added to the query.
+ABN_COLUMNS = {
+    r"Output_Files\transaction_master.csv": ["ABN"],
+    r"Output_Files\Original_Invoice_Data_CSV.csv": ["ABN"],
+    r"Output_Files\vendor_master.csv": ["ABN", "VENDOR_VAT_NO", "STCD1"],
+}
+
+for path, columns in ABN_COLUMNS.items():
+    resolved = resolve_csv_path(path)
+    if not os.path.exists(resolved):
+        print(f"{resolved}: not found, skipped.")
+        continue
+
+    df = read_table(resolved)
+    present = [c for c in columns if c in df.columns]
+    if not present:
+        print(f"{resolved}: no ABN column ({', '.join(columns)}), skipped.")
+        continue
+
+    for col in present:
+        start = time.perf_counter()
+        invalid = abn_invalid_flags(df[col]).astype(bool)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{resolved} [{col}]: {invalid.sum():,} of {len(df):,} value(s) fail the "
+            f"modulus-89 check ({elapsed:.2f}s)"
+        )
+        if invalid.any():
+            print(df.loc[invalid, col].value_counts().head(10).to_string())
@@ -8,17 +8,19 @@ if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 print(f"[debug] Project root on sys.path: {ROOT}")
 
+from Utils.csv_io import read_table, resolve_csv_path
+from Utils.date_parsing import parse_dates
 from Utils.originals_capture_csv import normalize_doc_id
 
 tm_path = r"Output_Files\transaction_master.csv"
 orig_path = r"Output_Files\Original_Invoice_Data_CSV.csv"
 
 print("Loading CSVs...")
-tm = pd.read_csv(tm_path, dtype=str, low_memory=False)
-orig = pd.read_csv(orig_path, dtype=str, low_memory=False)
+tm = read_table(resolve_csv_path(tm_path))
+orig = read_table(resolve_csv_path(orig_path))
 
-tm["ENTRY_DATE"] = pd.to_datetime(tm["ENTRY_DATE"], errors="coerce")
-orig["ENTRY_DATE"] = pd.to_datetime(orig["ENTRY_DATE"], errors="coerce")
+tm["ENTRY_DATE"] = parse_dates(tm["ENTRY_DATE"], "ENTRY_DATE")
+orig["ENTRY_DATE"] = parse_dates(orig["ENTRY_DATE"], "ENTRY_DATE")
 
 # Build normalised DOC_KEY for both, using the same logic as the job
 tm["DOC_KEY"] = tm["DOC_ID"].apply(normalize_doc_id)
@@ -8,14 +8,16 @@ if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 print(f"[debug] Project root on sys.path: {ROOT}")
 
+from Utils.csv_io import read_table, resolve_csv_path
+
 tm_path = r"Output_Files\transaction_master.csv"
 orig_path = r"Output_Files\Original_Invoice_Data_CSV.csv"
 change_path = r"Output_Files\Change_Invoice_Data_CSV.csv"
 
 
-df_original = pd.read_csv(orig_path, dtype=str, low_memory=False)
-# df_tm = pd.read_csv(tm_path, dtype=str, low_memory=False)
-# df_change = pd.read_csv(change_path, dtype=str, low_memory=False)
+df_original = read_table(resolve_csv_path(orig_path))
+# df_tm = read_table(resolve_csv_path(tm_path))
+# df_change = read_table(resolve_csv_path(change_path))
 
 # print(df_change.columns)
 
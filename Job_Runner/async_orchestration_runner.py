@@ -0,0 +1,351 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Config.db_config import get_db_config
+from Core.async_database import AsyncOracleConnection
+from Job_Runner.change_history_runner import ChangeHistoryJob
+from Job_Runner.changed_data_runner import ChangedDataJob
+from Job_Runner.duplicate_invoice_runner import DuplicateInvoiceJob
+from Job_Runner.layout_master_runner import LayoutMasterJob
+from Job_Runner.originals_capture_runner import OriginalsCaptureJob
+from Job_Runner.sql_export_job import EXPORT_CHANGED
+from Job_Runner.transaction_master_runner import TransactionMasterJob
+from Job_Runner.vendor_master_runner import VendorMasterJob
+from Utils.flag_file import Flagfile
+from Utils.pretty_print import step_header, sub
+
+# asyncio orchestrator: the pipeline is a graph of awaitable tasks instead of
+# a fixed sequence with done.txt polling.
+#
+# - The three SQL exports stream concurrently over an async connection pool
+#   (one event loop, one process); their CSV writes run in a thread pool.
+# - Originals and Changed Data capture are CSV-bound and run in the same
+#   thread pool once the Transaction Master export has finished.
+# - Every task has its own timeout. A task that fails or times out causes
+#   its dependents to be skipped; independent tasks carry on. Cancelling
+#   run_job_graph (e.g. Ctrl+C) cancels every running task.
+# - A thread cannot be stopped, so a CSV job that times out is abandoned,
+#   not cancelled: it is reported as such, and its slot and dependents are
+#   held until its thread has exited, so nothing reads a half-written file.
+# - A single done.txt is written at the end when every task succeeded and
+#   at least one export changed, so Power BI refreshes once per run.
+
+TASK_DONE = "done"
+TASK_FAILED = "failed"
+TASK_TIMEOUT = "timeout"
+TASK_SKIPPED = "skipped"
+TASK_CANCELLED = "cancelled"
+TASK_ABANDONED = "abandoned"
+
+EXPORT_NAMES = ("vendor_master", "transaction_master", "layout_master")
+
+# Per-task timeouts in seconds
+DEFAULT_TIMEOUTS = {
+    "vendor_master": 30 * 60,
+    "transaction_master": 30 * 60,
+    "layout_master": 30 * 60,
+    "originals_capture": 20 * 60,
+    "changed_data": 20 * 60,
+    "duplicate_invoices": 20 * 60,
+    "change_history": 20 * 60,
+}
+
+
+class AsyncTask:
+    """
+    One node of the job graph.
+
+    Parameters
+    ----------
+    name : str
+        Unique task name.
+    run : callable
+        Zero-argument coroutine function doing the work.
+    depends_on : iterable of str
+        Names of tasks that must finish successfully first.
+    timeout : float or None
+        Seconds before the task is cancelled; None waits forever.
+    in_thread : bool
+        True when `run` only awaits work in a thread pool. Such a task
+        cannot be cancelled: on timeout it is reported as TASK_ABANDONED
+        and its dependents are held until the thread has exited.
+    """
+
+    def __init__(self, name, run, depends_on=(), timeout=None, in_thread=False):
+        self.name = name
+        self.run = run
+        self.depends_on = tuple(depends_on)
+        self.timeout = timeout
+        self.in_thread = in_thread
+
+
+def _check_graph(tasks):
+    names = [t.name for t in tasks]
+    if len(set(names)) != len(names):
+        raise ValueError(f"[orchestrator] Duplicate task names in {names}")
+
+    by_name = {t.name: t for t in tasks}
+    for t in tasks:
+        unknown = [d for d in t.depends_on if d not in by_name]
+        if unknown:
+            raise ValueError(f"[orchestrator] Task {t.name!r} depends on unknown task(s) {unknown}")
+
+    # Depth-first cycle check
+    state = {}
+
+    def visit(name, path):
+        if state.get(name) == "open":
+            raise ValueError(f"[orchestrator] Dependency cycle: {' -> '.join(path + [name])}")
+        if state.get(name) == "closed":
+            return
+        state[name] = "open"
+        for dep in by_name[name].depends_on:
+            visit(dep, path + [name])
+        state[name] = "closed"
+
+    for name in names:
+        visit(name, [])
+
+
+async def run_job_graph(tasks, cancel_on_failure=False, max_concurrency=None):
+    """
+    Run `tasks` (AsyncTask list) as soon as their dependencies succeed.
+
+    Parameters
+    ----------
+    cancel_on_failure : bool
+        If True, the first failure or timeout cancels every task still
+        running or waiting; otherwise only its dependents are skipped.
+    max_concurrency : int or None
+        Most tasks running at once; None runs every ready task.
+
+    Returns
+    -------
+    dict
+        Task name -> {"status": one of TASK_*, "result": ..., "error": ...,
+        "seconds": wall time of the task itself (0.0 if it never ran)}.
+    """
+    _check_graph(tasks)
+
+    results = {}
+    finished = {t.name: asyncio.Event() for t in tasks}
+    runners = {}
+    slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    async def run_one(task):
+        try:
+            for dep in task.depends_on:
+                await finished[dep].wait()
+
+            failed_deps = [d for d in task.depends_on if results[d]["status"] != TASK_DONE]
+            if failed_deps:
+                results[task.name] = {"status": TASK_SKIPPED, "result": None, "error": None}
+                sub(f"[orchestrator] {task.name} skipped (dependency {', '.join(failed_deps)} did not finish).")
+                return
+
+            if slots is not None:
+                await slots.acquire()
+            sub(f"[orchestrator] {task.name} started.")
+            started = time.perf_counter()
+            work = asyncio.ensure_future(task.run())
+            try:
+                # Shielded so that a timeout does not cancel thread-backed work
+                result = await asyncio.wait_for(asyncio.shield(work), timeout=task.timeout)
+            except asyncio.TimeoutError:
+                if task.in_thread:
+                    results[task.name] = {"status": TASK_ABANDONED, "result": None, "error": None}
+                    sub(
+                        f"[orchestrator] {task.name} timed out after {task.timeout}s. Its thread "
+                        "cannot be stopped; waiting for it to exit before releasing dependents."
+                    )
+                    await asyncio.gather(work, return_exceptions=True)
+                    sub(f"[orchestrator] {task.name} thread exited; its result is discarded.")
+                else:
+                    work.cancel()
+                    await asyncio.gather(work, return_exceptions=True)
+                    results[task.name] = {"status": TASK_TIMEOUT, "result": None, "error": None}
+                    sub(f"[orchestrator] {task.name} timed out after {task.timeout}s and was cancelled.")
+            except asyncio.CancelledError:
+                work.cancel()
+                raise
+            except Exception as e:
+                results[task.name] = {"status": TASK_FAILED, "result": None, "error": e}
+                sub(f"[orchestrator] {task.name} failed: {e}")
+            else:
+                results[task.name] = {"status": TASK_DONE, "result": result, "error": None}
+                sub(f"[orchestrator] {task.name} completed.")
+            finally:
+                if slots is not None:
+                    slots.release()
+            results[task.name]["seconds"] = time.perf_counter() - started
+
+            if cancel_on_failure and results[task.name]["status"] != TASK_DONE:
+                for other, runner in runners.items():
+                    if other != task.name:
+                        runner.cancel()
+
+        except asyncio.CancelledError:
+            results.setdefault(task.name, {"status": TASK_CANCELLED, "result": None, "error": None})
+            raise
+        finally:
+            finished[task.name].set()
+
+    for task in tasks:
+        runners[task.name] = asyncio.ensure_future(run_one(task))
+
+    try:
+        await asyncio.gather(*runners.values(), return_exceptions=True)
+    finally:
+        # Reached on outside cancellation too: make sure nothing keeps running
+        for runner in runners.values():
+            runner.cancel()
+        await asyncio.gather(*runners.values(), return_exceptions=True)
+
+    for task in tasks:
+        results.setdefault(task.name, {"status": TASK_CANCELLED, "result": None, "error": None})
+        results[task.name].setdefault("seconds", 0.0)
+    return results
+
+
+def build_pipeline_tasks(adb, executor, jobs, timeouts=None):
+    """
+    The standard PIOR graph. `jobs` maps task name -> job object (see main()).
+
+        vendor_master ─┐
+        layout_master ─┼─ (in parallel)
+        transaction_master ─┬─ originals_capture ── changed_data
+                            ├─ duplicate_invoices
+                            └─ change_history
+
+    With vendor-name matching on, changed_data also waits for vendor_master.
+    Only the tasks named in `jobs` are built; a dependency that is not part
+    of the run is dropped (its output from an earlier run is used instead).
+    """
+    timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+    loop = asyncio.get_running_loop()
+
+    def export(name):
+        return lambda: jobs[name].run_async(adb, executor=executor, write_flag=False)
+
+    def csv_job(name):
+        # An executor future, so AsyncTask(in_thread=True) below
+        return lambda: loop.run_in_executor(executor, jobs[name].run, None)
+
+    tasks = [
+        AsyncTask("vendor_master", export("vendor_master"), timeout=timeouts["vendor_master"]),
+        AsyncTask("transaction_master", export("transaction_master"), timeout=timeouts["transaction_master"]),
+        AsyncTask("layout_master", export("layout_master"), timeout=timeouts["layout_master"]),
+        AsyncTask(
+            "originals_capture",
+            csv_job("originals_capture"),
+            depends_on=["transaction_master"],
+            timeout=timeouts["originals_capture"],
+            in_thread=True,
+        ),
+        AsyncTask(
+            "changed_data",
+            csv_job("changed_data"),
+            # vendor_master.csv feeds the opt-in vendor-name matching
+            depends_on=["originals_capture"]
+            + (["vendor_master"] if getattr(jobs.get("changed_data"), "vendor_master_csv", None) else []),
+            timeout=timeouts["changed_data"],
+            in_thread=True,
+        ),
+        AsyncTask(
+            "duplicate_invoices",
+            csv_job("duplicate_invoices"),
+            depends_on=["transaction_master"],
+            timeout=timeouts["duplicate_invoices"],
+            in_thread=True,
+        ),
+        AsyncTask(
+            "change_history",
+            csv_job("change_history"),
+            depends_on=["transaction_master"],
+            timeout=timeouts["change_history"],
+            in_thread=True,
+        ),
+    ]
+    tasks = [t for t in tasks if t.name in jobs]
+    for t in tasks:
+        t.depends_on = tuple(d for d in t.depends_on if d in jobs)
+    return tasks
+
+
+def write_refresh_flag(results, export_names=EXPORT_NAMES):
+    """
+    Write one done.txt when every task succeeded and something changed: an
+    export produced a new output or a capture job appended rows. Returns
+    True if the flag was written.
+    """
+    if any(r["status"] != TASK_DONE for r in results.values()):
+        sub("[orchestrator] Not every task succeeded. No refresh triggered.")
+        return False
+
+    exports_changed = any(results[n]["result"] == EXPORT_CHANGED for n in export_names if n in results)
+    rows_appended = any(
+        isinstance(r["result"], int) and r["result"] > 0
+        for n, r in results.items()
+        if n not in export_names
+    )
+    if not (exports_changed or rows_appended):
+        sub("[orchestrator] Nothing changed since last run. No refresh triggered.")
+        return False
+
+    Flagfile.create(path=os.path.join("Output_Files", "done.txt"), message="PIOR RUN COMPLETE")
+    return True
+
+
+async def run_pipeline(config, jobs, timeouts=None, max_workers=4, max_concurrency=None):
+    """
+    Run `jobs` as a job graph. The connection pool gets one session per
+    export that may run at once, and is not opened at all for CSV-only runs.
+    """
+    exports = [n for n in EXPORT_NAMES if n in jobs]
+    pool_max = max(1, min(len(exports), max_concurrency or len(exports)))
+    adb = AsyncOracleConnection(config, pool_max=pool_max) if exports else None
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    try:
+        if adb is not None:
+            print("Connecting to DB")
+            await adb.connect()
+            print("DB connection successful")
+
+        results = await run_job_graph(
+            build_pipeline_tasks(adb, executor, jobs, timeouts),
+            max_concurrency=max_concurrency,
+        )
+        write_refresh_flag(results)
+        return results
+    finally:
+        if adb is not None:
+            try:
+                await adb.close()
+            except Exception:
+                pass
+            print("DB connection closed.")
+        executor.shutdown(wait=True)
+
+
+def main():
+    step_header("PIOR async run")
+    jobs = {
+        "vendor_master": VendorMasterJob(),
+        "transaction_master": TransactionMasterJob(),
+        "layout_master": LayoutMasterJob(),
+        "originals_capture": OriginalsCaptureJob(),
+        "changed_data": ChangedDataJob(),
+        "duplicate_invoices": DuplicateInvoiceJob(),
+        "change_history": ChangeHistoryJob(),
+    }
+    results = asyncio.run(run_pipeline(get_db_config(), jobs))
+
+    for name, r in results.items():
+        sub(f"[orchestrator] {name}: {r['status']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# File: Job_Runner/change_history_runner.py
+
+import os
+import sys
+from typing import List, Optional
+
+# Ensure project root is on PYTHONPATH BEFORE importing Utils
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from Utils.pretty_print import sub  # noqa: E402
+
+
+class ChangeHistoryJob:
+    """
+    PIOR job wrapper for the Transaction Master change history.
+
+    Records today's differences from the last recorded state in the
+    change-history store (Utils.change_history), by default under
+    Output_Files/change_history. CSV-only; `db` is accepted in run(...)
+    for consistency with other jobs.
+    """
+
+    def __init__(
+        self,
+        tm_csv: str = os.path.join("Output_Files", "transaction_master.csv"),
+        history_dir: str = os.path.join("Output_Files", "change_history"),
+        columns: Optional[List[str]] = None,
+    ) -> None:
+        self.tm_csv = tm_csv
+        self.history_dir = history_dir
+        # None tracks the Changed Data compare columns
+        self.columns = columns
+
+    def run(self, db=None) -> int:
+        """
+        Returns
+        -------
+        int
+            Number of history records written (new DOC_IDs plus changed cells).
+        """
+        # Imported here so that importing the runner does not pull in pandas
+        from Utils.change_history import record_change_history
+
+        records = record_change_history(
+            transaction_master_csv=self.tm_csv,
+            history_dir=self.history_dir,
+            columns=self.columns,
+        )
+        sub(f"[ChangeHistoryJob] Completed. History records written: {records}")
+        return records
+
+
+def main():
+    """
+    Allow this runner to be executed directly from the command line.
+    """
+    ChangeHistoryJob().run(db=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
 # File: Job_Runner/changed_data_runner.py
 
 import os
+from typing import Optional
 
-from Utils.changed_data_csv import run_changed_data_capture
 from Utils.pretty_print import sub
 
+# Vendor Master export the opt-in vendor-name matching reads (main.py --vendor-match)
+VENDOR_MASTER_CSV = os.path.join("Output_Files", "vendor_master.csv")
+
 
 class ChangedDataJob:
     """
@@ -21,10 +24,32 @@ class ChangedDataJob:
             "Output_Files", "Original_Invoice_Data_CSV.csv"
         ),
         changed_csv: str = os.path.join("Output_Files", "Change_Invoice_Data_CSV.csv"),
+        shards: int = 1,
+        max_workers: Optional[int] = None,
+        originals_store_dir: Optional[str] = None,
+        memory_budget_mb: Optional[float] = None,
+        vendor_master_csv: Optional[str] = None,
+        long_csv: Optional[str] = None,
+        upgrade_schema: bool = False,
     ) -> None:
         self.tm_csv = tm_csv
         self.originals_csv = originals_csv
         self.changed_csv = changed_csv
+        # shards > 1 runs the diff per DOC_ID hash shard in a process pool
+        self.shards = shards
+        self.max_workers = max_workers
+        # Month-segmented Originals store; None keeps the single Originals CSV
+        self.originals_store_dir = originals_store_dir
+        # Inputs estimated above this many MB are joined out of core
+        self.memory_budget_mb = memory_budget_mb
+        # Best Vendor Master match for each original vendor name (adds the
+        # VENDOR_MATCH_* columns to the Changed Data CSV); None skips it
+        self.vendor_master_csv = vendor_master_csv
+        # Long-format diff (one row per changed cell); None skips it
+        self.long_csv = long_csv
+        # Let new output columns rewrite the Changed Data CSV's header;
+        # False leaves the file's columns (and Power BI's schema) as they are
+        self.upgrade_schema = upgrade_schema
 
     def run(self, db=None) -> int:
         """
@@ -40,10 +65,20 @@ class ChangedDataJob:
         int
             Number of new rows appended to the Changed Data CSV.
         """
+        # Imported here so that importing the runner does not pull in pandas
+        from Utils.changed_data_csv import run_changed_data_capture
+
         rows = run_changed_data_capture(
             transaction_master_csv=self.tm_csv,
             originals_csv=self.originals_csv,
             changed_csv=self.changed_csv,
+            shards=self.shards,
+            max_workers=self.max_workers,
+            originals_store_dir=self.originals_store_dir,
+            memory_budget_mb=self.memory_budget_mb,
+            vendor_master_csv=self.vendor_master_csv,
+            long_csv=self.long_csv,
+            upgrade_schema=self.upgrade_schema,
         )
         sub(f"[ChangedDataJob] Completed. New rows appended: {rows}")
         return rows
@@ -0,0 +1,63 @@
+# File: Job_Runner/duplicate_invoice_runner.py
+
+import os
+import sys
+from typing import Optional
+
+# Ensure project root is on PYTHONPATH BEFORE importing Utils
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from Utils.pretty_print import sub  # noqa: E402
+
+
+class DuplicateInvoiceJob:
+    """
+    PIOR job wrapper for the duplicate-invoice candidate check.
+
+    Probes the Transaction Master invoices not seen by an earlier run
+    against the duplicate-invoice index (Utils.duplicate_invoices) and
+    appends candidate groups to Output_Files/Duplicate_Invoice_Candidates.csv.
+    CSV-only; `db` is accepted in run(...) for consistency with other jobs.
+    """
+
+    def __init__(
+        self,
+        tm_csv: str = os.path.join("Output_Files", "transaction_master.csv"),
+        candidates_csv: str = os.path.join("Output_Files", "Duplicate_Invoice_Candidates.csv"),
+        index_path: Optional[str] = None,
+    ) -> None:
+        self.tm_csv = tm_csv
+        self.candidates_csv = candidates_csv
+        # None keeps the index next to the candidates CSV
+        self.index_path = index_path
+
+    def run(self, db=None) -> int:
+        """
+        Returns
+        -------
+        int
+            Number of candidate rows appended.
+        """
+        # Imported here so that importing the runner does not pull in pandas
+        from Utils.duplicate_invoices import run_duplicate_invoice_detection
+
+        rows = run_duplicate_invoice_detection(
+            transaction_master_csv=self.tm_csv,
+            candidates_csv=self.candidates_csv,
+            index_path=self.index_path,
+        )
+        sub(f"[DuplicateInvoiceJob] Completed. Candidate rows appended: {rows}")
+        return rows
+
+
+def main():
+    """
+    Allow this runner to be executed directly from the command line.
+    """
+    DuplicateInvoiceJob().run(db=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,18 @@
 import os
 import time
+from contextlib import nullcontext
 
 from Job_Runner.vendor_master_runner import VendorMasterJob
 from Job_Runner.transaction_master_runner import TransactionMasterJob
 from Job_Runner.layout_master_runner import LayoutMasterJob
 from Job_Runner.originals_capture_runner import OriginalsCaptureJob
+from Job_Runner.change_history_runner import ChangeHistoryJob
 from Job_Runner.changed_data_runner import ChangedDataJob
+from Job_Runner.duplicate_invoice_runner import DuplicateInvoiceJob
+from Job_Runner.sql_export_job import EXPORT_UNCHANGED
 from Core.database import OracleConnection
-from Config.db_config import DB_CONFIG
+from Config.db_config import get_db_config
+from Utils.csv_io import summarize_read_stats, take_read_stats
 from Utils.pretty_print import step_header, sub
 
 
@@ -15,11 +20,18 @@ def run_step(step_name, runner_function, db):
     """
     Run a DB-driven step and wait for Output_Files/done.txt as a completion
     signal, with a short timeout. Used for Vendor, Transaction, and Layout.
+
+    An export whose result matches the previous run writes no done.txt (so
+    no refresh is triggered) and counts as success straight away.
     """
     step_header(f"STEP: {step_name}")
 
     # Run the job
-    runner_function(db)
+    outcome = runner_function(db)
+
+    if outcome == EXPORT_UNCHANGED:
+        sub(f"[orchestrator] {step_name} unchanged since last run. No refresh triggered.")
+        return True
 
     done_file = os.path.join("Output_Files", "done.txt")
     timeout = 5  # seconds
@@ -38,44 +50,169 @@ def run_step(step_name, runner_function, db):
     return False
 
 
-def main():
-    db = OracleConnection(DB_CONFIG)
-    print("Connecting to DB")
+# Job names accepted by build_jobs / the CLI, in the order the full pipeline runs them
+PIPELINE_ORDER = (
+    "vendor_master",
+    "transaction_master",
+    "originals_capture",
+    "changed_data",
+    "duplicate_invoices",
+    "change_history",
+    "layout_master",
+)
+
+# SQL export jobs: job class and step title
+EXPORT_JOBS = {
+    "vendor_master": (VendorMasterJob, "Vendor Master Export"),
+    "transaction_master": (TransactionMasterJob, "Transaction Master Export"),
+    "layout_master": (LayoutMasterJob, "Layout Master Export"),
+}
+
+# CSV capture jobs (no DB connection needed with their default settings)
+CAPTURE_JOBS = {
+    "originals_capture": OriginalsCaptureJob,
+    "changed_data": ChangedDataJob,
+    "duplicate_invoices": DuplicateInvoiceJob,
+    "change_history": ChangeHistoryJob,
+}
+
+
+def resolve_job_names(names):
+    """
+    Validate job names ("all" selects every job) and return them in
+    pipeline order, so dependencies such as Transaction Master -> Originals
+    -> Changed Data always run in the right sequence.
+    """
+    names = list(names or ["all"])
+    if "all" in names:
+        return list(PIPELINE_ORDER)
+    unknown = [n for n in names if n not in PIPELINE_ORDER]
+    if unknown:
+        raise ValueError(
+            f"[orchestrator] Unknown job(s) {unknown}. Choose from: all, {', '.join(PIPELINE_ORDER)}"
+        )
+    return [n for n in PIPELINE_ORDER if n in names]
+
+
+def build_jobs(names=PIPELINE_ORDER, **export_options):
+    """
+    Instantiate the named jobs (pipeline order). `export_options`
+    (compression, output_format, fetch_size, params, resume) are passed to
+    the SQL export jobs only.
+    """
+    jobs = {}
+    for name in resolve_job_names(names):
+        if name in EXPORT_JOBS:
+            jobs[name] = EXPORT_JOBS[name][0](**export_options)
+        else:
+            jobs[name] = CAPTURE_JOBS[name]()
+    return jobs
 
-    try:
-        db.connect()
-        print("DB connection successful")
 
-        vendor_job = VendorMasterJob()
-        transaction_job = TransactionMasterJob()
-        layout_job = LayoutMasterJob()
-        originals_job = OriginalsCaptureJob()
-        changed_job = ChangedDataJob()
+def _needs_db(jobs):
+    return any(
+        name in EXPORT_JOBS or getattr(job, "source", None) == "db"
+        for name, job in jobs.items()
+    )
+
+
+def print_run_summary(results):
+    """Per-job wall time, outcome and CSV parse throughput, slowest first (--profile)."""
+    step_header("PROFILE: wall time per job")
+    total = sum(r["seconds"] for r in results.values())
+    for name, r in sorted(results.items(), key=lambda kv: kv[1]["seconds"], reverse=True):
+        share = r["seconds"] / total * 100 if total else 0.0
+        parse = r.get("csv_parse")
+        parsed = (
+            f"  | parsed {parse['mb']:.1f} MB in {parse['seconds']:.2f}s ({parse['mb_per_s']:.0f} MB/s)"
+            if parse and parse["files"] else ""
+        )
+        sub(f"{name:<20} {r['seconds']:9.2f}s {share:5.1f}%  {r['status']}{parsed}")
+    sub(f"{'total':<20} {total:9.2f}s")
+
 
-        # # 1. Vendor Master (DB-driven, uses done.txt)
-        if not run_step("Vendor Master Export", vendor_job.run, db):
-            return
+def _run_one(name, job, db):
+    """Run one job; returns (succeeded, result)."""
+    if name not in EXPORT_JOBS:
+        return True, job.run(db)
 
-        # # # 2. Transaction Master (DB-driven, uses done.txt)
-        if not run_step("Transaction Master Export", transaction_job.run, db):
-            return
+    outcome = {}
 
-        # # 3. Originals Capture (CSV-only; no done.txt, header printed inside)
-        originals_job.run(db)
+    def export(conn):
+        outcome["result"] = job.run(conn)
+        return outcome["result"]
 
-        # # 4. Changed Data Capture (CSV-only; no done.txt, header printed inside)
-        changed_job.run(db)
+    ok = run_step(EXPORT_JOBS[name][1], export, db)
+    return ok, outcome.get("result")
 
-        # # # 5. Layout Master (DB-driven, uses done.txt)
-        if not run_step("Layout Master Export", layout_job.run, db):
-            return
+
+def run_jobs(jobs, profile=False):
+    """
+    Run `jobs` (name -> job, as from build_jobs) one after another on a
+    single connection, which is only opened when a job needs Oracle.
+    A failed export stops the run, as in main().
+
+    With profile=True each job also runs under Utils.profiling.profile_job
+    (cProfile, tracemalloc and stack sampling; reports in logs/profiles/).
+
+    Returns
+    -------
+    dict
+        Job name -> {"status": "done" | "failed", "result": ..., "seconds": float,
+        "csv_parse": totals of the job's CSV/Parquet reads (Utils.csv_io)}.
+    """
+    results = {}
+    db = OracleConnection(get_db_config()) if _needs_db(jobs) else None
+
+    profile_dir = None
+    if profile:
+        from Utils.profiling import new_profile_dir, profile_job
+
+        profile_dir = new_profile_dir()
+
+    try:
+        if db is not None:
+            print("Connecting to DB")
+            db.connect()
+            print("DB connection successful")
+
+        for name, job in jobs.items():
+            profiling = profile_job(name, profile_dir) if profile_dir else nullcontext()
+            take_read_stats()
+            started = time.perf_counter()
+            with profiling:
+                ok, result = _run_one(name, job, db)
+            results[name] = {
+                "status": "done" if ok else "failed",
+                "result": result,
+                "seconds": time.perf_counter() - started,
+                "csv_parse": summarize_read_stats(take_read_stats()),
+            }
+            parse = results[name]["csv_parse"]
+            if parse["files"]:
+                sub(
+                    f"[orchestrator] {name} parsed {parse['files']} file(s), {parse['rows']:,} rows, "
+                    f"{parse['mb']:.1f} MB in {parse['seconds']:.2f}s ({parse['mb_per_s']:.0f} MB/s)."
+                )
+            if not ok:
+                break
 
     finally:
-        try:
-            db.close()
-        except Exception:
-            pass
-        print("DB connection closed.")
+        if db is not None:
+            try:
+                db.close()
+            except Exception:
+                pass
+            print("DB connection closed.")
+        if profile and results:
+            print_run_summary(results)
+
+    return results
+
+
+def main():
+    # Full pipeline in its usual order (Automation_Batch.bat runs `python -u main.py`)
+    run_jobs(build_jobs(PIPELINE_ORDER))
 
 
 if __name__ == "__main__":
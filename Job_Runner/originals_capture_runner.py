@@ -2,16 +2,14 @@
 
 import os
 import sys
+from typing import Optional
 
-from Utils.pretty_print import sub
-from Utils.originals_capture_csv import run_originals_capture
-
-# 1. Ensure project root is on PYTHONPATH BEFORE importing Utils
+# Ensure project root is on PYTHONPATH BEFORE importing Utils
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
-print(f"[runner] Project root on sys.path: {ROOT}")
+from Utils.pretty_print import sub  # noqa: E402
 
 
 class OriginalsCaptureJob:
@@ -21,6 +19,10 @@ class OriginalsCaptureJob:
     It assumes:
     - Transaction Master CSV is written to Output_Files/transaction_master.csv
     - Originals CSV lives at Output_Files/Original_Invoice_Data_CSV.csv
+
+    With source="db" the ENTRY_DATE window is queried from Oracle directly
+    (SQL/originals_window.sql) instead of being filtered out of the
+    Transaction Master CSV.
     """
 
     def __init__(
@@ -30,26 +32,48 @@ class OriginalsCaptureJob:
             "Output_Files", "Original_Invoice_Data_CSV.csv"
         ),
         days_back: int = 30,
+        originals_store_dir: Optional[str] = None,
+        source: str = "csv",
     ):
+        if source not in ("csv", "db"):
+            raise ValueError(f"[OriginalsCaptureJob] source must be 'csv' or 'db', got {source!r}")
+
         self.tm_csv = tm_csv
         self.originals_csv = originals_csv
         self.days_back = days_back
+        # Month-segmented Originals store; None keeps the single Originals CSV
+        self.originals_store_dir = originals_store_dir
+        self.source = source
 
     def run(self, db=None) -> int:
         """
-        db argument is accepted for consistency with other jobs,
-        but not used because this job only deals with CSVs.
+        db argument is accepted for consistency with other jobs; it is
+        only used (and required) when source="db".
 
         Returns
         -------
         int
             Number of rows written to Originals.
         """
-        written = run_originals_capture(
-            transaction_master_csv=self.tm_csv,
-            originals_csv=self.originals_csv,
-            days_back=self.days_back,
-        )
+        # Imported here so that importing the runner does not pull in pandas
+        from Utils.originals_capture_csv import run_originals_capture, run_originals_capture_from_db
+
+        if self.source == "db":
+            if db is None:
+                raise ValueError("[OriginalsCaptureJob] source='db' needs a connected db.")
+            written = run_originals_capture_from_db(
+                db,
+                originals_csv=self.originals_csv,
+                days_back=self.days_back,
+                originals_store_dir=self.originals_store_dir,
+            )
+        else:
+            written = run_originals_capture(
+                transaction_master_csv=self.tm_csv,
+                originals_csv=self.originals_csv,
+                days_back=self.days_back,
+                originals_store_dir=self.originals_store_dir,
+            )
         sub(f"[OriginalsCaptureJob] Completed. Rows written: {written}")
         return written
 
@@ -58,8 +82,6 @@ def main():
     """
     Allow this runner to be executed directly from the command line.
     """
-    print("[runner] main() starting")
-
     job = OriginalsCaptureJob(
         tm_csv=os.path.join("Output_Files", "transaction_master.csv"),
         originals_csv=os.path.join(
@@ -69,9 +91,6 @@ def main():
     )
     job.run(db=None)
 
-    print("[runner] main() finished")
-
 
 if __name__ == "__main__":
-    print("[runner] __name__ == '__main__' -> calling main()")
     main()
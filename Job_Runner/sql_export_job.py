@@ -0,0 +1,302 @@
+from Utils.csv_io import parquet_sibling
+from Utils.export import ParquetBatchWriter, export_to_csv, compressed_filename, resolve_compression
+from Utils.progress import ProgressTracker
+from Utils.export_checkpoint import ExportCheckpoint
+from Utils.flag_file import Flagfile
+from Utils.sql_loader import load_sql
+from Utils.run_manifest import (
+    get_export_entry,
+    new_result_digest,
+    output_matches_entry,
+    record_export,
+    timestamp,
+)
+from Utils.pretty_print import sub
+from Utils.timer import ElapsedTimer
+import functools
+import os
+
+# Outcomes returned by SqlExportJob.run (None means the run failed)
+EXPORT_CHANGED = "changed"
+EXPORT_UNCHANGED = "unchanged"
+
+PARTIAL_SUFFIX = ".partial"
+
+OUTPUT_FORMATS = ("csv", "parquet")
+DEFAULT_FETCH_SIZE = 10000
+
+
+# Shared run logic for the SQL export jobs (Vendor, Transaction and Layout Master).
+# Each job loads its SQL file, counts the expected rows, streams the result in
+# batches to a CSV under Output_Files/ and writes done.txt when every row arrived.
+#
+# Batches are written to <output>.partial while a digest of the result stream
+# is computed. If the digest matches the previous run (Output_Files/run_manifest.json)
+# the partial file is discarded, the live output is left untouched and no
+# done.txt is written, so the Power BI refresh is skipped too.
+#
+# Every written batch is checkpointed; with resume=True an interrupted export
+# continues from the last checkpoint instead of starting over.
+#
+# output_format="parquet" writes <stem>.parquet instead (all-string columns,
+# see Utils.export.ParquetBatchWriter); fetch_size sets the rows fetched per
+# round trip and written per batch.
+class SqlExportJob:
+    def __init__(self, sql_file, output_file, label, flag_message, compression=None, params=None,
+                 resume=False, output_format="csv", fetch_size=DEFAULT_FETCH_SIZE):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unsupported output format '{output_format}'. Choose from: {', '.join(OUTPUT_FORMATS)}"
+            )
+        self.sql_file = sql_file
+        # Overrides for the bind variables declared in the SQL file (e.g. start_date)
+        self.params = params
+        self.label = label
+        self.flag_message = flag_message
+        self.output_format = output_format
+        if output_format == "parquet":
+            # Parquet compresses internally (snappy)
+            self.compression = None
+            self.output_file = parquet_sibling(output_file)
+        else:
+            # None, "gzip" or "zstd"; the output name gets the codec suffix (e.g. .csv.gz)
+            self.compression = resolve_compression(compression)
+            self.output_file = compressed_filename(output_file, self.compression)
+        # Continue an interrupted export from its last checkpoint (see Utils.export_checkpoint).
+        # A Parquet file cannot be reopened for appending, so Parquet exports always start over.
+        self.resume = resume and output_format == "csv"
+        self.fetch_size = fetch_size
+        self._parquet_writer = None
+
+    def run(self, db):
+        # start measuring how long the job takes to run
+        timer = ElapsedTimer()
+        timer.start()
+
+        try:
+            query, params = self._load_query()
+
+            total_expected_rows = db.get_row_count(query, params)
+            print(f"Estimated total rows: {total_expected_rows:,}")
+
+            checkpoint = self._checkpoint(query, params)
+            fetch_query, fetch_params, resumed = checkpoint.start(query, params, resume=self.resume)
+
+            progress = ProgressTracker(total_rows=total_expected_rows)
+            digest = None
+
+            for columns, rows in db.run_in_batches(fetch_query, batch_size=self.fetch_size, params=fetch_params):
+                if digest is None:
+                    digest = new_result_digest(columns)
+                self._write_batch(columns, *checkpoint.take(columns, rows), checkpoint, digest)
+                progress.update(checkpoint.rows)
+
+            if digest is not None:
+                self._write_batch(columns, *checkpoint.drain(), checkpoint, digest)
+            total_rows_processed = checkpoint.rows
+
+            timer.stop()
+            progress.finish()
+            print(f"\nRows exported: {total_rows_processed:,}")
+            print(f"Elapsed time: {timer.get_elapsed_time()}")
+
+            outcome = self._complete(checkpoint, digest, resumed)
+
+            if outcome == EXPORT_CHANGED and total_rows_processed == total_expected_rows:
+                self._write_flag()
+            return outcome
+
+        except Exception as e:
+            self._close_writer()
+            print(f"{self.label} Error:", e)
+        finally:
+            # db.close()
+            print(f"{self.label} run complete.")
+
+    async def run_async(self, adb, executor=None, write_flag=True):
+        """
+        asyncio version of run() for Core.async_database.AsyncOracleConnection.
+
+        Batches are fetched on the event loop while the previous batch is
+        written (CSV rendering, compression, hashing) in `executor`, so
+        several exports can stream side by side. Unlike run(), errors are
+        raised so the job graph can see them, and a row-count mismatch is an
+        error. Returns EXPORT_CHANGED or EXPORT_UNCHANGED.
+        """
+        import asyncio  # only the async runner pays for importing asyncio
+
+        loop = asyncio.get_running_loop()
+        timer = ElapsedTimer()
+        timer.start()
+
+        query, params = self._load_query()
+        total_expected_rows = await adb.get_row_count(query, params)
+        sub(f"[{self.label}] Estimated total rows: {total_expected_rows:,}")
+
+        checkpoint = self._checkpoint(query, params)
+        fetch_query, fetch_params, resumed = checkpoint.start(query, params, resume=self.resume)
+
+        digest = None
+        pending_write = None
+
+        try:
+            async for columns, rows in adb.run_in_batches(fetch_query, batch_size=self.fetch_size, params=fetch_params):
+                if digest is None:
+                    digest = new_result_digest(columns)
+                # Taken while the previous batch may still be committing in
+                # the executor; its key flag travels with it to commit()
+                ready, key_is_complete = checkpoint.take(columns, rows)
+                if pending_write is not None:
+                    await pending_write
+                pending_write = loop.run_in_executor(
+                    executor,
+                    functools.partial(self._write_batch, columns, ready, key_is_complete, checkpoint, digest),
+                )
+            if pending_write is not None:
+                await pending_write
+            if digest is not None:
+                await loop.run_in_executor(
+                    executor,
+                    functools.partial(self._write_batch, columns, *checkpoint.drain(), checkpoint, digest),
+                )
+        except BaseException:
+            if pending_write is not None and not pending_write.done():
+                # Let the in-flight write finish before the caller unwinds
+                await asyncio.shield(pending_write)
+            self._close_writer()
+            raise
+
+        total_rows_processed = checkpoint.rows
+        timer.stop()
+        sub(f"[{self.label}] Rows exported: {total_rows_processed:,} in {timer.get_elapsed_time()}")
+
+        outcome = await loop.run_in_executor(executor, self._complete, checkpoint, digest, resumed)
+        if total_rows_processed != total_expected_rows:
+            raise RuntimeError(
+                f"{self.label}: expected {total_expected_rows:,} rows, exported {total_rows_processed:,}."
+            )
+        if outcome == EXPORT_CHANGED and write_flag:
+            self._write_flag()
+        return outcome
+
+    def _load_query(self):
+        os.makedirs("Output_Files", exist_ok=True)
+
+        query, params = load_sql(self.sql_file, self.params)
+        print(f"Loaded SQL from {self.sql_file}")
+        if params:
+            print(f"Bind parameters: {params}")
+        return query, params
+
+    def _checkpoint(self, query, params):
+        partial_path = os.path.join("Output_Files", self.output_file + PARTIAL_SUFFIX)
+        return ExportCheckpoint(partial_path, query, params, self.compression)
+
+    def _write_batch(self, columns, rows, key_is_complete, checkpoint, digest):
+        """
+        Append rows to the partial file (header on the first write) and
+        checkpoint them with the key flag checkpoint.take() returned.
+        """
+        if not rows:
+            return
+        if self.output_format == "parquet":
+            if self._parquet_writer is None:
+                self._parquet_writer = ParquetBatchWriter(self.output_file + PARTIAL_SUFFIX)
+            self._parquet_writer.write(columns, rows, digest=digest)
+            checkpoint.commit(rows, key_is_complete)
+            return
+        export_to_csv(
+            columns,
+            rows,
+            filename=self.output_file + PARTIAL_SUFFIX,
+            append=checkpoint.rows > 0,
+            log_progress=False,
+            compression=self.compression,
+            digest=digest,
+        )
+        checkpoint.commit(rows, key_is_complete)
+
+    def _close_writer(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def _complete(self, checkpoint, digest, resumed):
+        self._close_writer()
+        if checkpoint.rows == 0:
+            print(f"{self.label}: query returned no rows; output left untouched.")
+            checkpoint.discard()
+            return None
+
+        # A resumed run only hashed the rows fetched after the checkpoint,
+        # so its digest cannot be compared with a full run's.
+        outcome = self._finalize(
+            checkpoint.partial_path,
+            os.path.join("Output_Files", self.output_file),
+            None if resumed else digest.hexdigest(),
+            checkpoint.rows,
+            order_by=checkpoint.order_keys,
+        )
+        checkpoint.clear()
+        return outcome
+
+    def _write_flag(self):
+        Flagfile.create(
+            path=os.path.join("Output_Files", "done.txt"),
+            message=self.flag_message
+        )
+
+    def _finalize(self, partial_path, output_path, digest_hex, rows, order_by=None):
+        """
+        Promote the partial file, or drop it when the result matches the last run.
+
+        `order_by` ([(column, "ASC"|"DESC"), ...] or None) is recorded with
+        the file's size and mtime so readers can rely on the row order
+        (see Utils.sorted_scan).
+        """
+        previous = get_export_entry(output_path)
+        order_by = [list(key) for key in order_by] if order_by else None
+
+        if digest_hex is not None and output_matches_entry(output_path, previous, digest_hex):
+            os.remove(partial_path)
+            record_export(
+                output_path,
+                checked_at=timestamp(),
+                changed=False,
+                order_by=order_by,
+                mtime=os.path.getmtime(output_path),
+            )
+            print(
+                f"{self.label}: result unchanged since {previous.get('updated_at')}; "
+                f"{output_path} left untouched."
+            )
+            return EXPORT_UNCHANGED
+
+        os.replace(partial_path, output_path)
+        now = timestamp()
+        record_export(
+            output_path,
+            digest=digest_hex,
+            rows=rows,
+            bytes=os.path.getsize(output_path),
+            mtime=os.path.getmtime(output_path),
+            order_by=order_by,
+            updated_at=now,
+            checked_at=now,
+            changed=True,
+            resumed=digest_hex is None,
+        )
+        return EXPORT_CHANGED
+
+
+def run_standalone(job):
+    """Run one export job on its own connection (the runners' main())."""
+    from Config.db_config import get_db_config
+    from Core.database import OracleConnection
+
+    db = OracleConnection(get_db_config())
+    db.connect()
+    try:
+        return job.run(db)
+    finally:
+        db.close()
@@ -0,0 +1,20 @@
+-- :cutoff_date
+SELECT
+h.DOCID AS DOC_ID,
+h.DOCTYPE AS INVOICE_TYPE,
+h.INDEX_DATE AS ENTRY_DATE,
+h.BUKRS AS  COMPANY_CODE,
+h.BLDAT AS DOC_DATE,
+h.XBLNR AS INVOICE_NUMBER,
+h.RMWWR AS AMOUNT,
+h.LIFNR AS VENDOR_NUM,
+h.VEND_NAME AS VENDOR_NAME_1,
+h.VEND_NAME2 AS VENDOR_NAME_2,
+h.EBELN AS PO_NUM,
+h.VENDOR_VAT_NO AS ABN,
+h.SNAPSHOT_DT AS DSS_DOWNLOAD_DATE,
+t.OBJTXT AS STATUS_TEXT
+FROM DSS.VIM_1HEAD_2HEAD_VW h
+LEFT JOIN DSS.VIM_STG_T101T_VW t ON h.STATUS = t.STATUSID
+WHERE h.INDEX_DATE >= :cutoff_date
+ORDER BY h.INDEX_DATE DESC, h.BUDAT DESC
@@ -1,3 +1,4 @@
+-- :start_date = 2023-07-01
 
 SELECT
 h.DOCID AS DOC_ID,
@@ -34,5 +35,5 @@ FROM DSS.VIM_1HEAD_2HEAD_VW h
 LEFT JOIN DSS.VIM_STG_T101T_VW t ON h.STATUS = t.STATUSID
 LEFT JOIN DSS.ps4_ekko_lastchangedatetime_vw e ON e.EBELN = h.EBELN
 LEFT JOIN DSS.vim_otx_pf01_t_1reg_ap_vw r ON r.target_projkey = h.DOCID
-WHERE h.index_date >= TO_DATE('2023-07-01', 'YYYY-MM-DD') OR h.BUDAT >= TO_DATE('2023-07-01', 'YYYY-MM-DD')
+WHERE h.index_date >= TO_DATE(:start_date, 'YYYY-MM-DD') OR h.BUDAT >= TO_DATE(:start_date, 'YYYY-MM-DD')
 ORDER BY ENTRY_DATE DESC, BUDAT DESC
\ No newline at end of file
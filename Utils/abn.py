@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# Australian Business Number (ABN) check digits, vectorised.
+#
+# An ABN is 11 digits. It is valid when, after subtracting 1 from the first
+# digit, the digits weighted by ABN_WEIGHTS sum to a multiple of 89 (the
+# ATO's published modulus-89 rule). Spaces are ignored ('51 824 753 556').
+#
+# Values are turned into an (n, 11) digit matrix - the well-formed strings
+# are joined into one ASCII buffer and viewed as bytes - and checked with a
+# single matrix-vector product, so millions of ABNs validate in well under a
+# second. Whitespace is only stripped from values that are not already 11
+# digits, which keeps the clean majority off the regex path.
+
+ABN_WEIGHTS = np.array([10, 1, 3, 5, 7, 9, 11, 13, 15, 17, 19], dtype=np.int64)
+ABN_LENGTH = len(ABN_WEIGHTS)
+
+
+def _as_text(values) -> pd.Series:
+    """Values as strings with missing values kept missing (pandas 2 casts NaN to 'nan')."""
+    series = pd.Series(values)
+    return series.astype("str").where(series.notna())
+
+
+def _well_formed(text: pd.Series) -> np.ndarray:
+    is_abn = (text.str.len() == ABN_LENGTH) & text.str.isdigit()
+    return is_abn.fillna(False).to_numpy(dtype=bool, copy=True)
+
+
+def _check(text: pd.Series) -> np.ndarray:
+    well_formed = _well_formed(text)
+
+    retry = ~well_formed & text.notna().to_numpy()
+    if retry.any():
+        cleaned = text[retry].str.replace(r"\s+", "", regex=True)
+        text = text.copy()
+        text[retry] = cleaned
+        well_formed[retry] = _well_formed(cleaned)
+
+    valid = np.zeros(len(text), dtype=bool)
+    if not well_formed.any():
+        return valid
+
+    # Non-ASCII digits (isdigit() accepts them) become '?' and fail the range check
+    buffer = "".join(text[well_formed].tolist()).encode("ascii", errors="replace")
+    digits = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, ABN_LENGTH).astype(np.int64) - ord("0")
+    ascii_digits = ((digits >= 0) & (digits <= 9)).all(axis=1)
+    digits[:, 0] -= 1
+    valid[well_formed] = ascii_digits & (digits[:, 0] >= 0) & ((digits @ ABN_WEIGHTS) % 89 == 0)
+    return valid
+
+
+def abn_is_valid(values) -> np.ndarray:
+    """
+    Boolean array: True where the value is a valid ABN. Missing, blank and
+    malformed values are False.
+    """
+    return _check(_as_text(values))
+
+
+def abn_invalid_flags(values) -> np.ndarray:
+    """
+    0/1 flags: 1 where an ABN is present but fails the check; missing or
+    blank values are 0 (a missing ABN is not a misread).
+    """
+    text = _as_text(values)
+    present = text.str.strip().fillna("").ne("").to_numpy(dtype=bool)
+    return (present & ~_check(text)).astype(int)
+
+
+def make_valid_abns(bodies) -> np.ndarray:
+    """
+    Complete 9-digit bodies (0..999,999,999) into valid 11-digit ABNs by
+    choosing the two leading check digits, as the ATO does.
+    """
+    bodies = np.asarray(bodies, dtype=np.int64)
+    body_digits = (bodies[:, None] // 10 ** np.arange(8, -1, -1)) % 10
+    remainder = (-(body_digits @ ABN_WEIGHTS[2:])) % 89
+    # 10 * (first digit - 1) + second digit must equal the remainder (0..88)
+    first, second = remainder // 10 + 1, remainder % 10
+    abns = first * 10**10 + second * 10**9 + bodies
+    return abns.astype(str)
@@ -0,0 +1,242 @@
+import csv
+import json
+import os
+import shutil
+from datetime import datetime
+
+import pandas as pd
+
+from Utils.pretty_print import sub
+
+# Crash-safe appends for the append-only CSV datasets (Originals, Changed Data).
+#
+# An append is done in three durable steps:
+#   1. The new rows are written to a temp segment file next to the target
+#      and fsynced.
+#   2. A journal recording the target's size before the append (and the
+#      expected segment size) is written and fsynced.
+#   3. The segment bytes are appended to the target and fsynced, then the
+#      journal and segment are removed.
+#
+# If a run dies at any point, recover_pending_append() finds the journal on
+# the next run and either replays the batch (segment intact) or rolls the
+# target back to its pre-append size. Both cost O(last batch), instead of
+# reading and rewriting the whole multi-million-row file.
+#
+# Appended rows are aligned to the target's header: columns are put in the
+# file's order and columns the batch lacks are left empty. Columns the file
+# does not have are a schema change for everything reading it (e.g. Power
+# BI), so they are only added when the caller opts in (upgrade_header=True):
+# the whole file is rewritten once, with the new columns at the end of the
+# header and empty values in earlier rows. Otherwise they are dropped from
+# the batch. Either way the change is logged as a warning.
+
+SEGMENT_SUFFIX = ".segment"
+JOURNAL_SUFFIX = ".journal"
+UPGRADE_SUFFIX = ".upgrade"
+
+
+def _fsync_dir(path: str) -> None:
+    """Persist directory entries (new/renamed files). Not supported on Windows."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _remove_if_exists(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _copy_segment(segment_path: str, target_path: str) -> None:
+    """Append the segment's bytes to the target and fsync it."""
+    with open(segment_path, "rb") as src, open(target_path, "ab") as dst:
+        shutil.copyfileobj(src, dst, length=1024 * 1024)
+        dst.flush()
+        os.fsync(dst.fileno())
+
+
+def recover_pending_append(path: str, replay: bool = True) -> str:
+    """
+    Resolve an append to `path` that was interrupted by a crash.
+
+    Parameters
+    ----------
+    path : str
+        The live CSV file.
+    replay : bool
+        If True (default) and the journalled segment is intact, re-apply the
+        batch. Otherwise roll the file back to its size before the append.
+
+    Returns
+    -------
+    str
+        "clean", "replayed" or "rolled_back".
+    """
+    journal_path = path + JOURNAL_SUFFIX
+    segment_path = path + SEGMENT_SUFFIX
+
+    if not os.path.exists(journal_path):
+        # A segment without a journal was never committed: the target is untouched
+        if os.path.exists(segment_path):
+            os.remove(segment_path)
+            sub(f"[atomic_append] Discarded uncommitted segment for {path}.")
+        return "clean"
+
+    with open(journal_path, "r", encoding="utf-8") as f:
+        journal = json.load(f)
+
+    original_size = journal["original_size"]
+
+    # Undo whatever part of the append reached the target
+    if os.path.exists(path):
+        with open(path, "r+b") as f:
+            f.truncate(original_size)
+            f.flush()
+            os.fsync(f.fileno())
+
+    segment_intact = (
+        os.path.exists(segment_path)
+        and os.path.getsize(segment_path) == journal["segment_size"]
+    )
+
+    if replay and segment_intact:
+        _copy_segment(segment_path, path)
+        outcome = "replayed"
+    else:
+        if not journal["target_existed"]:
+            _remove_if_exists(path)
+        outcome = "rolled_back"
+
+    _remove_if_exists(journal_path)
+    _remove_if_exists(segment_path)
+    _fsync_dir(path)
+
+    sub(
+        f"[atomic_append] Recovered interrupted append to {path}: {outcome} "
+        f"({journal['rows']:,} row(s) from {journal['created_at']})."
+    )
+    return outcome
+
+
+def read_csv_header(path: str) -> list:
+    """Column names of the CSV at `path` ([] when it is missing or empty)."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def upgrade_csv_header(path: str, new_columns: list) -> None:
+    """
+    Add `new_columns` at the end of the CSV's header, with empty values in
+    every existing row. The file is rewritten next to the target and
+    renamed into place, so a crash leaves either the old or the new file.
+    """
+    header = read_csv_header(path)
+    sub(
+        f"[atomic_append] WARNING: schema change in '{path}': adding column(s) "
+        f"{list(new_columns)} to its header {header}. Every existing row is "
+        "rewritten with empty values for them; refresh downstream consumers."
+    )
+    tmp_path = path + UPGRADE_SUFFIX
+    padding = [""] * len(new_columns)
+    with open(path, "r", newline="", encoding="utf-8") as src, \
+            open(tmp_path, "w", newline="", encoding="utf-8") as dst:
+        reader = csv.reader(src)
+        writer = csv.writer(dst, lineterminator=os.linesep)
+        writer.writerow(next(reader) + list(new_columns))
+        rows = 0
+        for row in reader:
+            writer.writerow(row + padding)
+            rows += 1
+        dst.flush()
+        os.fsync(dst.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+    sub(f"[atomic_append] Added column(s) {list(new_columns)} to '{path}' ({rows:,} existing row(s)).")
+
+
+def align_to_header(path: str, df: pd.DataFrame, upgrade_header: bool = False) -> pd.DataFrame:
+    """
+    Return `df` with the columns of the CSV at `path`, in its order. Columns
+    the file does not have yet are added to it first (upgrade_csv_header)
+    when `upgrade_header` is set, and dropped from `df` otherwise.
+    """
+    header = read_csv_header(path)
+    if not header or list(df.columns) == header:
+        return df
+
+    new_columns = [c for c in df.columns if c not in header]
+    if new_columns and upgrade_header:
+        upgrade_csv_header(path, new_columns)
+        header = header + new_columns
+    elif new_columns:
+        sub(
+            f"[atomic_append] WARNING: column(s) {new_columns} are not in the "
+            f"header of '{path}' and were not written. Enable the header "
+            "upgrade to add them to the file."
+        )
+    return df.reindex(columns=header)
+
+
+def atomic_append_csv(path: str, df: pd.DataFrame, upgrade_header: bool = False) -> int:
+    """
+    Append `df` to the CSV at `path` (header only when the file is new),
+    crash-safely and aligned to the file's columns (align_to_header; with
+    `upgrade_header`, columns the file lacks are added to it). Returns the
+    number of rows appended.
+    """
+    if df.empty:
+        return 0
+
+    recover_pending_append(path)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    journal_path = path + JOURNAL_SUFFIX
+    segment_path = path + SEGMENT_SUFFIX
+
+    target_existed = os.path.exists(path)
+    if target_existed:
+        df = align_to_header(path, df, upgrade_header)
+
+    # 1. Durable segment (fsynced through the writing handle: Windows refuses
+    #    os.fsync on a file opened read-only)
+    with open(segment_path, "w", newline="", encoding="utf-8") as f:
+        df.to_csv(f, header=not target_existed, index=False)
+        f.flush()
+        os.fsync(f.fileno())
+
+    # 2. Durable journal (written to a temp name, then renamed into place)
+    journal = {
+        "target_existed": target_existed,
+        "original_size": os.path.getsize(path) if target_existed else 0,
+        "segment_size": os.path.getsize(segment_path),
+        "rows": len(df),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    journal_tmp = journal_path + ".tmp"
+    with open(journal_tmp, "w", encoding="utf-8") as f:
+        json.dump(journal, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(journal_tmp, journal_path)
+    _fsync_dir(path)
+
+    # 3. Commit: append the segment, then clear the journal
+    _copy_segment(segment_path, path)
+    os.remove(journal_path)
+    os.remove(segment_path)
+    _fsync_dir(path)
+
+    return len(df)
@@ -0,0 +1,60 @@
+import os
+from typing import Optional
+
+from Utils.pretty_print import sub
+
+# Which engine runs the CSV-based capture jobs (Originals, Changed Data).
+#
+#   - "pandas": load the files into DataFrames and diff them in memory
+#     (Utils.originals_capture_csv, Utils.changed_data_csv); the default
+#   - "duckdb": run the same logic as DuckDB queries over the files
+#     (Utils.duckdb_backend); falls back to pandas when duckdb is not
+#     installed
+# Both write identical files. Kept free of heavy imports so main.py can
+# offer the choice without loading pandas.
+
+CAPTURE_ENGINES = ("pandas", "duckdb")
+CAPTURE_ENGINE_ENV = "PIOR_CAPTURE_ENGINE"
+
+
+def set_capture_engine(engine: str) -> None:
+    """
+    Choose how Originals and Changed Data capture run: "pandas" or "duckdb".
+    Stored in the environment so worker processes see it too.
+    """
+    if engine not in CAPTURE_ENGINES:
+        raise ValueError(
+            f"Unsupported capture engine '{engine}'. Choose from: {', '.join(CAPTURE_ENGINES)}"
+        )
+    os.environ[CAPTURE_ENGINE_ENV] = engine
+
+
+def get_capture_engine() -> str:
+    engine = os.environ.get(CAPTURE_ENGINE_ENV, "pandas") or "pandas"
+    if engine not in CAPTURE_ENGINES:
+        raise ValueError(
+            f"{CAPTURE_ENGINE_ENV}={engine!r} is not a capture engine. "
+            f"Choose from: {', '.join(CAPTURE_ENGINES)}"
+        )
+    return engine
+
+
+def _has_duckdb() -> bool:
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_capture_engine(engine: Optional[str] = None) -> str:
+    """`engine` (default: the configured one), or "pandas" when DuckDB is unavailable."""
+    engine = engine or get_capture_engine()
+    if engine not in CAPTURE_ENGINES:
+        raise ValueError(
+            f"Unsupported capture engine '{engine}'. Choose from: {', '.join(CAPTURE_ENGINES)}"
+        )
+    if engine == "duckdb" and not _has_duckdb():
+        sub("[duckdb] duckdb is not installed; using the pandas engine.")
+        return "pandas"
+    return engine
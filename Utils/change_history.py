@@ -0,0 +1,441 @@
+import glob
+import os
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from Utils.changed_data_csv import CHANGED_COMPARE_COLUMNS
+from Utils.csv_io import read_table, resolve_csv_path
+from Utils.packed_strings import hash_strings
+from Utils.pretty_print import step_header, sub
+
+# Change history (SCD type 2) of the Transaction Master, per DOC_ID.
+#
+# Changed Data records a DOC_ID once, against its Originals snapshot, so a
+# second correction to the same invoice is never seen. The history store
+# keeps every change instead, without daily copies of the Transaction
+# Master:
+#   - a shared string dictionary: every distinct DOC_ID and column value
+#     gets an int32 id the first time it is seen,
+#   - one run file per run (runs/run_000001.npz) with the run's new
+#     dictionary strings, an INSERT record (all tracked values) per DOC_ID
+#     seen for the first time, and an UPDATE record (DOC_ID, column code,
+#     old value id, new value id) per changed cell,
+#   - state.npz: the latest value ids per DOC_ID, so a run only compares
+#     today's Transaction Master against one int32 matrix.
+#
+# ChangeHistory loads the run files for queries: an invoice at any point in
+# time is its INSERT plus the last UPDATE per column up to then, and "what
+# changed between X and Y" is a filter on the UPDATE records' run times.
+#
+# A run is committed when state.npz is replaced. Run files newer than the
+# state's last run (being written, or left by a crash) are ignored when
+# loading, and only record_change_history deletes them, before its run:
+# a reader must not delete the file a concurrent run has not committed yet.
+
+HISTORY_VERSION = 1
+RUN_FILE_PATTERN = "run_{:06d}.npz"
+STATE_FILE = "state.npz"
+RUNS_DIR = "runs"
+
+# Value id of a missing value
+MISSING = -1
+
+
+def _state_path(history_dir: str) -> str:
+    return os.path.join(history_dir, STATE_FILE)
+
+
+def _run_paths(history_dir: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(history_dir, RUNS_DIR, RUN_FILE_PATTERN.replace("{:06d}", "*"))))
+
+
+def _run_id(path: str) -> int:
+    return int(os.path.basename(path)[len("run_"):-len(".npz")])
+
+
+def _committed_run_paths(history_dir: str, last_run: int) -> List[str]:
+    return [path for path in _run_paths(history_dir) if _run_id(path) <= last_run]
+
+
+def _save_npz(path: str, **arrays) -> None:
+    """np.savez to a temp file, fsync, then rename into place."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _join_strings(strings: list) -> np.ndarray:
+    """New dictionary strings as one NUL-separated UTF-8 blob."""
+    return np.frombuffer("\x00".join(strings).encode("utf-8"), dtype=np.uint8)
+
+
+def _split_strings(blob: np.ndarray, count: int) -> list:
+    return blob.tobytes().decode("utf-8").split("\x00") if count else []
+
+
+class StringDictionary:
+    """
+    Append-only string <-> int32 id mapping shared by all runs.
+
+    Lookups go through a uint64 hash index (Utils.packed_strings, as the
+    duplicate-invoice index) and are verified against the stored string; the rare string
+    whose hash collides with an earlier one is kept in a small exact dict.
+    """
+
+    def __init__(self, strings: Optional[list] = None, hashes: Optional[np.ndarray] = None):
+        self.strings = []
+        self._hashes = np.zeros(0, dtype=np.uint64)
+        self._index = pd.Index(self._hashes)
+        self._ids = np.zeros(0, dtype=np.int32)
+        self._exact = {}
+        self._array = None
+        if strings:
+            self._append(list(strings), hash_strings(strings) if hashes is None else hashes)
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    @property
+    def hashes(self) -> np.ndarray:
+        return self._hashes
+
+    def _strings_array(self) -> np.ndarray:
+        if self._array is None:
+            self._array = np.asarray(self.strings + [None], dtype=object)
+        return self._array
+
+    def _append(self, strings: list, hashes: np.ndarray) -> None:
+        first_id = len(self.strings)
+        self.strings.extend(strings)
+        self._hashes = np.concatenate([self._hashes, hashes])
+        self._array = None
+
+        # A hash already taken (by a different string) goes to the exact dict
+        taken = (self._index.get_indexer(hashes) >= 0) | pd.Index(hashes).duplicated()
+        for i in np.flatnonzero(taken):
+            self._exact[strings[i]] = first_id + i
+        keep = np.flatnonzero(~taken)
+        self._index = self._index.append(pd.Index(hashes[keep]))
+        self._ids = np.concatenate([self._ids, (first_id + keep).astype(np.int32)])
+
+    def _find(self, values: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+        positions = self._index.get_indexer(hashes)
+        ids = np.full(len(values), MISSING, dtype=np.int32)
+        ids[positions >= 0] = self._ids[positions[positions >= 0]]
+
+        found = np.flatnonzero(ids != MISSING)
+        collided = found[self._strings_array()[ids[found]] != values[found]]
+        ids[collided] = MISSING
+        if self._exact:
+            for i in np.flatnonzero(ids == MISSING):
+                ids[i] = self._exact.get(values[i], MISSING)
+        return ids
+
+    def _ids_for(self, strings: np.ndarray) -> np.ndarray:
+        """Ids of `strings` (object array, no missing values), adding unseen ones."""
+        hashes = hash_strings(strings)
+        ids = self._find(strings, hashes)
+
+        unseen = np.flatnonzero(ids == MISSING)
+        if len(unseen):
+            inverse, new_strings = pd.factorize(strings[unseen])
+            first = np.full(len(new_strings), len(unseen))
+            np.minimum.at(first, inverse, np.arange(len(unseen)))
+            ids[unseen] = len(self.strings) + inverse
+            self._append(list(new_strings), hashes[unseen][first])
+        return ids
+
+    def encode_columns(self, frame: pd.DataFrame) -> np.ndarray:
+        """
+        (rows, columns) int32 value ids of `frame`, adding unseen strings;
+        missing -> MISSING. Each column is factorized first, so only its
+        distinct values are hashed and looked up.
+        """
+        # The raw column is factorized so missing values map to the -1
+        # sentinel; only the non-null uniques are cast (pandas 2 casts NaN
+        # to 'nan')
+        factorized = [pd.factorize(frame[c], use_na_sentinel=True) for c in frame.columns]
+        uniques = [pd.Index(u).astype("str") for _, u in factorized]
+        # NUL separates the strings in the run files
+        uniques = [
+            u.str.replace("\x00", "", regex=False) if u.str.contains("\x00", regex=False).any() else u
+            for u in uniques
+        ]
+        offsets = np.cumsum([0] + [len(u) for u in uniques])
+
+        strings = (
+            np.concatenate([u.to_numpy(dtype=object) for u in uniques]) if uniques else np.zeros(0, dtype=object)
+        )
+        ids = self._ids_for(strings)
+
+        codes = np.full((len(frame), len(factorized)), MISSING, dtype=np.int32)
+        for i, (column_codes, _) in enumerate(factorized):
+            present = column_codes >= 0
+            codes[present, i] = ids[offsets[i] + column_codes[present]]
+        return codes
+
+    def lookup(self, values: Iterable) -> np.ndarray:
+        """Value ids of existing strings, MISSING for unknown ones (adds nothing)."""
+        strings = pd.Series(list(values), dtype=object).astype(str).to_numpy(dtype=object)
+        return self._find(strings, hash_strings(strings))
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Strings of `codes` (object array); MISSING -> None."""
+        return self._strings_array()[np.where(codes == MISSING, len(self.strings), codes)]
+
+
+def _discard_uncommitted_runs(history_dir: str, last_run: int) -> None:
+    for path in _run_paths(history_dir):
+        if _run_id(path) > last_run:
+            os.remove(path)
+            sub(f"[ChangeHistory] Discarded uncommitted run file '{path}'.")
+
+
+def _load_state(history_dir: str):
+    """
+    (last_run, columns, docs, values, dictionary) of the committed history.
+    Uncommitted run files are skipped, not deleted.
+    """
+    state_path = _state_path(history_dir)
+    if not os.path.exists(state_path):
+        return 0, [], np.zeros(0, np.int32), np.zeros((0, 0), np.int32), StringDictionary()
+
+    with np.load(state_path, allow_pickle=False) as data:
+        version, last_run, dictionary_size = data["meta"].tolist()
+        if version != HISTORY_VERSION:
+            raise ValueError(
+                f"[ChangeHistory] '{state_path}' has version {version}, expected {HISTORY_VERSION}."
+            )
+        columns, docs, values = data["columns"].tolist(), data["docs"], data["values"]
+
+    strings, hashes = [], []
+    for path in _committed_run_paths(history_dir, last_run):
+        with np.load(path, allow_pickle=False) as run:
+            strings.extend(_split_strings(run["strings"], int(run["n_strings"])))
+            hashes.append(run["string_hashes"])
+    if len(strings) != dictionary_size:
+        raise ValueError(
+            f"[ChangeHistory] Run files hold {len(strings):,} dictionary string(s), "
+            f"state expects {dictionary_size:,}. The history in '{history_dir}' is incomplete."
+        )
+    return last_run, columns, docs, values, StringDictionary(strings, np.concatenate(hashes))
+
+
+def record_change_history(
+    transaction_master_csv: str,
+    history_dir: str,
+    columns: Optional[List[str]] = None,
+    run_time: Optional[datetime] = None,
+) -> int:
+    """
+    Compare the Transaction Master with the latest recorded state and
+    append one run file with the differences.
+
+    Parameters
+    ----------
+    columns : list of str, optional
+        Columns to track (default CHANGED_COMPARE_COLUMNS). Columns added
+        later start as missing for the DOC_IDs already recorded.
+    run_time : datetime, optional
+        Timestamp of the run (default: now).
+
+    Returns
+    -------
+    int
+        Number of records written: INSERTs for new DOC_IDs plus UPDATEs
+        for changed cells.
+    """
+    step_header("STEP: Change History")
+    tm_path = resolve_csv_path(transaction_master_csv)
+    if not os.path.exists(tm_path):
+        sub(f"[ChangeHistory] {tm_path} not found. Nothing recorded.")
+        return 0
+
+    os.makedirs(os.path.join(history_dir, RUNS_DIR), exist_ok=True)
+    last_run, state_columns, docs, values, dictionary = _load_state(history_dir)
+    _discard_uncommitted_runs(history_dir, last_run)
+
+    tracked = columns or CHANGED_COMPARE_COLUMNS
+    all_columns = state_columns + [c for c in tracked if c not in state_columns]
+    if len(all_columns) > values.shape[1]:
+        values = np.hstack(
+            [values, np.full((len(values), len(all_columns) - values.shape[1]), MISSING, np.int32)]
+        )
+
+    tm = read_table(tm_path, usecols=["DOC_ID", *all_columns])
+    if "DOC_ID" not in tm.columns:
+        raise ValueError("[ChangeHistory] Transaction Master CSV is missing required column 'DOC_ID'.")
+    duplicated = tm["DOC_ID"].duplicated()
+    if duplicated.any():
+        sub(f"[ChangeHistory] Warning: {int(duplicated.sum()):,} duplicate DOC_ID row(s); keeping the first.")
+        tm = tm[~duplicated]
+    tm = tm[tm["DOC_ID"].notna()].reindex(columns=["DOC_ID", *all_columns])
+
+    # Dictionary-encode today's values
+    dictionary_size = len(dictionary)
+    encoded = dictionary.encode_columns(tm)
+    tm_docs, tm_values = encoded[:, 0], np.ascontiguousarray(encoded[:, 1:])
+
+    rows = pd.Index(docs).get_indexer(tm_docs)
+    is_new = rows < 0
+
+    # UPDATEs: cells that differ from the latest state
+    known = np.flatnonzero(~is_new)
+    old = values[rows[known]]
+    new = tm_values[known]
+    changed_row, changed_col = np.nonzero(old != new)
+
+    run_id = last_run + 1
+    run_time = run_time or datetime.now()
+    new_strings = dictionary.strings[dictionary_size:]
+    _save_npz(
+        os.path.join(history_dir, RUNS_DIR, RUN_FILE_PATTERN.format(run_id)),
+        run_time=np.array(run_time.isoformat(timespec="seconds")),
+        columns=np.array(all_columns),
+        n_strings=np.array(len(new_strings)),
+        strings=_join_strings(new_strings),
+        string_hashes=dictionary.hashes[dictionary_size:],
+        insert_doc=tm_docs[is_new],
+        insert_values=tm_values[is_new],
+        update_doc=tm_docs[known[changed_row]],
+        update_col=changed_col.astype(np.int16),
+        update_old=old[changed_row, changed_col],
+        update_new=new[changed_row, changed_col],
+    )
+
+    # Commit: the new state
+    values[rows[known]] = new
+    _save_npz(
+        _state_path(history_dir),
+        meta=np.array([HISTORY_VERSION, run_id, len(dictionary)], dtype=np.int64),
+        columns=np.array(all_columns),
+        docs=np.concatenate([docs, tm_docs[is_new]]),
+        values=np.vstack([values, tm_values[is_new]]),
+    )
+
+    n_inserts, n_updates = int(is_new.sum()), len(changed_row)
+    sub(
+        f"[ChangeHistory] Run {run_id}: {n_inserts:,} new DOC_ID(s), {n_updates:,} changed cell(s) "
+        f"across {len(np.unique(changed_row)):,} DOC_ID(s); {len(new_strings):,} new dictionary string(s)."
+    )
+    return n_inserts + n_updates
+
+
+def _bound(value, end: bool) -> pd.Timestamp:
+    """A date without a time covers the whole day when used as an end bound."""
+    ts = pd.Timestamp(value)
+    if end and ts == ts.normalize():
+        return ts + pd.Timedelta(days=1)
+    return ts + pd.Timedelta(microseconds=1) if end else ts
+
+
+class ChangeHistory:
+    """
+    Read-only view of a change-history store for queries.
+
+    Times (`when`, `start`, `end`) are timestamps or dates; a date as an
+    end bound includes the whole day. Run ids (int) are accepted as well.
+    """
+
+    def __init__(self, history_dir: str):
+        last_run, self.columns, _, _, self.dictionary = _load_state(history_dir)
+        run_ids, run_times, inserts, updates = [], [], [], []
+
+        for path in _committed_run_paths(history_dir, last_run):
+            with np.load(path, allow_pickle=False) as run:
+                run_id = _run_id(path)
+                run_ids.append(run_id)
+                run_times.append(pd.Timestamp(str(run["run_time"])))
+                # Column codes of this run -> codes in the latest column list
+                to_latest = np.array([self.columns.index(c) for c in run["columns"].tolist()], dtype=np.int16)
+
+                insert_values = np.full((len(run["insert_doc"]), len(self.columns)), MISSING, np.int32)
+                insert_values[:, to_latest] = run["insert_values"]
+                inserts.append((np.full(len(insert_values), run_id), run["insert_doc"], insert_values))
+                updates.append(
+                    pd.DataFrame(
+                        {
+                            "RUN_ID": run_id,
+                            "DOC": run["update_doc"],
+                            "COL": to_latest[run["update_col"]] if len(to_latest) else run["update_col"],
+                            "OLD": run["update_old"],
+                            "NEW": run["update_new"],
+                        }
+                    )
+                )
+
+        self.runs = pd.DataFrame({"RUN_ID": run_ids, "RUN_TIME": run_times})
+        self.insert_run = np.concatenate([r for r, _, _ in inserts]) if inserts else np.zeros(0, int)
+        self.insert_doc = np.concatenate([d for _, d, _ in inserts]) if inserts else np.zeros(0, np.int32)
+        self.insert_values = (
+            np.vstack([v for _, _, v in inserts]) if inserts else np.zeros((0, len(self.columns)), np.int32)
+        )
+        self.updates = (
+            pd.concat(updates, ignore_index=True)
+            if updates
+            else pd.DataFrame(columns=["RUN_ID", "DOC", "COL", "OLD", "NEW"])
+        )
+
+    def _run_ids(self, start=None, end=None) -> np.ndarray:
+        """Run ids with start <= run < end (ints are run ids, inclusive)."""
+        mask = np.ones(len(self.runs), dtype=bool)
+        if start is not None:
+            mask &= (
+                (self.runs["RUN_ID"] >= start) if isinstance(start, (int, np.integer))
+                else (self.runs["RUN_TIME"] >= _bound(start, end=False))
+            ).to_numpy()
+        if end is not None:
+            mask &= (
+                (self.runs["RUN_ID"] <= end) if isinstance(end, (int, np.integer))
+                else (self.runs["RUN_TIME"] < _bound(end, end=True))
+            ).to_numpy()
+        return self.runs["RUN_ID"].to_numpy()[mask]
+
+    def as_of(self, when, doc_ids: Optional[Iterable] = None) -> pd.DataFrame:
+        """
+        DOC_ID plus the tracked columns as recorded by the last run at or
+        before `when`, for `doc_ids` (default: every DOC_ID seen by then).
+        """
+        runs = self._run_ids(end=when)
+        inserted = np.isin(self.insert_run, runs)
+        if doc_ids is not None:
+            inserted &= np.isin(self.insert_doc, self.dictionary.lookup(doc_ids))
+
+        docs = self.insert_doc[inserted]
+        values = self.insert_values[inserted].copy()
+
+        updates = self.updates[self.updates["RUN_ID"].isin(runs) & self.updates["DOC"].isin(docs)]
+        latest = updates.drop_duplicates(["DOC", "COL"], keep="last")
+        values[pd.Index(docs).get_indexer(latest["DOC"]), latest["COL"].to_numpy()] = latest["NEW"].to_numpy()
+
+        frame = {"DOC_ID": self.dictionary.decode(docs)}
+        for i, column in enumerate(self.columns):
+            frame[column] = self.dictionary.decode(values[:, i])
+        return pd.DataFrame(frame)
+
+    def changes_between(self, start=None, end=None, doc_ids: Optional[Iterable] = None) -> pd.DataFrame:
+        """
+        Every recorded cell change in runs from `start` to `end`: RUN_ID,
+        RUN_TIME, DOC_ID, FIELD, OLD_VALUE, NEW_VALUE (oldest first).
+        """
+        updates = self.updates[self.updates["RUN_ID"].isin(self._run_ids(start, end))]
+        if doc_ids is not None:
+            updates = updates[updates["DOC"].isin(self.dictionary.lookup(doc_ids))]
+
+        run_times = self.runs.set_index("RUN_ID")["RUN_TIME"]
+        return pd.DataFrame(
+            {
+                "RUN_ID": updates["RUN_ID"].to_numpy(),
+                "RUN_TIME": run_times.reindex(updates["RUN_ID"]).to_numpy(),
+                "DOC_ID": self.dictionary.decode(updates["DOC"].to_numpy()),
+                "FIELD": np.asarray(self.columns, dtype=object)[updates["COL"].to_numpy(dtype=int)],
+                "OLD_VALUE": self.dictionary.decode(updates["OLD"].to_numpy()),
+                "NEW_VALUE": self.dictionary.decode(updates["NEW"].to_numpy()),
+            }
+        )
@@ -1,9 +1,15 @@
 import os
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 import pandas as pd
 
+from Utils.abn import abn_invalid_flags
+from Utils.atomic_append import atomic_append_csv, recover_pending_append
+from Utils.capture_engine import resolve_capture_engine
+from Utils.csv_io import read_table, resolve_csv_path
+from Utils.issue_rules import compile_issue_rules
+from Utils.originals_segments import OriginalsSegmentStore
 from Utils.pretty_print import step_header, sub
 
 ALLOWED_TERMINAL_STATUSES = {
@@ -14,6 +20,21 @@ ALLOWED_TERMINAL_STATUSES = {
     "CONFIRMED DUPLICATE",
 }
 
+# Columns compared between Originals and the current Transaction Master
+CHANGED_COMPARE_COLUMNS = [
+    "DOC_DATE",
+    "INVOICE_TYPE",
+    "COMPANY_CODE",
+    "VENDOR_NUM",
+    "VENDOR_NAME_1",
+    "VENDOR_NAME_2",
+    "ABN",
+    "PO_NUM",
+    "INVOICE_NUMBER",
+    "AMOUNT",
+    "STATUS_TEXT",
+]
+
 
 def load_originals_dataframe(originals_csv: str) -> pd.DataFrame:
     """
@@ -23,6 +44,7 @@ def load_originals_dataframe(originals_csv: str) -> pd.DataFrame:
     This keeps the Changed Data job safe to run even on the first day
     before any originals have been captured.
     """
+    originals_csv = resolve_csv_path(originals_csv)
     if not os.path.exists(originals_csv):
         sub(
             f"[ChangedData] Originals CSV not found at '{originals_csv}'. "
@@ -30,7 +52,7 @@ def load_originals_dataframe(originals_csv: str) -> pd.DataFrame:
         )
         return pd.DataFrame()
 
-    df = pd.read_csv(originals_csv, dtype=str, low_memory=False)
+    df = read_table(originals_csv)
     sub(
         f"[ChangedData] Loaded Originals CSV from '{originals_csv}' "
         f"with {len(df):,} rows."
@@ -46,14 +68,18 @@ def load_transaction_master_dataframe(tm_csv: str) -> pd.DataFrame:
     - The file must exist.
     - The DOC_ID column must be present.
     - DOC_ID must be unique (acts as a primary key).
+
+    A compressed (tm_csv + '.gz' / '.zst') or Parquet export is picked up
+    transparently.
     """
+    tm_csv = resolve_csv_path(tm_csv)
     if not os.path.exists(tm_csv):
         raise FileNotFoundError(
             f"[ChangedData] Transaction Master CSV not found at '{tm_csv}'. "
             "Cannot compute Changed Data without it."
         )
 
-    df = pd.read_csv(tm_csv, dtype=str, low_memory=False)
+    df = read_table(tm_csv)
     sub(
         f"[ChangedData] Loaded Transaction Master CSV from '{tm_csv}' "
         f"with {len(df):,} rows."
@@ -151,6 +177,7 @@ def load_existing_changed_data(changed_csv: str) -> pd.DataFrame:
 
     If the file does not exist, return an empty DataFrame.
     """
+    changed_csv = resolve_csv_path(changed_csv)
     if not os.path.exists(changed_csv):
         sub(
             f"[ChangedData] Changed Data CSV not found at '{changed_csv}'. "
@@ -158,7 +185,7 @@ def load_existing_changed_data(changed_csv: str) -> pd.DataFrame:
         )
         return pd.DataFrame()
 
-    df = pd.read_csv(changed_csv, dtype=str, low_memory=False)
+    df = read_table(changed_csv)
     sub(
         f"[ChangedData] Loaded existing Changed Data CSV from '{changed_csv}' "
         f"with {len(df):,} rows."
@@ -239,6 +266,26 @@ def filter_posted_changes(
     return filtered
 
 
+def capture_candidate_doc_ids(
+    tm_df: pd.DataFrame,
+    existing_changed_df: pd.DataFrame,
+) -> pd.Series:
+    """
+    DOC_IDs a capture run can still append: Transaction Master rows in a
+    terminal status (as filter_posted_changes) that are not yet in the
+    Changed Data CSV (as filter_new_changes).
+    """
+    mask = tm_df["STATUS_TEXT"].astype(str).str.upper().isin(ALLOWED_TERMINAL_STATUSES)
+    if not existing_changed_df.empty and "DOCID" in existing_changed_df.columns:
+        mask &= ~tm_df["DOC_ID"].astype(str).isin(set(existing_changed_df["DOCID"].astype(str)))
+    candidates = tm_df.loc[mask, "DOC_ID"]
+    sub(
+        f"[ChangedData] {len(candidates):,} of {len(tm_df):,} Transaction Master "
+        "DOC_ID(s) are terminal and not yet recorded."
+    )
+    return candidates
+
+
 def build_changed_output_rows(
     new_changes_df: pd.DataFrame,
     tm_df: pd.DataFrame,
@@ -259,7 +306,11 @@ def build_changed_output_rows(
         ISSUE_INVOICE_DATE
         ISSUE_ABN
         ISSUE_AMOUNT
-      plus ISSUE_COUNT = sum of these flags.
+      plus ISSUE_COUNT = sum of these flags. The categories are declared
+      in Utils.issue_rules.ISSUE_RULES.
+    - ABN_ORIG_INVALID / ABN_CURR_INVALID: 1 where the captured / current
+      ABN is present but fails the modulus-89 check (Utils.abn). These
+      are not issue categories and do not count towards ISSUE_COUNT.
     """
     if new_changes_df.empty:
         sub("[ChangedData] No new changed DOC_IDs to build output rows for.")
@@ -377,74 +428,20 @@ def build_changed_output_rows(
     )
 
     # ---------------------------------------------------
-    # High-level issue flags (1 per category) + ISSUE_COUNT
+    # High-level issue flags (1 per category) + ISSUE_COUNT,
+    # declared in Utils.issue_rules and evaluated in one pass
     # ---------------------------------------------------
-    sentinel = "__NULL__"
+    flags = compile_issue_rules()(output)
+    output = pd.concat([output, flags], axis=1)
 
-    # 1. Status / object text issue: original vs current status text
-    output["ISSUE_OBJECTTEXT"] = (
-        output["O_OBJTXT"].fillna(sentinel) != output["OBJTXT"].fillna(sentinel)
-    ).astype(int)
-
-    # 2. Company code issue: changed or missing/invalid
-    # Treat blank or '9999' as invalid company code
-    bukrs_orig = output["O_BUKRS"].fillna("")
-    bukrs_curr = output["BUKRS"].fillna("")
-    invalid_cc = bukrs_curr.eq("") | bukrs_curr.eq("9999")
-    output["ISSUE_COMPANY_CODE"] = (
-        (bukrs_orig != bukrs_curr) | invalid_cc
-    ).astype(int)
-
-    # 3. Supplier issue: any difference in vendor number or names
-    issue_supplier = (
-        (output["O_LIFNR"].fillna(sentinel) != output["LIFNR"].fillna(sentinel))
-        | (output["O_Vend_Name"].fillna(sentinel) != output["VEND_NAME"].fillna(sentinel))
-        | (output["O_Vend_Name2"].fillna(sentinel) != output["VEND_NAME2"].fillna(sentinel))
-    )
-    output["ISSUE_SUPPLIER"] = issue_supplier.astype(int)
-
-    # 4. Invoice number issue
-    output["ISSUE_INVOICE_NUMBER"] = (
-        output["O_XBLNR"].fillna(sentinel) != output["XBLNR"].fillna(sentinel)
-    ).astype(int)
-
-    # 5. Invoice date issue (document date)
-    output["ISSUE_INVOICE_DATE"] = (
-        output["O_BLDAT"].fillna(sentinel) != output["BLDAT"].fillna(sentinel)
-    ).astype(int)
-
-    # 6. ABN issue
-    output["ISSUE_ABN"] = (
-        output["O_VENDOR_VAT_NO"].fillna(sentinel) != output["VENDOR_VAT_NO"].fillna(sentinel)
-    ).astype(int)
-
-    # 7. Amount issue
-    output["ISSUE_AMOUNT"] = (
-        output["O_RMWWR"].fillna(sentinel) != output["RMWWR"].fillna(sentinel)
-    ).astype(int)
-
-    # 8. Date range issue (simple rule: DOC_DATE outside project window)
-    # You can tune these thresholds to your actual business rule.
-    project_start = pd.Timestamp("2023-07-01")
-    doc_dates = pd.to_datetime(output["BLDAT"], errors="coerce")
-    output["ISSUE_DATE_RANGE"] = doc_dates.lt(project_start).fillna(False).astype(int)
-
-    # Final ISSUE_COUNT over these high-level categories
-    issue_cols = [
-        "ISSUE_OBJECTTEXT",
-        "ISSUE_COMPANY_CODE",
-        "ISSUE_DATE_RANGE",
-        "ISSUE_SUPPLIER",
-        "ISSUE_INVOICE_NUMBER",
-        "ISSUE_INVOICE_DATE",
-        "ISSUE_ABN",
-        "ISSUE_AMOUNT",
-    ]
-    output["ISSUE_COUNT"] = output[issue_cols].sum(axis=1)
+    output["ABN_ORIG_INVALID"] = abn_invalid_flags(output["O_VENDOR_VAT_NO"])
+    output["ABN_CURR_INVALID"] = abn_invalid_flags(output["VENDOR_VAT_NO"])
 
     sub(
         f"[ChangedData] Built {len(output):,} Changed Data output row(s) "
-        "for new DOC_IDs with issue category flags."
+        "for new DOC_IDs with issue category flags "
+        f"({int(output['ABN_ORIG_INVALID'].sum()):,} captured / "
+        f"{int(output['ABN_CURR_INVALID'].sum()):,} current ABN(s) fail the check)."
     )
 
     return output
@@ -454,14 +451,115 @@ def run_changed_data_capture(
     transaction_master_csv: str,
     originals_csv: str,
     changed_csv: str,
+    shards: int = 1,
+    max_workers: Optional[int] = None,
+    originals_store_dir: Optional[str] = None,
+    memory_budget_mb: Optional[float] = None,
+    engine: Optional[str] = None,
+    vendor_master_csv: Optional[str] = None,
+    long_csv: Optional[str] = None,
+    upgrade_schema: bool = False,
 ) -> int:
     """
     Orchestrate the full Changed Data capture process.
+
+    If `originals_store_dir` is given, Originals are read from the
+    month-segmented store, opening only segments that can contain a
+    Transaction Master DOC_ID (see Utils.originals_segments).
+
+    With `shards` > 1 the detect/filter/build pipeline runs per DOC_ID hash
+    shard in a process pool (see Utils.changed_data_sharded). The rows
+    written are identical to the serial path.
+
+    When Originals and Transaction Master together are estimated to exceed
+    `memory_budget_mb` (default: PIOR_MEMORY_BUDGET_MB or 4096), both are
+    hash-partitioned into spill files and joined one partition at a time
+    (see Utils.changed_data_spill); each partition's rows are appended as
+    soon as it is done. The rows written are the same, grouped by partition.
+
+    `engine` "duckdb" runs the join, compare and filters as one query over
+    the files instead (see Utils.duckdb_backend); the default comes from
+    set_capture_engine / PIOR_CAPTURE_ENGINE ("pandas").
+
+    With `vendor_master_csv`, each appended row also gets the Vendor Master
+    vendor whose name best matches the original OCR name (O_Vend_Name),
+    found with the trigram index in Utils.vendor_index.
+
+    With `long_csv`, the changed cells of the appended rows are also
+    appended there in long format, one row per DOCID and changed field
+    (see Utils.changed_data_long).
+
+    Output columns the existing Changed Data CSV does not have yet (e.g.
+    VENDOR_MATCH_*, ABN_*_INVALID) are only added to its header, rewriting
+    the file once, with `upgrade_schema`; otherwise they are not written
+    (see Utils.atomic_append).
     """
     step_header("STEP: Changed Data Capture")
     sub("[ChangedData] Starting Changed Data capture...")
 
-    originals_df = load_originals_dataframe(originals_csv)
+    # Finish or undo any append interrupted by a previous run
+    recover_pending_append(changed_csv)
+    if long_csv:
+        recover_pending_append(long_csv)
+
+    if not originals_store_dir and resolve_capture_engine(engine) == "duckdb":
+        from Utils.duckdb_backend import changed_output_rows
+
+        output_rows = changed_output_rows(
+            transaction_master_csv,
+            originals_csv,
+            changed_csv,
+            CHANGED_COMPARE_COLUMNS,
+            memory_budget_mb=memory_budget_mb,
+        )
+        return _append_changed_rows(changed_csv, output_rows, vendor_master_csv, long_csv, upgrade_schema)
+
+    if not originals_store_dir:
+        # Imported here to avoid a circular import, as for the sharded path
+        from Utils.changed_data_spill import (
+            load_existing_docids,
+            plan_partitions,
+            run_spilled_changed_pipeline,
+        )
+
+        partitions = plan_partitions([transaction_master_csv, originals_csv], memory_budget_mb)
+        if partitions > 1:
+            sub(
+                f"[ChangedData] Inputs exceed the memory budget; "
+                f"joining out of core in {partitions} partition(s)."
+            )
+            if not os.path.exists(resolve_csv_path(originals_csv)):
+                sub("[ChangedData] Originals CSV not found. Nothing to compare.")
+                print("=" * 55)
+                return 0
+            # Each partition's rows are appended as soon as they are built
+            rows_written = run_spilled_changed_pipeline(
+                transaction_master_csv,
+                originals_csv,
+                load_existing_docids(changed_csv),
+                n_partitions=partitions,
+                emit=_changed_rows_writer(changed_csv, vendor_master_csv, long_csv, upgrade_schema),
+            )
+            print("=" * 55)
+            return rows_written
+
+    existing_changed_df = None
+    if originals_store_dir:
+        store = OriginalsSegmentStore(originals_store_dir)
+        if store.total_rows() == 0:
+            originals_df = pd.DataFrame()
+        else:
+            tm_df = load_transaction_master_dataframe(transaction_master_csv)
+            # Only DOC_IDs that could still be appended are looked up, so the
+            # key-range / bloom pruning can skip the months they are not in
+            existing_changed_df = load_existing_changed_data(changed_csv)
+            candidate_ids = capture_candidate_doc_ids(tm_df, existing_changed_df)
+            originals_df = (
+                store.load_for_doc_ids(candidate_ids) if len(candidate_ids) else pd.DataFrame()
+            )
+    else:
+        originals_df = load_originals_dataframe(originals_csv)
+
     if originals_df.empty:
         sub(
             "[ChangedData] Originals DataFrame is empty. "
@@ -470,26 +568,29 @@ def run_changed_data_capture(
         print("=" * 55)
         return 0
 
-    tm_df = load_transaction_master_dataframe(transaction_master_csv)
-
-    compare_columns = [
-        "DOC_DATE",
-        "INVOICE_TYPE",
-        "COMPANY_CODE",
-        "VENDOR_NUM",
-        "VENDOR_NAME_1",
-        "VENDOR_NAME_2",
-        "ABN",
-        "PO_NUM",
-        "INVOICE_NUMBER",
-        "AMOUNT",
-        "STATUS_TEXT",
-    ]
+    if not originals_store_dir:
+        tm_df = load_transaction_master_dataframe(transaction_master_csv)
+
+    if shards > 1:
+        # Imported here to avoid a circular import (the sharded module
+        # reuses the pipeline functions defined in this module).
+        from Utils.changed_data_sharded import run_sharded_changed_pipeline
+
+        if existing_changed_df is None:
+            existing_changed_df = load_existing_changed_data(changed_csv)
+        output_rows = run_sharded_changed_pipeline(
+            originals_df,
+            tm_df,
+            existing_changed_df,
+            n_shards=shards,
+            max_workers=max_workers,
+        )
+        return _append_changed_rows(changed_csv, output_rows, vendor_master_csv, long_csv, upgrade_schema)
 
     changed_df = detect_changed_rows(
         originals_df=originals_df,
         tm_df=tm_df,
-        compare_columns=compare_columns,
+        compare_columns=CHANGED_COMPARE_COLUMNS,
     )
 
     if changed_df.empty:
@@ -507,7 +608,8 @@ def run_changed_data_capture(
         print("=" * 55)
         return 0
 
-    existing_changed_df = load_existing_changed_data(changed_csv)
+    if existing_changed_df is None:
+        existing_changed_df = load_existing_changed_data(changed_csv)
 
     new_changes_df = filter_new_changes(changed_posted_df, existing_changed_df)
 
@@ -520,7 +622,69 @@ def run_changed_data_capture(
         return 0
 
     output_rows = build_changed_output_rows(new_changes_df, tm_df)
+    return _append_changed_rows(changed_csv, output_rows, vendor_master_csv, long_csv, upgrade_schema)
+
+
+def _changed_rows_writer(
+    changed_csv: str,
+    vendor_master_csv: Optional[str] = None,
+    long_csv: Optional[str] = None,
+    upgrade_schema: bool = False,
+):
+    """
+    Return a function that appends a batch of built output rows to the
+    Changed Data CSV crash-safely (see Utils.atomic_append) and returns the
+    rows written. With `vendor_master_csv` each batch is first enriched
+    with its best Vendor Master match (the index is loaded once); with
+    `long_csv` its changed cells are then appended there in long format.
+    `upgrade_schema` lets new output columns extend the CSV's header.
+    """
+    vendor_index = []
+
+    def write(output_rows: pd.DataFrame) -> int:
+        if output_rows.empty:
+            return 0
+
+        if vendor_master_csv:
+            from Utils.vendor_index import add_vendor_match_columns, ensure_vendor_index
+
+            if not vendor_index:
+                vendor_index.append(ensure_vendor_index(vendor_master_csv))
+            if vendor_index[0] is not None:
+                output_rows = add_vendor_match_columns(output_rows, vendor_index[0])
+
+        rows_written = atomic_append_csv(changed_csv, output_rows, upgrade_header=upgrade_schema)
+        sub(
+            f"[ChangedData] Appended {rows_written:,} new row(s) to "
+            f"Changed Data CSV at '{changed_csv}'."
+        )
+
+        if long_csv:
+            # Appended after the wide rows, which stay the record: if a run dies
+            # in between, write_changed_long_csv rebuilds the long file from them
+            from Utils.changed_data_long import build_changed_long_rows
+
+            cells_written = atomic_append_csv(long_csv, build_changed_long_rows(output_rows))
+            sub(
+                f"[ChangedData] Appended {cells_written:,} changed cell(s) in long "
+                f"format to '{long_csv}'."
+            )
+        return rows_written
 
+    return write
+
+
+def _append_changed_rows(
+    changed_csv: str,
+    output_rows: pd.DataFrame,
+    vendor_master_csv: Optional[str] = None,
+    long_csv: Optional[str] = None,
+    upgrade_schema: bool = False,
+) -> int:
+    """
+    Append built output rows to the Changed Data CSV (_changed_rows_writer)
+    and close the step.
+    """
     if output_rows.empty:
         sub(
             "[ChangedData] After building output rows, no data remained. "
@@ -529,24 +693,6 @@ def run_changed_data_capture(
         print("=" * 55)
         return 0
 
-    changed_dir = os.path.dirname(changed_csv)
-    if changed_dir:
-        os.makedirs(changed_dir, exist_ok=True)
-
-    file_exists = os.path.exists(changed_csv)
-
-    output_rows.to_csv(
-        changed_csv,
-        mode="a" if file_exists else "w",
-        header=not file_exists,
-        index=False,
-    )
-
-    rows_written = len(output_rows)
-    sub(
-        f"[ChangedData] Appended {rows_written:,} new row(s) to "
-        f"Changed Data CSV at '{changed_csv}'."
-    )
+    rows_written = _changed_rows_writer(changed_csv, vendor_master_csv, long_csv, upgrade_schema)(output_rows)
     print("=" * 55)
-
     return rows_written
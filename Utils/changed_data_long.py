@@ -0,0 +1,139 @@
+import os
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from Utils.atomic_append import read_csv_header
+from Utils.csv_io import read_table
+from Utils.issue_rules import ISSUE_RULES, NULL_SENTINEL, IssueRule
+from Utils.pretty_print import sub
+
+# Long-format (one row per changed cell) view of the Changed Data rows.
+#
+# The Changed Data CSV keeps the IOR shape: one wide row per DOC_ID with
+# each field twice (O_* original, current). For slicing by field, e.g. in
+# Power BI, the same information is written as
+#
+#   DOCID, FIELD, ORIGINAL, CURRENT, ISSUE_CATEGORY
+#
+# with a row only for the cells that actually changed. Each field pair is
+# compared once over the whole batch, and only the positions that differ
+# are gathered, so the result (and everything built on the way) is sized by
+# the number of changed cells, not rows x fields.
+#
+# ISSUE_CATEGORY is the ISSUE_* rule whose pairs cover the field
+# (Utils.issue_rules.ISSUE_RULES), empty for fields no rule compares. A
+# field is compared with the same null handling as its rule, so a cell is
+# listed exactly when it contributes to its category's flag.
+
+LONG_COLUMNS = ["DOCID", "FIELD", "ORIGINAL", "CURRENT", "ISSUE_CATEGORY"]
+
+# (original, current) column pairs of the IOR Changed Data schema, in output
+# order. FIELD is the current column's name.
+LONG_FIELD_PAIRS = [
+    ("O_BLDAT", "BLDAT"),
+    ("O_DOCTYPE", "DOCTYPE"),
+    ("O_BUKRS", "BUKRS"),
+    ("O_LIFNR", "LIFNR"),
+    ("O_Vend_Name", "VEND_NAME"),
+    ("O_Vend_Name2", "VEND_NAME2"),
+    ("O_VENDOR_VAT_NO", "VENDOR_VAT_NO"),
+    ("O_EBELN", "EBELN"),
+    ("O_XBLNR", "XBLNR"),
+    ("O_RMWWR", "RMWWR"),
+    ("O_OBJTXT", "OBJTXT"),
+]
+
+
+def long_csv_for(changed_csv: str) -> str:
+    """Default long-format path next to the Changed Data CSV (<name>_Long.csv)."""
+    root, ext = os.path.splitext(changed_csv)
+    return f"{root}_Long{ext or '.csv'}"
+
+
+def build_changed_long_rows(
+    output_rows: pd.DataFrame,
+    rules: Optional[Sequence[IssueRule]] = None,
+) -> pd.DataFrame:
+    """
+    One row per changed cell of the Changed Data `output_rows` (IOR schema),
+    ordered by row and then by field, with columns LONG_COLUMNS.
+
+    `rules` (default: ISSUE_RULES) give each field its ISSUE_CATEGORY and
+    null handling; fields no rule compares treat null == null, as the
+    default rule does.
+    """
+    rules = ISSUE_RULES if rules is None else rules
+    categories, null_as = {}, {}
+    for rule in rules:
+        for _, current in rule.pairs:
+            categories.setdefault(current, rule.name)
+            null_as.setdefault(current, rule.null_as)
+
+    pairs = [(o, c) for o, c in LONG_FIELD_PAIRS if o in output_rows.columns and c in output_rows.columns]
+    missing = [c for pair in LONG_FIELD_PAIRS for c in pair if c not in output_rows.columns]
+    if missing:
+        sub(f"[ChangedDataLong] Columns not in the Changed Data rows, skipped: {missing}")
+
+    positions: List[np.ndarray] = []
+    fields: List[np.ndarray] = []
+    originals: List[np.ndarray] = []
+    currents: List[np.ndarray] = []
+    for field_id, (original_col, current_col) in enumerate(pairs):
+        fill = null_as.get(current_col, NULL_SENTINEL)
+        original, current = output_rows[original_col], output_rows[current_col]
+        # Compared in the columns' own dtype (Arrow strings stay in Arrow)
+        changed = np.flatnonzero((original.fillna(fill) != current.fillna(fill)).to_numpy(dtype=bool))
+        positions.append(changed)
+        fields.append(np.full(len(changed), field_id, dtype=np.int16))
+        originals.append(original.iloc[changed].to_numpy(dtype=object))
+        currents.append(current.iloc[changed].to_numpy(dtype=object))
+
+    if not positions:
+        return pd.DataFrame({c: pd.Series(dtype=object) for c in LONG_COLUMNS})
+
+    position = np.concatenate(positions)
+    field = np.concatenate(fields)
+    order = np.lexsort((field, position))
+    field = field[order]
+
+    field_names = np.array([c for _, c in pairs], dtype=object)
+    field_categories = np.array([categories.get(c, "") for _, c in pairs], dtype=object)
+    return pd.DataFrame(
+        {
+            "DOCID": output_rows["DOCID"].iloc[position[order]].to_numpy(dtype=object),
+            "FIELD": field_names[field],
+            "ORIGINAL": np.concatenate(originals)[order],
+            "CURRENT": np.concatenate(currents)[order],
+            "ISSUE_CATEGORY": field_categories[field],
+        }
+    )
+
+
+def write_changed_long_csv(changed_csv: str, long_csv: Optional[str] = None) -> int:
+    """
+    (Re)build the long-format CSV from a whole Changed Data CSV, e.g. to
+    backfill rows appended before the long output was switched on. Only
+    DOCID and the field pair columns are read. `long_csv` (default:
+    long_csv_for(changed_csv)) is replaced once complete. Returns the
+    number of changed cells written.
+    """
+    long_csv = long_csv or long_csv_for(changed_csv)
+    if not os.path.exists(changed_csv):
+        raise FileNotFoundError(f"[ChangedDataLong] Changed Data CSV not found at '{changed_csv}'.")
+
+    wanted = {"DOCID"} | {c for pair in LONG_FIELD_PAIRS for c in pair}
+    usecols = [c for c in read_csv_header(changed_csv) if c in wanted]
+    changed_df = read_table(changed_csv, usecols=usecols)
+    long_rows = build_changed_long_rows(changed_df)
+
+    tmp_path = long_csv + ".tmp"
+    long_rows.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, long_csv)
+
+    sub(
+        f"[ChangedDataLong] Wrote {len(long_rows):,} changed cell(s) for "
+        f"{len(changed_df):,} DOC_ID(s) from '{changed_csv}' to '{long_csv}'."
+    )
+    return len(long_rows)
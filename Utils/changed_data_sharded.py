@@ -0,0 +1,161 @@
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from Utils.changed_data_csv import (
+    CHANGED_COMPARE_COLUMNS,
+    build_changed_output_rows,
+    detect_changed_rows,
+    filter_new_changes,
+    filter_posted_changes,
+)
+from Utils.pretty_print import sub
+
+# Sharded execution of the Changed Data diff.
+#
+# Originals, Transaction Master and the existing Changed Data DOCIDs are
+# partitioned by a stable hash of the raw DOC_ID. Every DOC_ID lands in
+# exactly one shard on all three inputs, so each shard can run the full
+# detect -> filter -> build pipeline independently in a worker process.
+# Shard outputs are re-ordered by each DOC_ID's first position in Originals,
+# which is the order the serial pipeline produces, so the written CSV is
+# byte-identical to the serial path.
+
+
+def shard_ids(values: pd.Series, n_shards: int) -> np.ndarray:
+    """
+    Return the shard number (0..n_shards-1) for each DOC_ID value.
+
+    Uses pandas' stable row hashing rather than Python's hash(), which is
+    salted per process and would route the same DOC_ID to different shards
+    in different workers.
+    """
+    as_text = values.astype(object).where(values.notna(), "").astype(str)
+    hashes = pd.util.hash_pandas_object(as_text, index=False).to_numpy()
+    return (hashes % np.uint64(n_shards)).astype(np.int64)
+
+
+def run_shard_pipeline(
+    originals_df: pd.DataFrame,
+    tm_df: pd.DataFrame,
+    existing_changed_df: pd.DataFrame,
+    compare_columns: List[str],
+) -> pd.DataFrame:
+    """Run the serial Changed Data pipeline over one shard, in this process."""
+    changed_df = detect_changed_rows(originals_df, tm_df, compare_columns)
+    if changed_df.empty:
+        return pd.DataFrame()
+
+    changed_posted_df = filter_posted_changes(changed_df)
+    if changed_posted_df.empty:
+        return pd.DataFrame()
+
+    new_changes_df = filter_new_changes(changed_posted_df, existing_changed_df)
+    if new_changes_df.empty:
+        return pd.DataFrame()
+
+    return build_changed_output_rows(new_changes_df, tm_df)
+
+
+def _run_shard(
+    originals_df: pd.DataFrame,
+    tm_df: pd.DataFrame,
+    existing_changed_df: pd.DataFrame,
+    compare_columns: List[str],
+) -> pd.DataFrame:
+    """
+    Process-pool worker body: run_shard_pipeline with its per-step log
+    lines swallowed, so the console shows one summary per shard instead of
+    interleaved output from every worker. Only used in worker processes:
+    redirecting stdout in the main process would also swallow the log
+    lines of every other thread.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return run_shard_pipeline(originals_df, tm_df, existing_changed_df, compare_columns)
+
+
+def run_sharded_changed_pipeline(
+    originals_df: pd.DataFrame,
+    tm_df: pd.DataFrame,
+    existing_changed_df: pd.DataFrame,
+    n_shards: int,
+    max_workers: Optional[int] = None,
+    compare_columns: List[str] = CHANGED_COMPARE_COLUMNS,
+) -> pd.DataFrame:
+    """
+    Build Changed Data output rows by running the pipeline per DOC_ID shard.
+
+    Parameters
+    ----------
+    n_shards : int
+        Number of hash partitions.
+    max_workers : int or None
+        Process pool size. None uses os.cpu_count(); 1 runs the shards
+        in-process, which is useful for debugging.
+
+    Returns
+    -------
+    pd.DataFrame
+        The same rows, columns and order as the serial pipeline.
+    """
+    if n_shards < 1:
+        raise ValueError(f"[ChangedData] n_shards must be at least 1, got {n_shards}.")
+
+    max_workers = max_workers or os.cpu_count() or 1
+
+    orig_shard = shard_ids(originals_df["DOC_ID"], n_shards)
+    tm_shard = shard_ids(tm_df["DOC_ID"], n_shards)
+
+    if existing_changed_df.empty:
+        existing_ids = pd.DataFrame()
+        existing_shard = np.zeros(0, dtype=np.int64)
+    else:
+        existing_ids = existing_changed_df[["DOCID"]]
+        existing_shard = shard_ids(existing_ids["DOCID"], n_shards)
+
+    tasks = []
+    for shard in range(n_shards):
+        tasks.append(
+            (
+                originals_df[orig_shard == shard],
+                tm_df[tm_shard == shard],
+                existing_ids[existing_shard == shard] if not existing_ids.empty else existing_ids,
+                compare_columns,
+            )
+        )
+
+    sub(
+        f"[ChangedData] Running {n_shards} DOC_ID shard(s) "
+        f"with {min(max_workers, n_shards)} worker(s)."
+    )
+
+    if max_workers == 1:
+        results = [run_shard_pipeline(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, n_shards)) as pool:
+            results = list(pool.map(_run_shard, *zip(*tasks)))
+
+    for shard, result in enumerate(results):
+        sub(f"[ChangedData] Shard {shard}: {len(result):,} output row(s).")
+
+    results = [r for r in results if not r.empty]
+    if not results:
+        return pd.DataFrame()
+
+    output = pd.concat(results, ignore_index=True)
+
+    # Restore the serial order: each DOC_ID's first position in Originals
+    first_pos = pd.Index(originals_df["DOC_ID"].drop_duplicates())
+    order = np.argsort(first_pos.get_indexer(output["DOCID"]), kind="stable")
+    output = output.iloc[order].reset_index(drop=True)
+
+    sub(
+        f"[ChangedData] Built {len(output):,} Changed Data output row(s) "
+        f"across {n_shards} shard(s)."
+    )
+    return output
@@ -0,0 +1,244 @@
+import os
+import time
+
+from Utils.pretty_print import sub
+
+# Shared helpers for locating and reading the pipeline's CSV outputs.
+# Exports may be written compressed (transaction_master.csv.gz / .zst, see
+# Utils.export) or as Parquet (transaction_master.parquet), so loaders
+# resolve the configured plain path to whichever variant is actually on
+# disk. pandas decompresses CSVs by file extension.
+#
+# CSVs are parsed by a configurable engine (set_csv_engine, or the
+# PIOR_CSV_ENGINE environment variable; main.py --csv-engine):
+#   - "pyarrow": pyarrow's multithreaded CSV parser; plain files are read
+#     over a memory map (read_csv_mmap), straight from the page cache on
+#     every core instead of through Python's buffered I/O on one thread
+#   - "c":       pd.read_csv, pandas' single-threaded C parser
+#   - "auto":    pyarrow when installed, else c (the default)
+# Both return the same frame as pd.read_csv(dtype=str, low_memory=False):
+# every column is a string and the same markers (empty, NA, NULL, nan, ...)
+# become missing values. A pyarrow failure falls back to the C engine.
+#
+# read_table records rows, bytes and seconds of every read in READ_STATS;
+# the orchestrator reports parse throughput per job from it.
+
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+PARQUET_SUFFIX = ".parquet"
+
+CSV_ENGINES = ("auto", "pyarrow", "c")
+CSV_ENGINE_ENV = "PIOR_CSV_ENGINE"
+
+# Reads recorded by read_table (see take_read_stats)
+READ_STATS = []
+
+# pandas' default na_values, so both readers agree on what is missing
+PANDAS_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+
+def parquet_sibling(path: str) -> str:
+    """'transaction_master.csv' -> 'transaction_master.parquet'."""
+    root, ext = os.path.splitext(path)
+    return (root if ext.lower() == ".csv" else path) + PARQUET_SUFFIX
+
+
+def resolve_csv_path(path: str) -> str:
+    """
+    Return the on-disk variant of `path`: the plain file, a compressed
+    sibling (path + '.gz' / '.zst') or a Parquet sibling. When several
+    exist, the most recently written one wins, so switching output format
+    on or off never reads a stale file. Returns `path` unchanged if none exist.
+    """
+    candidates = [path] + [path + suffix for suffix in COMPRESSED_SUFFIXES] + [parquet_sibling(path)]
+    existing = [p for p in candidates if os.path.exists(p)]
+    if not existing:
+        return path
+    return max(existing, key=os.path.getmtime)
+
+
+def _csv_header(path: str):
+    import pandas as pd
+
+    # pandas reads the header of plain and compressed files alike
+    return list(pd.read_csv(path, dtype=str, nrows=0).columns)
+
+
+def _read_csv_arrow(path: str, usecols=None):
+    """
+    pyarrow CSV read with every column as strings. Plain files are read
+    over a memory map; compressed files are decompressed as a stream.
+
+    Values may contain quoted newlines; the fast path splits the file into
+    blocks at line ends, so such a file fails to parse and is re-read in
+    the slower newline-aware mode.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pv
+
+    header = _csv_header(path)
+    columns = list(usecols) if usecols is not None else header
+    missing = [c for c in columns if c not in header]
+    if missing:
+        raise ValueError(f"Usecols do not match columns, columns expected but not found: {missing}")
+
+    convert_options = pv.ConvertOptions(
+        column_types={c: pa.string() for c in header},
+        include_columns=columns,
+        null_values=PANDAS_NA_VALUES,
+        strings_can_be_null=True,
+    )
+
+    def open_source():
+        if path.endswith(COMPRESSED_SUFFIXES):
+            return pa.input_stream(path, compression="detect")
+        return pa.memory_map(path, "r")
+
+    def read(newlines_in_values):
+        with open_source() as source:
+            return pv.read_csv(
+                source,
+                read_options=pv.ReadOptions(use_threads=True),
+                parse_options=pv.ParseOptions(newlines_in_values=newlines_in_values),
+                convert_options=convert_options,
+            )
+
+    try:
+        table = read(newlines_in_values=False)
+    except pa.ArrowInvalid:
+        table = read(newlines_in_values=True)
+    return table.to_pandas()
+
+
+def read_csv_mmap(path: str, usecols=None):
+    """Read a plain CSV with pyarrow over a memory map, every column as strings."""
+    if path.endswith(COMPRESSED_SUFFIXES):
+        raise ValueError(f"{path} is compressed and cannot be memory-mapped.")
+    return _read_csv_arrow(path, usecols=usecols)
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow.csv  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def set_csv_engine(engine: str) -> None:
+    """
+    Choose the CSV engine for every loader: "auto" (pyarrow when installed),
+    "pyarrow" or "c" (pandas' single-threaded parser). Stored in the
+    environment so worker processes (sharded capture) use it too.
+    """
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"Unsupported CSV engine '{engine}'. Choose from: {', '.join(CSV_ENGINES)}")
+    os.environ[CSV_ENGINE_ENV] = engine
+
+
+def get_csv_engine() -> str:
+    engine = os.environ.get(CSV_ENGINE_ENV, "auto") or "auto"
+    if engine not in CSV_ENGINES:
+        raise ValueError(
+            f"{CSV_ENGINE_ENV}={engine!r} is not a CSV engine. Choose from: {', '.join(CSV_ENGINES)}"
+        )
+    return engine
+
+
+def read_csv_str(path: str, usecols=None):
+    """
+    Read a CSV (plain or compressed) with every column as strings using the
+    configured engine. If the pyarrow engine fails for any reason, the file
+    is read again with pandas' C engine.
+    """
+    import pandas as pd
+
+    engine = get_csv_engine()
+    if engine == "auto":
+        engine = "pyarrow" if _has_pyarrow() else "c"
+
+    if engine == "pyarrow":
+        try:
+            return _read_csv_arrow(path, usecols=usecols), "pyarrow"
+        except Exception as e:
+            sub(f"[csv_io] pyarrow engine failed on {os.path.basename(path)} ({e}); using the C engine.")
+
+    return pd.read_csv(path, dtype=str, low_memory=False, usecols=usecols), "c"
+
+
+def _record_read(path, engine, rows, seconds):
+    size = os.path.getsize(path)
+    READ_STATS.append(
+        {"path": path, "engine": engine, "rows": rows, "bytes": size, "seconds": seconds}
+    )
+    mb = size / (1024 * 1024)
+    rate = f"{mb / seconds:.0f} MB/s" if seconds > 0 else "-"
+    sub(f"[csv_io] Parsed {os.path.basename(path)}: {rows:,} rows, {mb:.1f} MB in {seconds:.2f}s ({rate}, {engine})")
+
+
+def take_read_stats():
+    """Return the reads recorded since the last call and reset the list."""
+    stats = list(READ_STATS)
+    READ_STATS.clear()
+    return stats
+
+
+def summarize_read_stats(stats):
+    """Totals for a list of read records: files, rows, MB, seconds, MB/s."""
+    mb = sum(r["bytes"] for r in stats) / (1024 * 1024)
+    seconds = sum(r["seconds"] for r in stats)
+    return {
+        "files": len(stats),
+        "rows": sum(r["rows"] for r in stats),
+        "mb": mb,
+        "seconds": seconds,
+        "mb_per_s": mb / seconds if seconds > 0 else 0.0,
+    }
+
+
+def iter_table_chunks(path: str, chunk_rows: int, usecols=None):
+    """
+    Yield a CSV or Parquet output as all-string DataFrames of at most
+    `chunk_rows` rows, for scans that must not hold the whole file.
+    """
+    import pandas as pd
+
+    if path.endswith(PARQUET_SUFFIX):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=usecols):
+            df = batch.to_pandas()
+            yield df.astype(str).where(df.notna())
+    else:
+        yield from pd.read_csv(path, dtype=str, low_memory=False, usecols=usecols, chunksize=chunk_rows)
+
+
+def read_table_columns(path: str) -> list:
+    """Column names of a resolved CSV (plain or compressed) or Parquet output, without reading rows."""
+    if path.endswith(PARQUET_SUFFIX):
+        import pyarrow.parquet as pq
+
+        return list(pq.read_schema(path).names)
+    return _csv_header(path)
+
+
+def read_table(path: str, usecols=None):
+    """
+    Read a resolved CSV or Parquet output with every column as strings,
+    the way the capture jobs expect (pd.read_csv(dtype=str)). CSVs go
+    through the configured engine (see set_csv_engine); every read is timed
+    and recorded for the run metrics.
+    """
+    import pandas as pd
+
+    started = time.perf_counter()
+    if path.endswith(PARQUET_SUFFIX):
+        df = pd.read_parquet(path, columns=usecols)
+        # Exports are written as strings already; anything else is normalised to match
+        df, engine = df.astype(str).where(df.notna()), "parquet"
+    else:
+        df, engine = read_csv_str(path, usecols=usecols)
+    _record_read(path, engine, len(df), time.perf_counter() - started)
+    return df
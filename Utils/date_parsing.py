@@ -0,0 +1,128 @@
+import re
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Shared date parsing for the capture jobs.
+#
+# Export date columns hold a handful of distinct values repeated over
+# millions of rows (ENTRY_DATE, BLDAT, ...). parse_dates() therefore:
+#   - factorizes the column and parses only its unique values,
+#   - detects the column's format once from those values (ISO first, then
+#     day-first formats as used in Australian SAP extracts) and parses with
+#     that explicit format instead of per-call inference,
+#   - remembers parsed values per column name for the life of the process,
+#     so a column parsed by one step is a cache hit for the next.
+#
+# Every caller gets the same answer for the same text: ISO dates are never
+# read day-first, and d/m/Y dates are never read month-first.
+
+CANDIDATE_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y",
+    "%d.%m.%Y",
+    "%Y%m%d",
+]
+
+# Unique values inspected when detecting a column's format
+FORMAT_SAMPLE_SIZE = 1000
+
+_YEAR_FIRST = re.compile(r"^\s*\d{4}[-/.]")
+
+# column name -> detected format (None when no single format fits)
+_FORMATS: Dict[str, Optional[str]] = {}
+# column name -> Series of parsed Timestamps indexed by the original text
+_PARSED: Dict[str, pd.Series] = {}
+
+
+def clear_date_cache() -> None:
+    """Forget detected formats and parsed values (tests, long-lived processes)."""
+    _FORMATS.clear()
+    _PARSED.clear()
+
+
+def detect_date_format(values) -> Optional[str]:
+    """
+    Return the first CANDIDATE_FORMATS entry that parses every value in a
+    sample of `values` (unique, non-null text), or None.
+    """
+    sample = pd.Series(pd.unique(pd.Series(values, dtype=object).dropna()))[:FORMAT_SAMPLE_SIZE]
+    sample = sample.astype(str)
+    if sample.empty:
+        return None
+    for fmt in CANDIDATE_FORMATS:
+        if pd.to_datetime(sample, format=fmt, errors="coerce").notna().all():
+            return fmt
+    return None
+
+
+def _parse_mixed(values: pd.Series) -> pd.Series:
+    """Per-value parsing for text no single format fits: year-first as ISO, the rest day-first."""
+    text = values.astype(str)
+    year_first = text.str.match(_YEAR_FIRST).to_numpy(dtype=bool)
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    if year_first.any():
+        parsed[year_first] = pd.to_datetime(text[year_first], errors="coerce", format="ISO8601")
+    if (~year_first).any():
+        parsed[~year_first] = pd.to_datetime(text[~year_first], errors="coerce", format="mixed", dayfirst=True)
+    return parsed
+
+
+def _parse_unique(values: pd.Series, column: Optional[str]) -> pd.Series:
+    """Parse unique text values; returns datetime64[ns] aligned with `values`."""
+    if column is not None and column in _FORMATS:
+        fmt = _FORMATS[column]
+    else:
+        fmt = detect_date_format(values)
+        if column is not None:
+            _FORMATS[column] = fmt
+
+    text = values.astype(str)
+    if fmt is None:
+        return _parse_mixed(text)
+
+    parsed = pd.to_datetime(text, format=fmt, errors="coerce").astype("datetime64[ns]")
+    failed = parsed.isna().to_numpy()
+    if failed.any():
+        # Values outside the detected format (or junk, which stays NaT)
+        parsed[failed] = _parse_mixed(text[failed])
+    return parsed
+
+
+def parse_dates(series: pd.Series, column: Optional[str] = None) -> pd.Series:
+    """
+    Parse a date column to datetime64[ns]; unparseable values become NaT.
+
+    `column` names the cache entry (defaults to series.name). Pass None as
+    both to parse without caching.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    column = column if column is not None else series.name
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    uniques = pd.Series(uniques, dtype=object)
+
+    if column is None:
+        parsed_uniques = _parse_unique(uniques, None).to_numpy()
+    else:
+        known = _PARSED.get(column)
+        if known is None:
+            known = pd.Series([], index=pd.Index([], dtype=object), dtype="datetime64[ns]")
+        missing = uniques[~uniques.isin(known.index)]
+        if not missing.empty:
+            parsed_missing = _parse_unique(missing.reset_index(drop=True), column)
+            parsed_missing.index = pd.Index(missing.to_numpy(), dtype=object)
+            known = pd.concat([known, parsed_missing]) if len(known) else parsed_missing
+            _PARSED[column] = known
+        parsed_uniques = known.reindex(pd.Index(uniques.to_numpy(), dtype=object)).to_numpy()
+
+    values = np.full(len(codes), np.datetime64("NaT"), dtype="datetime64[ns]")
+    present = codes >= 0
+    values[present] = parsed_uniques[codes[present]]
+    return pd.Series(values, index=series.index, name=series.name)
@@ -0,0 +1,251 @@
+import os
+from typing import List, Optional
+
+import pandas as pd
+
+from Utils.csv_io import PANDAS_NA_VALUES, PARQUET_SUFFIX, resolve_csv_path
+from Utils.date_parsing import parse_dates
+from Utils.pretty_print import sub
+
+# DuckDB backend for the CSV-based capture jobs.
+#
+# Originals and Changed Data capture are relational work over the export
+# files: project columns, keep an ENTRY_DATE window, anti-join on DOC_KEY,
+# inner-join on DOC_ID and compare columns. With the "duckdb" capture
+# engine (see Utils.capture_engine) that work runs as one vectorised,
+# multithreaded query over the CSV / Parquet files, which only reads the
+# columns it needs and spills to disk past the memory budget
+# (Utils.changed_data_spill.memory_budget_bytes).
+#
+# Only the rows to append come back to pandas, and the output is still
+# built and written by the pandas code (build_changed_output_rows,
+# append_new_rows), so both engines write identical files:
+#   - CSVs are read as all-VARCHAR with the same null markers as pandas,
+#   - ENTRY_DATE windows are decided by Utils.date_parsing on the column's
+#     distinct values, never by DuckDB's own date parser,
+#   - results are ordered by input row (rowid), as the pandas filters and
+#     merges keep the left frame's order.
+
+
+def connect(memory_budget_mb: Optional[float] = None):
+    """In-memory DuckDB connection capped at the Changed Data memory budget."""
+    import duckdb
+
+    from Utils.changed_data_spill import memory_budget_bytes
+
+    con = duckdb.connect()
+    con.execute(f"SET memory_limit = '{memory_budget_bytes(memory_budget_mb) // (1024 * 1024)}MB'")
+    return con
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _source(path: str) -> str:
+    """Table function reading a resolved CSV (plain, .gz, .zst) or Parquet output."""
+    if path.endswith(PARQUET_SUFFIX):
+        return f"read_parquet({_literal(path)})"
+    nulls = ", ".join(_literal(v) for v in PANDAS_NA_VALUES)
+    return (
+        f"read_csv({_literal(path)}, header = true, all_varchar = true, "
+        f"delim = ',', quote = '\"', escape = '\"', nullstr = [{nulls}])"
+    )
+
+
+def load_table(con, name: str, path: str, columns: Optional[List[str]] = None) -> List[str]:
+    """
+    Materialise `columns` (default: all) of `path` as table `name`, every
+    column VARCHAR, rows in file order (rowid). Returns the file's columns.
+    """
+    source = _source(path)
+    available = [row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()]
+    selected = available if columns is None else [c for c in columns if c in available]
+    projection = ", ".join(f"CAST({_quote(c)} AS VARCHAR) AS {_quote(c)}" for c in selected)
+    con.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT {projection or 'NULL AS _EMPTY'} FROM {source}")
+    return available
+
+
+def _fetch(con, query: str) -> pd.DataFrame:
+    df = con.execute(query).df()
+    # Same dtypes as read_table: strings with missing values as NaN
+    return df.astype(str).where(df.notna())
+
+
+def _doc_key(column: str) -> str:
+    """SQL for Utils.originals_capture_csv.normalize_doc_id."""
+    return f"coalesce(ltrim({column}, '0'), '')"
+
+
+def originals_new_rows(
+    transaction_master_csv: str,
+    originals_csv: str,
+    days_back: int,
+    memory_budget_mb: Optional[float] = None,
+) -> pd.DataFrame:
+    """
+    The rows run_originals_capture appends: Transaction Master projected to
+    ORIGINALS_COLUMNS, within the ENTRY_DATE window, first row per DOC_KEY,
+    minus DOC_KEYs already in Originals (ENTRY_DATE parsed, file order).
+    """
+    from Utils.originals_capture_csv import ORIGINALS_COLUMNS, entry_date_cutoff
+
+    tm_path = resolve_csv_path(transaction_master_csv)
+    if not os.path.exists(tm_path):
+        sub(f"[duckdb] {tm_path} not found. No source rows.")
+        return pd.DataFrame()
+
+    con = connect(memory_budget_mb)
+    try:
+        available = load_table(con, "tm", tm_path, ORIGINALS_COLUMNS)
+        missing = [c for c in ORIGINALS_COLUMNS if c not in available]
+        if missing:
+            raise ValueError(
+                f"[to_originals_schema] Source is missing required columns for originals schema: {missing}"
+            )
+
+        # Decide the window with the pandas date parser, on distinct values only
+        entry_dates = _fetch(con, "SELECT DISTINCT ENTRY_DATE FROM tm WHERE ENTRY_DATE IS NOT NULL")["ENTRY_DATE"]
+        cutoff_ts = entry_date_cutoff(days_back)
+        recent_dates = pd.DataFrame(
+            {"ENTRY_DATE": entry_dates[(parse_dates(entry_dates, "ENTRY_DATE") >= cutoff_ts).to_numpy()]}
+        )
+        con.register("recent_dates", recent_dates)
+
+        con.execute(
+            f"""
+            CREATE TABLE recent AS
+            SELECT tm.rowid AS _ROW, {_doc_key('tm.DOC_ID')} AS _DOC_KEY, tm.*
+            FROM tm
+            WHERE tm.ENTRY_DATE IN (SELECT ENTRY_DATE FROM recent_dates)
+            """
+        )
+
+        orig_path = resolve_csv_path(originals_csv)
+        has_originals = os.path.exists(orig_path) and "DOC_ID" in load_table(
+            con, "orig", orig_path, ["DOC_ID"]
+        )
+        has_originals = has_originals and con.execute("SELECT count(*) FROM orig").fetchone()[0] > 0
+
+        columns = ", ".join(_quote(c) for c in ORIGINALS_COLUMNS)
+        if has_originals:
+            query = f"""
+                SELECT {columns} FROM (
+                    SELECT * FROM recent
+                    QUALIFY row_number() OVER (PARTITION BY _DOC_KEY ORDER BY _ROW) = 1
+                ) AS first_rows
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM orig WHERE {_doc_key('orig.DOC_ID')} = first_rows._DOC_KEY
+                )
+                ORDER BY _ROW
+            """
+        else:
+            # Empty Originals: every recent row is new (no de-duplication)
+            query = f"SELECT {columns} FROM recent ORDER BY _ROW"
+
+        new_rows = _fetch(con, query)
+    finally:
+        con.close()
+
+    new_rows["ENTRY_DATE"] = parse_dates(new_rows["ENTRY_DATE"], "ENTRY_DATE")
+    sub(
+        f"[duckdb] {len(recent_dates):,} ENTRY_DATE value(s) on or after {cutoff_ts.date()}; "
+        f"{len(new_rows):,} new row(s) for Originals."
+    )
+    return new_rows
+
+
+def changed_output_rows(
+    transaction_master_csv: str,
+    originals_csv: str,
+    changed_csv: str,
+    compare_columns: List[str],
+    memory_budget_mb: Optional[float] = None,
+) -> pd.DataFrame:
+    """
+    The rows run_changed_data_capture appends. Detecting changed DOC_IDs,
+    the terminal-status filter and the anti-join with the existing Changed
+    Data DOCIDs run in DuckDB; the matching rows go through
+    build_changed_output_rows.
+    """
+    from Utils.changed_data_csv import ALLOWED_TERMINAL_STATUSES, build_changed_output_rows
+
+    tm_path = resolve_csv_path(transaction_master_csv)
+    orig_path = resolve_csv_path(originals_csv)
+    if not os.path.exists(orig_path):
+        sub(f"[duckdb] Originals CSV not found at '{orig_path}'. No changes to detect.")
+        return pd.DataFrame()
+    if not os.path.exists(tm_path):
+        raise FileNotFoundError(
+            f"[ChangedData] Transaction Master CSV not found at '{tm_path}'. "
+            "Cannot compute Changed Data without it."
+        )
+
+    required = ["DOC_ID", *compare_columns]
+    tm_output_columns = ["LAYOUT_ID", "ENTRY_DATE", "POSTING_DATE", "PO_LAST_UPDATED", "ENTRY_DATE_AND_TIME"]
+
+    con = connect(memory_budget_mb)
+    try:
+        tm_available = load_table(con, "tm", tm_path, required + tm_output_columns)
+        if "DOC_ID" not in tm_available:
+            raise ValueError("[ChangedData] Transaction Master CSV is missing required column 'DOC_ID'.")
+        if con.execute("SELECT 1 FROM tm GROUP BY DOC_ID HAVING count(*) > 1 LIMIT 1").fetchone():
+            raise ValueError(
+                "[ChangedData] Transaction Master CSV has duplicate DOC_ID "
+                "values. DOC_ID must be unique for Changed Data logic."
+            )
+
+        orig_available = load_table(con, "orig", orig_path, required)
+        if con.execute("SELECT count(*) FROM orig").fetchone()[0] == 0:
+            sub("[duckdb] Originals are empty. No changes to detect.")
+            return pd.DataFrame()
+
+        for label, available in (("Originals", orig_available), ("Transaction Master", tm_available)):
+            missing = set(required).difference(available)
+            if missing:
+                raise ValueError(f"[ChangedData] {label} DataFrame is missing columns: {sorted(missing)}")
+
+        changed_path = resolve_csv_path(changed_csv)
+        existing_filter = ""
+        if os.path.exists(changed_path):
+            existing_available = load_table(con, "existing", changed_path, ["DOCID"])
+            if "DOCID" in existing_available:
+                existing_filter = "AND NOT EXISTS (SELECT 1 FROM existing WHERE existing.DOCID = o.DOC_ID)"
+            elif con.execute("SELECT count(*) FROM existing").fetchone()[0] > 0:
+                raise ValueError("[ChangedData] existing_changed_df missing DOCID column.")
+
+        differs = " OR ".join(f"o.{_quote(c)} IS DISTINCT FROM t.{_quote(c)}" for c in compare_columns)
+        statuses = ", ".join(_literal(s) for s in sorted(ALLOWED_TERMINAL_STATUSES))
+        projection = ", ".join(
+            ["o.DOC_ID"]
+            + [f"o.{_quote(c)} AS {_quote(c + '_ORIG')}" for c in compare_columns]
+            + [f"t.{_quote(c)} AS {_quote(c + '_CURR')}" for c in compare_columns]
+        )
+        con.execute(
+            f"""
+            CREATE TABLE new_changes AS
+            SELECT {projection}, o.rowid AS _ROW
+            FROM orig AS o JOIN tm AS t ON o.DOC_ID = t.DOC_ID
+            WHERE ({differs})
+              AND upper(t.STATUS_TEXT) IN ({statuses})
+              {existing_filter}
+            """
+        )
+
+        new_changes_df = _fetch(con, "SELECT * EXCLUDE (_ROW) FROM new_changes ORDER BY _ROW")
+        tm_columns = ", ".join(_quote(c) for c in ["DOC_ID", *tm_output_columns] if c in tm_available)
+        tm_df = _fetch(
+            con,
+            f"SELECT {tm_columns} FROM tm WHERE DOC_ID IN (SELECT DOC_ID FROM new_changes) ORDER BY tm.rowid",
+        )
+    finally:
+        con.close()
+
+    sub(f"[duckdb] {new_changes_df['DOC_ID'].nunique():,} new changed DOC_ID(s) in a terminal status.")
+    if new_changes_df.empty:
+        return pd.DataFrame()
+    return build_changed_output_rows(new_changes_df, tm_df)
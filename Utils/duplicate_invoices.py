@@ -0,0 +1,383 @@
+import os
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from Utils.atomic_append import atomic_append_csv, recover_pending_append
+from Utils.csv_io import read_table, read_table_columns, resolve_csv_path
+from Utils.packed_strings import hash_packed, hash_strings, pack_strings, unpack_strings
+from Utils.pretty_print import step_header, sub
+
+# Duplicate-invoice candidates over the Transaction Master.
+#
+# An OCR-induced duplicate posting is the same vendor invoice captured
+# twice under two DOC_IDs. Invoices are keyed on (vendor, invoice number,
+# amount) twice:
+#   - STRICT:  VENDOR_NUM and INVOICE_NUMBER trimmed and upper-cased, AMOUNT
+#              in cents,
+#   - RELAXED: as STRICT, but punctuation and the leading zeros of every
+#              digit run are dropped ('INV-00123' and 'INV123' match; so do
+#              vendors '0030001' and '30001').
+# Invoices missing a vendor, an invoice number or an amount are not keyed.
+#
+# Keys are stored as 64-bit hashes in a persistent DuplicateInvoiceIndex,
+# together with a hash of every DOC_ID already seen. Each run probes the
+# Transaction Master rows whose DOC_ID is not in the index yet against the
+# index (one hash-table lookup per indexed invoice), so a day's invoices
+# are checked in O(n) instead of comparing every pair. Groups of two or
+# more invoices sharing a key, with at least one probed invoice, are
+# appended to the candidates CSV; a RELAXED group is only reported when it
+# is more than one STRICT group.
+#
+# An indexed invoice whose VENDOR_NUM, INVOICE_NUMBER or AMOUNT was
+# corrected later (e.g. an OCR fix) is probed again: each run recomputes
+# the STRICT key of the indexed rows, and the rows whose key no longer
+# matches the stored one are re-keyed. Their old keys are replaced in the
+# index before the probe, so they can no longer match stale values.
+#
+# Crash safety: the extended index is written to a pending file first, the
+# candidates are appended (Utils.atomic_append), and the pending index is
+# then moved into place. A pending index left by a crash is promoted on the
+# next run if the candidates file grew past the size it recorded, otherwise
+# discarded, so a group is never reported twice or lost.
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_NAME = "duplicate_invoice_index.npz"
+PENDING_SUFFIX = ".pending"
+KEY_COLUMNS = ["VENDOR_NUM", "INVOICE_NUMBER", "AMOUNT"]
+DETAIL_COLUMNS = ["VENDOR_NUM", "INVOICE_NUMBER", "AMOUNT", "DOC_DATE", "ENTRY_DATE"]
+MATCH_TYPES = ("STRICT", "RELAXED")
+
+# Hash of an invoice without a usable key
+NO_KEY = np.uint64(0)
+
+# Zeros that start a digit run (and are not the whole run): r"\1\2" keeps
+# the character before and the first significant digit
+LEADING_ZEROS = r"(^|[^0-9])0+([0-9])"
+
+def amount_cents(amounts: pd.Series) -> pd.Series:
+    """AMOUNT as integer cents ('1,234.50' -> 123450); unparseable -> <NA>."""
+    # Missing values are filled first: pandas 2 casts NaN to 'nan'
+    text = amounts.fillna("").astype("str").str.replace(",", "", regex=False).str.strip()
+    numbers = pd.to_numeric(text, errors="coerce")
+    return (numbers * 100).round().astype("Int64")
+
+
+def invoice_keys(df: pd.DataFrame, match_types=MATCH_TYPES) -> pd.DataFrame:
+    """
+    Key hashes (uint64) per row of `df` (needs KEY_COLUMNS), one column per
+    entry of `match_types` (default STRICT and RELAXED). Rows without a
+    complete key get NO_KEY.
+    """
+    # Missing values are filled first (as in shard_ids): pandas 2 casts NaN to 'nan'
+    vendor = df["VENDOR_NUM"].fillna("").astype("str").str.strip().str.upper()
+    invoice = df["INVOICE_NUMBER"].fillna("").astype("str").str.strip().str.upper()
+    cents = amount_cents(df["AMOUNT"])
+
+    parts = {"STRICT": (vendor, invoice)}
+    if "RELAXED" in match_types:
+        parts["RELAXED"] = (
+            vendor.str.replace(LEADING_ZEROS, r"\1\2", regex=True),
+            invoice.str.replace(r"[^0-9A-Z]", "", regex=True).str.replace(LEADING_ZEROS, r"\1\2", regex=True),
+        )
+
+    cents_text = cents.astype("str")
+    keys = {}
+    for match_type in match_types:
+        v, inv = parts[match_type]
+        keyed = (v.fillna("").ne("") & inv.fillna("").ne("") & cents.notna()).to_numpy(dtype=bool)
+        hashes = np.full(len(df), NO_KEY, dtype=np.uint64)
+        if keyed.any():
+            key_text = (v[keyed] + "\x1f" + inv[keyed] + "\x1f" + cents_text[keyed]).to_numpy(dtype=object)
+            # 0 is reserved for NO_KEY
+            hashes[keyed] = np.maximum(hash_strings(key_text), np.uint64(1))
+        keys[match_type] = hashes
+
+    return pd.DataFrame(keys, index=df.index)
+
+
+class DuplicateInvoiceIndex:
+    """
+    Key hashes of every invoice seen so far, in the order they were added.
+
+    Arrays: doc_hash (hash of the raw DOC_ID), strict / relaxed (key
+    hashes, NO_KEY when unkeyed) and the DOC_IDs themselves, packed as
+    UTF-8 (doc_blob / doc_offsets) and only decoded for reported invoices.
+    """
+
+    ARRAYS = ("doc_hash", "strict", "relaxed", "doc_blob", "doc_offsets")
+
+    def __init__(self, arrays, candidates_bytes: int = 0):
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+        # Size of the candidates CSV before this index's candidates were appended
+        self.candidates_bytes = candidates_bytes
+
+    def __len__(self) -> int:
+        return len(self.doc_hash)
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            {
+                "doc_hash": np.zeros(0, dtype=np.uint64),
+                "strict": np.zeros(0, dtype=np.uint64),
+                "relaxed": np.zeros(0, dtype=np.uint64),
+                "doc_blob": np.zeros(0, dtype=np.uint8),
+                "doc_offsets": np.zeros(1, dtype=np.int64),
+            }
+        )
+
+    def extended(self, doc_ids: pd.Series, keys: pd.DataFrame):
+        """A new index with `doc_ids` (and their `keys`) added at the end."""
+        blob, offsets = pack_strings(doc_ids)
+        return DuplicateInvoiceIndex(
+            {
+                "doc_hash": np.concatenate([self.doc_hash, hash_packed(blob, offsets)]),
+                "strict": np.concatenate([self.strict, keys["STRICT"].to_numpy()]),
+                "relaxed": np.concatenate([self.relaxed, keys["RELAXED"].to_numpy()]),
+                "doc_blob": np.concatenate([self.doc_blob, blob]),
+                "doc_offsets": np.concatenate([self.doc_offsets, offsets[1:] + self.doc_offsets[-1]]),
+            },
+            self.candidates_bytes,
+        )
+
+    def rekeyed(self, positions: np.ndarray, keys: pd.DataFrame):
+        """A new index with the invoices at `positions` given `keys` instead."""
+        strict, relaxed = self.strict.copy(), self.relaxed.copy()
+        strict[positions] = keys["STRICT"].to_numpy()
+        relaxed[positions] = keys["RELAXED"].to_numpy()
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        return DuplicateInvoiceIndex(dict(arrays, strict=strict, relaxed=relaxed), self.candidates_bytes)
+
+    def positions(self, doc_ids: pd.Series) -> np.ndarray:
+        """Index position of each DOC_ID, -1 where it is not indexed yet."""
+        first = ~pd.Index(self.doc_hash).duplicated()
+        lookup = pd.Index(self.doc_hash[first])
+        found = lookup.get_indexer(hash_strings(doc_ids))
+        positions = np.full(len(found), -1, dtype=np.int64)
+        positions[found >= 0] = np.flatnonzero(first)[found[found >= 0]]
+        return positions
+
+    def doc_ids(self, positions: np.ndarray) -> list:
+        return unpack_strings(self.doc_blob, self.doc_offsets, positions)
+
+    def save(self, path: str) -> None:
+        """Write the index to `path` (.npz) atomically."""
+        tmp_path = path + ".tmp"
+        self.write(tmp_path)
+        os.replace(tmp_path, path)
+
+    def write(self, path: str) -> None:
+        meta = np.array([INDEX_VERSION, self.candidates_bytes], dtype=np.int64)
+        with open(path, "wb") as f:
+            np.savez(f, meta=meta, **{name: getattr(self, name) for name in self.ARRAYS})
+            f.flush()
+            os.fsync(f.fileno())
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path, allow_pickle=False) as data:
+            version, candidates_bytes = data["meta"].tolist()
+            if version != INDEX_VERSION:
+                raise ValueError(
+                    f"[DuplicateInvoices] Index '{path}' has version {version}, expected {INDEX_VERSION}. "
+                    "Delete it to rebuild from the Transaction Master."
+                )
+            return cls({name: data[name] for name in cls.ARRAYS}, int(candidates_bytes))
+
+
+def index_path_for(candidates_csv: str) -> str:
+    return os.path.join(os.path.dirname(candidates_csv), DEFAULT_INDEX_NAME)
+
+
+def _file_size(path: str) -> int:
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def load_duplicate_index(index_path: str, candidates_csv: str) -> DuplicateInvoiceIndex:
+    """
+    The saved index (empty if there is none), after resolving a run that
+    died between appending candidates and saving the index.
+    """
+    recover_pending_append(candidates_csv)
+
+    pending_path = index_path + PENDING_SUFFIX
+    if os.path.exists(pending_path):
+        pending = DuplicateInvoiceIndex.load(pending_path)
+        if _file_size(candidates_csv) > pending.candidates_bytes:
+            os.replace(pending_path, index_path)
+            sub("[DuplicateInvoices] Promoted index left by an interrupted run (its candidates were written).")
+        else:
+            os.remove(pending_path)
+            sub("[DuplicateInvoices] Discarded index left by an interrupted run (its candidates were not written).")
+
+    if not os.path.exists(index_path):
+        return DuplicateInvoiceIndex.empty()
+    return DuplicateInvoiceIndex.load(index_path)
+
+
+def find_duplicate_candidates(
+    index: DuplicateInvoiceIndex,
+    new_doc_ids: pd.Series,
+    new_keys: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Candidate groups touched by the new invoices: every indexed or new
+    invoice sharing a STRICT or RELAXED key with a new one. Re-keyed
+    invoices count as new and must have NO_KEY in `index`.
+
+    Returns columns MATCH_TYPE, GROUP_KEY (hex key hash), GROUP_SIZE,
+    DOC_ID, NEW_INVOICE (1/0); groups in order of first member, indexed
+    invoices before new ones.
+    """
+    new_doc_ids = new_doc_ids.fillna("").astype("str").to_numpy(dtype=object)
+    n_indexed = len(index)
+    frames = []
+
+    for rank, match_type in enumerate(MATCH_TYPES):
+        indexed_hashes = getattr(index, match_type.lower())
+        new_hashes = new_keys[match_type].to_numpy()
+        probe = pd.unique(new_hashes[new_hashes != NO_KEY])
+        if len(probe) == 0:
+            continue
+
+        # Hash-table probe of the index; no pairwise comparison
+        indexed_pos = np.flatnonzero(pd.Series(indexed_hashes).isin(probe).to_numpy())
+        new_pos = np.flatnonzero(new_hashes != NO_KEY)
+
+        members = pd.DataFrame(
+            {
+                "KEY": np.concatenate([indexed_hashes[indexed_pos], new_hashes[new_pos]]),
+                "STRICT": np.concatenate([index.strict[indexed_pos], new_keys["STRICT"].to_numpy()[new_pos]]),
+                "ORDER": np.concatenate([indexed_pos, n_indexed + new_pos]),
+                "NEW_INVOICE": np.concatenate([np.zeros(len(indexed_pos), int), np.ones(len(new_pos), int)]),
+            }
+        )
+        grouped = members.groupby("KEY", sort=False)
+        members["GROUP_SIZE"] = grouped["KEY"].transform("size")
+        keep = members["GROUP_SIZE"] > 1
+        if match_type == "RELAXED":
+            # Already reported as one STRICT group
+            keep &= grouped["STRICT"].transform("nunique") > 1
+        members = members[keep]
+        if members.empty:
+            continue
+
+        members = members.assign(
+            MATCH_RANK=rank,
+            FIRST=members.groupby("KEY", sort=False)["ORDER"].transform("min"),
+        )
+        frames.append(members)
+
+    if not frames:
+        return pd.DataFrame(columns=["MATCH_TYPE", "GROUP_KEY", "GROUP_SIZE", "DOC_ID", "NEW_INVOICE"])
+
+    members = pd.concat(frames).sort_values(["MATCH_RANK", "FIRST", "ORDER"], kind="stable")
+    order = members["ORDER"].to_numpy()
+    indexed = order < n_indexed
+    doc_ids = np.empty(len(members), dtype=object)
+    doc_ids[indexed] = index.doc_ids(order[indexed])
+    doc_ids[~indexed] = new_doc_ids[order[~indexed] - n_indexed]
+
+    return pd.DataFrame(
+        {
+            "MATCH_TYPE": np.asarray(MATCH_TYPES, dtype=object)[members["MATCH_RANK"].to_numpy()],
+            "GROUP_KEY": [f"{k:016x}" for k in members["KEY"].tolist()],
+            "GROUP_SIZE": members["GROUP_SIZE"].to_numpy(),
+            "DOC_ID": doc_ids,
+            "NEW_INVOICE": members["NEW_INVOICE"].to_numpy(),
+        }
+    )
+
+
+def run_duplicate_invoice_detection(
+    transaction_master_csv: str,
+    candidates_csv: str,
+    index_path: Optional[str] = None,
+) -> int:
+    """
+    Probe the Transaction Master invoices not yet indexed, and the indexed
+    ones whose vendor, invoice number or amount changed, for duplicates.
+    Append the candidate groups to `candidates_csv` and update the index
+    (default: duplicate_invoice_index.npz next to `candidates_csv`).
+
+    Returns
+    -------
+    int
+        Number of candidate rows appended.
+    """
+    step_header("STEP: Duplicate Invoice Candidates")
+
+    tm_path = resolve_csv_path(transaction_master_csv)
+    if not os.path.exists(tm_path):
+        sub(f"[DuplicateInvoices] {tm_path} not found. Nothing to check.")
+        return 0
+
+    index_path = index_path or index_path_for(candidates_csv)
+    index = load_duplicate_index(index_path, candidates_csv)
+    sub(f"[DuplicateInvoices] Index holds {len(index):,} invoice(s).")
+
+    columns = read_table_columns(tm_path)
+    missing = [c for c in ["DOC_ID", *KEY_COLUMNS] if c not in columns]
+    if missing:
+        raise ValueError(f"[DuplicateInvoices] Transaction Master CSV is missing required columns: {missing}")
+    # The date details are reported when present
+    tm = read_table(tm_path, usecols=["DOC_ID", *(c for c in DETAIL_COLUMNS if c in columns)])
+
+    positions = index.positions(tm["DOC_ID"])
+    indexed = positions >= 0
+
+    # Indexed invoices whose key columns were corrected since they were keyed.
+    # The RELAXED key is derived from the same normalised values, so
+    # comparing STRICT keys finds every change.
+    strict_now = invoice_keys(tm[indexed], ("STRICT",))["STRICT"].to_numpy()
+    changed = strict_now != index.strict[positions[indexed]]
+    rekey_positions = positions[indexed][changed]
+    rekeyed_invoices = tm[indexed][changed]
+    new_invoices = tm[~indexed]
+    if new_invoices.empty and rekeyed_invoices.empty:
+        sub("[DuplicateInvoices] No new or corrected invoices since the last run.")
+        return 0
+
+    # Corrected invoices are probed again with their new keys, against an
+    # index where they have no key (neither the old one nor, twice, the new)
+    rekeyed_keys = invoice_keys(rekeyed_invoices)
+    unkeyed = rekeyed_keys.copy()
+    unkeyed[:] = NO_KEY
+    probed = pd.concat([rekeyed_invoices, new_invoices])
+    probed_keys = pd.concat([rekeyed_keys, invoice_keys(new_invoices)])
+    candidates = find_duplicate_candidates(
+        index.rekeyed(rekey_positions, unkeyed), probed["DOC_ID"], probed_keys
+    )
+    sub(
+        f"[DuplicateInvoices] Probed {len(new_invoices):,} new and {len(rekeyed_invoices):,} corrected "
+        f"invoice(s): "
+        f"{candidates.groupby(['MATCH_TYPE', 'GROUP_KEY']).ngroups if len(candidates) else 0:,} candidate group(s)."
+    )
+
+    updated = index.rekeyed(rekey_positions, rekeyed_keys).extended(
+        new_invoices["DOC_ID"], probed_keys.iloc[len(rekeyed_invoices):]
+    )
+    updated.candidates_bytes = _file_size(candidates_csv)
+    rows_written = 0
+    if candidates.empty:
+        updated.save(index_path)
+    else:
+        details = tm[tm["DOC_ID"].isin(candidates["DOC_ID"])]
+        details = details.drop_duplicates("DOC_ID").reindex(columns=["DOC_ID", *DETAIL_COLUMNS])
+        candidates = candidates.merge(details, on="DOC_ID", how="left", validate="many_to_one")
+        candidates["DETECTED_DATE"] = date.today().isoformat()
+
+        # Pending index, then candidates, then the index goes live
+        updated.write(index_path + PENDING_SUFFIX)
+        rows_written = atomic_append_csv(candidates_csv, candidates)
+        os.replace(index_path + PENDING_SUFFIX, index_path)
+
+    sub(
+        f"[DuplicateInvoices] Appended {rows_written:,} candidate row(s) to '{candidates_csv}'; "
+        f"index now holds {len(updated):,} invoice(s)."
+    )
+    return rows_written
@@ -1,6 +1,6 @@
 import os
 from datetime import datetime
-import pandas as pd
+from Utils.run_manifest import update_result_digest
 
 # This module handles CSV export functionality for data processing tasks.
 # Key features:
@@ -9,16 +9,62 @@ import pandas as pd
 # - Allows optional filename specification or automatic timestamp-based naming
 # - Supports appending to existing CSV files
 # - Can optionally print export progress
+# - Supports streaming compression (gzip, or zstd when the zstandard package is installed)
+# - Can fold each batch into a running result digest (see Utils.run_manifest)
+# - Can write Parquet instead of CSV (ParquetBatchWriter, needs pyarrow)
 
 EXPORT_DIR = "Output_Files"  # Default folder to store exported CSV files
 
+# Compression codecs: file suffix and pandas compression options.
+# Low levels keep compression cheaper than the Oracle fetch it overlaps with.
+COMPRESSION_CODECS = {
+    "gzip": (".gz", {"method": "gzip", "compresslevel": 1}),
+    "zstd": (".zst", {"method": "zstd", "level": 3}),
+}
+
+
+def resolve_compression(compression):
+    """
+    Validate a compression name. Falls back from zstd to gzip when the
+    optional zstandard package is not installed. Returns None, "gzip" or "zstd".
+    """
+    if not compression or compression == "none":
+        return None
+    if compression not in COMPRESSION_CODECS:
+        raise ValueError(
+            f"Unsupported compression '{compression}'. "
+            f"Choose from: none, {', '.join(COMPRESSION_CODECS)}"
+        )
+    if compression == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            print("zstandard is not installed; falling back to gzip compression.")
+            return "gzip"
+    return compression
+
+
+def compressed_filename(filename, compression=None):
+    """Append the codec suffix (e.g. '.gz') to a CSV filename."""
+    compression = resolve_compression(compression)
+    if compression is None:
+        return filename
+    return filename + COMPRESSION_CODECS[compression][0]
+
 # Ensure the export directory exists; create it if missing
 def ensure_export_dir():
     if not os.path.exists(EXPORT_DIR):
         os.makedirs(EXPORT_DIR)
 
 # Export data to a CSV file using column headers and row data
-def export_to_csv(columns, rows, filename=None, filename_prefix="export", append=False, log_progress=False):
+# When compression is set, pass a filename that already carries the codec
+# suffix (see compressed_filename). Appends add a new gzip member / zstd frame,
+# which every reader (pandas, gzip, zstd) treats as one continuous stream.
+# Pass a digest from Utils.run_manifest.new_result_digest to hash the batch.
+def export_to_csv(columns, rows, filename=None, filename_prefix="export", append=False, log_progress=False,
+                  compression=None, digest=None):
+
+    import pandas as pd  # Imported on first export so runners start quickly
 
     ensure_export_dir()  # Make sure output directory is ready
 
@@ -30,12 +76,56 @@ def export_to_csv(columns, rows, filename=None, filename_prefix="export", append
 
     filepath = os.path.join(EXPORT_DIR, filename)
 
+    if digest is not None:
+        update_result_digest(digest, df)
+
+    compression = resolve_compression(compression)
+    codec_options = COMPRESSION_CODECS[compression][1] if compression else None
+
     if append and os.path.exists(filepath):
-        df.to_csv(filepath, mode="a", header=False, index=False)  # Append without header
+        df.to_csv(filepath, mode="a", header=False, index=False, compression=codec_options)  # Append without header
     else:
-        df.to_csv(filepath, index=False)  # Create new file or overwrite
+        df.to_csv(filepath, index=False, compression=codec_options)  # Create new file or overwrite
 
     if log_progress:
         print(f"Exported CSV to: {filepath}")  # Optional console output
 
     return filepath  # Return path for reference or logging
+
+
+class ParquetBatchWriter:
+    """
+    Stream batches into one Parquet file under EXPORT_DIR.
+
+    Every column is stored as a nullable string, so the file holds the same
+    values the CSV export would and the capture jobs read it back with the
+    same all-string dtypes (see Utils.csv_io.read_table). Parquet files
+    cannot be appended to once closed, so one writer spans the whole export.
+    """
+
+    def __init__(self, filename):
+        ensure_export_dir()
+        self.filepath = os.path.join(EXPORT_DIR, filename)
+        self._writer = None
+
+    def write(self, columns, rows, digest=None):
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        df = pd.DataFrame(rows, columns=columns)
+        if digest is not None:
+            update_result_digest(digest, df)
+
+        schema = pa.schema([(str(c), pa.string()) for c in columns])
+        table = pa.Table.from_pandas(df.astype("string"), schema=schema, preserve_index=False)
+
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.filepath, schema, compression="snappy")
+        self._writer.write_table(table)
+        return self.filepath
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
@@ -0,0 +1,318 @@
+import hashlib
+import json
+import os
+import re
+from datetime import date, datetime
+from decimal import Decimal
+
+from Utils.pretty_print import sub
+
+# Checkpoint / resume for the long SQL exports.
+#
+# While a job streams into <output>.partial, a checkpoint file next to it
+# (<output>.partial.checkpoint.json) records, after every written batch:
+#   - rows written so far and the partial file's byte size,
+#   - the ORDER BY key of the last row written.
+#
+# A resumed run truncates the partial file to the checkpointed size and
+# re-queries only the rows that sort after the last key:
+#
+#   SELECT * FROM (<original query>) resume_src
+#   WHERE <keyset predicate> ORDER BY <same keys>
+#
+# The SQL files' ORDER BY keys are not unique (several invoices share an
+# ENTRY_DATE/BUDAT pair), and Oracle may return tied rows in any order.
+# So a batch is only committed up to the end of its last complete tie
+# group; the trailing tie group is carried into the next batch. Every row
+# with the checkpointed key is therefore already written, and the
+# predicate can be a strict "sorts after".
+#
+# Queries without a resolvable ORDER BY (layout_master.sql) still checkpoint
+# their row count, but a resumed run restarts them from zero.
+
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+
+# A tie group larger than this is written without a usable key rather
+# than held in memory; the checkpoint then waits for the next key change.
+MAX_CARRY_ROWS = 200_000
+
+_ORDER_BY = re.compile(r"\bORDER\s+BY\b", re.IGNORECASE)
+_SELECT_LIST = re.compile(r"^\s*SELECT\b(.*?)\bFROM\b", re.IGNORECASE | re.DOTALL)
+_SELECT_ITEM = re.compile(r"(?:(\w+)\.)?(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+
+
+def _select_aliases(query: str) -> dict:
+    """
+    Map ORDER BY expressions to output column names for a plain SELECT:
+    output aliases, qualified source columns (LFA.LIFNR) and unambiguous
+    unqualified source columns (BUDAT).
+    """
+    match = _SELECT_LIST.match(query)
+    if not match:
+        return {}
+
+    outputs, qualified, plain = {}, {}, {}
+    for item in match.group(1).split(","):
+        m = _SELECT_ITEM.fullmatch(item.strip())
+        if not m:
+            continue
+        table, column, alias = m.groups()
+        output = (alias or column).upper()
+        outputs[output] = output
+        if table:
+            qualified[f"{table.upper()}.{column.upper()}"] = output
+        plain.setdefault(column.upper(), set()).add(output)
+
+    aliases = {c: next(iter(o)) for c, o in plain.items() if len(o) == 1}
+    aliases.update(qualified)
+    aliases.update(outputs)
+    return aliases
+
+
+def parse_order_by(query: str):
+    """
+    Return the query's final ORDER BY as [(output_column, "ASC"|"DESC"), ...],
+    or None when it is missing or cannot be mapped to output columns.
+    """
+    matches = list(_ORDER_BY.finditer(query))
+    if not matches:
+        return None
+
+    clause = query[matches[-1].end():].strip().rstrip(";").strip()
+    if not clause or ")" in clause:
+        # ORDER BY inside a subquery / analytic function, not the outer query
+        return None
+
+    aliases = _select_aliases(query)
+    keys = []
+    for term in clause.split(","):
+        parts = term.split()
+        if not parts:
+            return None
+        modifiers = [p.upper() for p in parts[1:]]
+        if "NULLS" in modifiers or any(m not in ("ASC", "DESC") for m in modifiers):
+            return None
+        column = aliases.get(parts[0].upper())
+        if column is None:
+            return None
+        keys.append((column, "DESC" if "DESC" in modifiers else "ASC"))
+    return keys
+
+
+def build_resume_query(query: str, order_keys, last_key):
+    """
+    Wrap `query` so it only returns rows that sort strictly after `last_key`.
+
+    Oracle's default null ordering is used: NULLS LAST for ASC and
+    NULLS FIRST for DESC. Returns (sql, binds).
+    """
+    binds = {}
+    disjuncts = []
+
+    for i, (column, direction) in enumerate(order_keys):
+        terms = []
+        for j in range(i):
+            prev_column = order_keys[j][0]
+            if last_key[j] is None:
+                terms.append(f"{prev_column} IS NULL")
+            else:
+                binds[f"resume_k{j}"] = last_key[j]
+                terms.append(f"{prev_column} = :resume_k{j}")
+
+        value = last_key[i]
+        if direction == "ASC":
+            if value is None:
+                continue  # nothing sorts after NULL
+            binds[f"resume_k{i}"] = value
+            terms.append(f"({column} > :resume_k{i} OR {column} IS NULL)")
+        else:
+            if value is None:
+                terms.append(f"{column} IS NOT NULL")
+            else:
+                binds[f"resume_k{i}"] = value
+                terms.append(f"{column} < :resume_k{i}")
+
+        disjuncts.append("(" + " AND ".join(terms) + ")")
+
+    where = " OR ".join(disjuncts) if disjuncts else "1 = 0"
+    order = ", ".join(f"{column} {direction}" for column, direction in order_keys)
+    sql = f"SELECT * FROM (\n{query}\n) resume_src\nWHERE {where}\nORDER BY {order}"
+    return sql, binds
+
+
+def split_trailing_ties(rows, key_index):
+    """Split rows into (complete tie groups, trailing tie group)."""
+    if not rows:
+        return [], []
+
+    def key(row):
+        return tuple(row[i] for i in key_index)
+
+    last = key(rows[-1])
+    cut = len(rows) - 1
+    while cut >= 0 and key(rows[cut]) == last:
+        cut -= 1
+    return rows[:cut + 1], rows[cut + 1:]
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"decimal": str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "datetime" in value:
+            return datetime.fromisoformat(value["datetime"])
+        if "date" in value:
+            return date.fromisoformat(value["date"])
+        if "decimal" in value:
+            return Decimal(value["decimal"])
+    return value
+
+
+class ExportCheckpoint:
+    """
+    Checkpoint state for one export into `partial_path`.
+
+    Usage: start() picks a fresh or resumed query, take() holds back the
+    trailing tie group of each batch, commit() records a written batch,
+    drain() returns the held-back rows at the end and clear() removes the
+    checkpoint once the output is finalised.
+
+    take() and drain() return (rows, key_is_complete), which is passed
+    back to commit() with those rows. The flag travels with its batch, so
+    take() for the next batch may run while the previous one is still
+    being written and committed (SqlExportJob.run_async).
+    """
+
+    def __init__(self, partial_path: str, query: str, params: dict, compression=None):
+        self.partial_path = partial_path
+        self.path = partial_path + CHECKPOINT_SUFFIX
+        self.order_keys = parse_order_by(query)
+        self.fingerprint = hashlib.sha256(
+            json.dumps([query, params, compression], sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        self.rows = 0
+        self.last_key = None
+        self.key_index = None
+        self._carry = []
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _resumable(self, checkpoint) -> bool:
+        return (
+            checkpoint is not None
+            and checkpoint.get("fingerprint") == self.fingerprint
+            and self.order_keys is not None
+            and checkpoint.get("last_key") is not None
+            and os.path.exists(self.partial_path)
+            and os.path.getsize(self.partial_path) >= checkpoint["bytes"]
+        )
+
+    def start(self, query: str, params: dict, resume: bool = False):
+        """
+        Return (query, params, resumed). When resuming, the partial file is
+        truncated to the checkpoint and the query only fetches later rows.
+        Otherwise any previous partial file and checkpoint are discarded.
+        """
+        checkpoint = self.load() if resume else None
+
+        if not self._resumable(checkpoint):
+            if resume:
+                sub("[checkpoint] No usable checkpoint; exporting from the start.")
+            self.discard()
+            return query, params, False
+
+        with open(self.partial_path, "r+b") as f:
+            f.truncate(checkpoint["bytes"])
+
+        self.rows = checkpoint["rows"]
+        self.last_key = [_decode_value(v) for v in checkpoint["last_key"]]
+
+        resume_sql, binds = build_resume_query(query, self.order_keys, self.last_key)
+        sub(
+            f"[checkpoint] Resuming after {self.rows:,} rows "
+            f"({checkpoint['bytes']:,} bytes, saved {checkpoint['saved_at']})."
+        )
+        return resume_sql, {**params, **binds}, True
+
+    def take(self, columns, rows):
+        """
+        Return (rows that can be written now, key_is_complete) and hold back
+        the trailing tie group. key_is_complete is False when an oversized
+        tie group was released part-way, so its last key must not be
+        checkpointed.
+        """
+        if self.order_keys is None:
+            return list(rows), True
+
+        if self.key_index is None:
+            upper = [c.upper() for c in columns]
+            if not all(column in upper for column, _ in self.order_keys):
+                self.order_keys = None
+                return list(rows), True
+            self.key_index = [upper.index(column) for column, _ in self.order_keys]
+
+        ready, carry = split_trailing_ties(self._carry + list(rows), self.key_index)
+        if len(carry) > MAX_CARRY_ROWS:
+            self._carry = []
+            return ready + carry, False
+        self._carry = carry
+        return ready, True
+
+    def drain(self):
+        """Return (held-back rows, True) at the end of the result."""
+        rows, self._carry = self._carry, []
+        return rows, True
+
+    def commit(self, rows, key_is_complete=True):
+        """
+        Record that `rows` (from take() or drain()) reached the partial file.
+        `key_is_complete` is the flag take() returned with them.
+        """
+        if not rows:
+            return
+
+        # Opened for writing: Windows refuses os.fsync on a read-only handle
+        with open(self.partial_path, "ab") as f:
+            os.fsync(f.fileno())
+
+        self.rows += len(rows)
+        if self.key_index is not None and key_is_complete:
+            self.last_key = [rows[-1][i] for i in self.key_index]
+        else:
+            self.last_key = None
+
+        checkpoint = {
+            "fingerprint": self.fingerprint,
+            "rows": self.rows,
+            "bytes": os.path.getsize(self.partial_path),
+            "last_key": None if self.last_key is None else [_encode_value(v) for v in self.last_key],
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def discard(self):
+        self.clear()
+        if os.path.exists(self.partial_path):
+            os.remove(self.partial_path)
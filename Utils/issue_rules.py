@@ -0,0 +1,153 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from Utils.date_parsing import parse_dates
+
+# Issue categories for the Changed Data output.
+#
+# Each ISSUE_* flag is declared once as an IssueRule over the output
+# columns (O_* original vs current pairs, invalid-value sets, date bounds)
+# and all rules are compiled into one pass over the frame: every column is
+# normalised (nulls filled) and every pair compared at most once, however
+# many rules use it, and each date column is parsed once (Utils.date_parsing).
+#
+# To add a category (e.g. a new OCR failure), append an IssueRule to
+# ISSUE_RULES; it becomes a column before ISSUE_COUNT and is counted in it.
+
+# Invoices dated before the project went live are flagged (ISSUE_DATE_RANGE)
+PROJECT_START_DATE = "2023-07-01"
+
+# Company codes treated as missing / invalid ('' covers nulls)
+INVALID_COMPANY_CODES = ("", "9999")
+
+# Fill value that makes two nulls compare equal but differ from any text
+NULL_SENTINEL = "__NULL__"
+
+
+class IssueRule:
+    """
+    One issue category. The flag is 1 when any of its conditions holds.
+
+    Parameters
+    ----------
+    name : str
+        Output column, e.g. "ISSUE_AMOUNT".
+    pairs : sequence of (original_column, current_column)
+        Flag when the two values differ.
+    invalid : dict of column -> iterable of str
+        Flag when the column's value is one of these.
+    before : dict of column -> date string
+        Flag when the column parses to a date earlier than this.
+    null_as : str
+        What nulls are replaced with before comparing. The default
+        sentinel makes null == null but null != ''; use '' to treat a
+        null and an empty string as the same value.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        pairs: Sequence[Tuple[str, str]] = (),
+        invalid: Optional[Dict[str, Iterable[str]]] = None,
+        before: Optional[Dict[str, str]] = None,
+        null_as: str = NULL_SENTINEL,
+    ):
+        if not (pairs or invalid or before):
+            raise ValueError(f"[IssueRules] Rule {name!r} has no condition.")
+        self.name = name
+        self.pairs = tuple(tuple(p) for p in pairs)
+        self.invalid = {col: tuple(values) for col, values in (invalid or {}).items()}
+        self.before = dict(before or {})
+        self.null_as = null_as
+
+    def columns(self) -> List[str]:
+        cols = [c for pair in self.pairs for c in pair]
+        return cols + list(self.invalid) + list(self.before)
+
+
+ISSUE_RULES = [
+    # Status / object text: original vs current status text
+    IssueRule("ISSUE_OBJECTTEXT", pairs=[("O_OBJTXT", "OBJTXT")]),
+    # Company code: changed, or blank / '9999'
+    IssueRule(
+        "ISSUE_COMPANY_CODE",
+        pairs=[("O_BUKRS", "BUKRS")],
+        invalid={"BUKRS": INVALID_COMPANY_CODES},
+        null_as="",
+    ),
+    # Supplier: vendor number or either name line
+    IssueRule(
+        "ISSUE_SUPPLIER",
+        pairs=[("O_LIFNR", "LIFNR"), ("O_Vend_Name", "VEND_NAME"), ("O_Vend_Name2", "VEND_NAME2")],
+    ),
+    IssueRule("ISSUE_INVOICE_NUMBER", pairs=[("O_XBLNR", "XBLNR")]),
+    # Invoice (document) date
+    IssueRule("ISSUE_INVOICE_DATE", pairs=[("O_BLDAT", "BLDAT")]),
+    IssueRule("ISSUE_ABN", pairs=[("O_VENDOR_VAT_NO", "VENDOR_VAT_NO")]),
+    IssueRule("ISSUE_AMOUNT", pairs=[("O_RMWWR", "RMWWR")]),
+    # Document date before the project window
+    IssueRule("ISSUE_DATE_RANGE", before={"BLDAT": PROJECT_START_DATE}),
+]
+
+
+class CompiledIssueRules:
+    """
+    A set of IssueRules evaluated in one pass. Call it with a frame holding
+    every column the rules use; it returns the flag columns (in rule order)
+    plus ISSUE_COUNT.
+    """
+
+    def __init__(self, rules: Sequence[IssueRule]):
+        names = [r.name for r in rules]
+        if len(set(names)) != len(names):
+            raise ValueError(f"[IssueRules] Duplicate rule names in {names}")
+        self.rules = list(rules)
+        self.columns = sorted({c for r in self.rules for c in r.columns()})
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        missing = [c for c in self.columns if c not in df.columns]
+        if missing:
+            raise ValueError(f"[IssueRules] Frame is missing rule columns: {missing}")
+
+        normalized = {}
+        differs = {}
+        parsed_dates = {}
+
+        def values(column, null_as):
+            key = (column, null_as)
+            if key not in normalized:
+                normalized[key] = df[column].fillna(null_as).to_numpy(dtype=object)
+            return normalized[key]
+
+        def pair_differs(left, right, null_as):
+            key = (left, right, null_as)
+            if key not in differs:
+                differs[key] = values(left, null_as) != values(right, null_as)
+            return differs[key]
+
+        def dates(column):
+            if column not in parsed_dates:
+                parsed_dates[column] = parse_dates(df[column], column)
+            return parsed_dates[column]
+
+        flags = {}
+        for rule in self.rules:
+            mask = np.zeros(len(df), dtype=bool)
+            for left, right in rule.pairs:
+                mask |= pair_differs(left, right, rule.null_as)
+            for column, invalid_values in rule.invalid.items():
+                mask |= np.isin(values(column, rule.null_as), invalid_values)
+            for column, bound in rule.before.items():
+                mask |= dates(column).lt(pd.Timestamp(bound)).fillna(False).to_numpy(dtype=bool)
+            flags[rule.name] = mask.astype(int)
+
+        result = pd.DataFrame(flags, index=df.index)
+        result["ISSUE_COUNT"] = result.sum(axis=1) if flags else 0
+        return result
+
+
+def compile_issue_rules(rules: Sequence[IssueRule] = None) -> CompiledIssueRules:
+    """Compile `rules` (default: ISSUE_RULES) into a single-pass evaluator."""
+    return CompiledIssueRules(ISSUE_RULES if rules is None else rules)
@@ -1,9 +1,16 @@
 import os
-from datetime import datetime, timedelta
+from typing import Optional
 
 import pandas as pd
 
+from Utils.atomic_append import atomic_append_csv, recover_pending_append
+from Utils.capture_engine import resolve_capture_engine
+from Utils.csv_io import read_table, resolve_csv_path
+from Utils.date_parsing import parse_dates
+from Utils.sorted_scan import read_recent_rows
+from Utils.originals_segments import OriginalsSegmentStore
 from Utils.pretty_print import step_header, sub
+from Utils.sql_loader import load_sql
 
 # Columns we want to keep in the Originals file
 ORIGINALS_COLUMNS = [
@@ -23,6 +30,9 @@ ORIGINALS_COLUMNS = [
     "STATUS_TEXT",
 ]
 
+# Narrow Originals-window query (ORIGINALS_COLUMNS, ENTRY_DATE >= :cutoff_date)
+ORIGINALS_WINDOW_SQL = os.path.join("SQL", "originals_window.sql")
+
 
 def normalize_doc_id(value) -> str:
     """Normalise DOC_ID for comparison."""
@@ -34,12 +44,14 @@ def normalize_doc_id(value) -> str:
 def load_csv(path: str) -> pd.DataFrame:
     """
     Load a CSV into a DataFrame. Returns an empty DataFrame if the file does not exist.
+    Compressed (path + '.gz' / '.zst') and Parquet variants are picked up transparently.
     """
+    path = resolve_csv_path(path)
     if not os.path.exists(path):
         sub(f"[load_csv] {path} not found. Returning empty DataFrame.")
         return pd.DataFrame()
 
-    df = pd.read_csv(path, dtype=str, low_memory=False)
+    df = read_table(path)
     sub(f"[load_csv] Loaded {len(df)} rows from {path}")
     return df
 
@@ -62,13 +74,35 @@ def to_originals_schema(source_df: pd.DataFrame) -> pd.DataFrame:
     return trimmed
 
 
+def entry_date_cutoff(days: int) -> pd.Timestamp:
+    """Start of the ENTRY_DATE window: today at midnight minus `days`."""
+    return pd.Timestamp.today().normalize() - pd.Timedelta(days=days)
+
+
+def load_recent_transaction_master(transaction_master_csv: str, days_back: int) -> pd.DataFrame:
+    """
+    Load the Transaction Master rows needed for a `days_back` window.
+
+    When the run manifest confirms the export is sorted by ENTRY_DATE DESC,
+    only the head of the file is read (Utils.sorted_scan); otherwise the
+    whole file is loaded. Either way the caller still applies
+    filter_recent_by_entry_date.
+    """
+    path = resolve_csv_path(transaction_master_csv)
+    if os.path.exists(path):
+        recent = read_recent_rows(path, "ENTRY_DATE", entry_date_cutoff(days_back))
+        if recent is not None:
+            return recent
+    return load_csv(transaction_master_csv)
+
+
 def filter_recent_by_entry_date(df: pd.DataFrame, days: int = 30) -> pd.DataFrame:
     """
     Filter to rows with ENTRY_DATE within the last `days` days.
 
-    ENTRY_DATE is expected to be in a standard, pandas-parseable format
-    (for example 'YYYY-MM-DD'). We rely on pandas' default parser and
-    use a Timestamp cutoff, matching the debug behaviour.
+    ENTRY_DATE is parsed with Utils.date_parsing.parse_dates (format
+    detected once, unique values only, cached for the run) and compared
+    with a Timestamp cutoff, matching the debug behaviour.
     """
     if "ENTRY_DATE" not in df.columns:
         raise ValueError("[filter_recent_by_entry_date] ENTRY_DATE column is required.")
@@ -79,16 +113,11 @@ def filter_recent_by_entry_date(df: pd.DataFrame, days: int = 30) -> pd.DataFram
 
     df = df.copy()
 
-    # Parse dates without forcing dayfirst=True so that ISO formats are handled correctly
-    parsed_dates = pd.to_datetime(
-        df["ENTRY_DATE"],
-        errors="coerce",
-    )
+    parsed_dates = parse_dates(df["ENTRY_DATE"], "ENTRY_DATE")
 
     before = len(df)
 
-    # Use a Timestamp cutoff (today at midnight minus `days`)
-    cutoff_ts = pd.Timestamp.today().normalize() - pd.Timedelta(days=days)
+    cutoff_ts = entry_date_cutoff(days)
 
     mask = parsed_dates >= cutoff_ts
     recent = df[mask].copy()
@@ -157,22 +186,14 @@ def find_new_rows(source_df: pd.DataFrame, existing_ids: set) -> pd.DataFrame:
 
 def append_new_rows(originals_path: str, new_rows_df: pd.DataFrame) -> int:
     """
-    Append new rows to the originals CSV.
+    Append new rows to the originals CSV crash-safely (see Utils.atomic_append).
     """
     if new_rows_df.empty:
         sub("[append_new_rows] No new rows to append.")
         return 0
 
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(originals_path), exist_ok=True)
-    file_exists = os.path.exists(originals_path)
-
-    new_rows_df.to_csv(
-        originals_path,
-        mode="a",
-        header=not file_exists,
-        index=False,
-    )
+    # Segment + journal + fsync, so a crash can never leave a torn row
+    atomic_append_csv(originals_path, new_rows_df)
 
     sub(f"[append_new_rows] Wrote {len(new_rows_df)} rows to {originals_path}.")
     return len(new_rows_df)
@@ -182,6 +203,8 @@ def run_originals_capture(
     transaction_master_csv: str,
     originals_csv: str,
     days_back: int = 30,
+    originals_store_dir: Optional[str] = None,
+    engine: Optional[str] = None,
 ) -> int:
     """
     Orchestrate the Originals capture for PIOR.
@@ -192,11 +215,30 @@ def run_originals_capture(
       the last `days_back` days.
     - Within that window, any DOC_KEY that does not exist in Originals
       is treated as a new invoice and appended.
+
+    If `originals_store_dir` is given, Originals live in the month-segmented
+    store (see Utils.originals_segments) instead of `originals_csv`.
+
+    `engine` "duckdb" runs steps 1-6 as one query over the files (see
+    Utils.duckdb_backend) and appends the same rows; the default comes from
+    set_capture_engine / PIOR_CAPTURE_ENGINE ("pandas").
     """
     step_header("STEP: Originals Capture")
 
-    # Step 1: Load Transaction Master
-    src_full = load_csv(transaction_master_csv)
+    # Step 0: Finish or undo any append interrupted by a previous run
+    recover_pending_append(originals_csv)
+
+    if not originals_store_dir and resolve_capture_engine(engine) == "duckdb":
+        from Utils.duckdb_backend import originals_new_rows
+
+        new_rows = originals_new_rows(transaction_master_csv, originals_csv, days_back)
+        written = append_new_rows(originals_csv, new_rows)
+        sub(f"[run_originals_capture] Capture complete. Rows written: {written}")
+        print("=" * 55)
+        return written
+
+    # Step 1: Load Transaction Master (just its recent head when sorted)
+    src_full = load_recent_transaction_master(transaction_master_csv, days_back)
     if src_full.empty:
         sub("[run_originals_capture] Source CSV empty or missing. Nothing to do.")
         print("=" * 55)
@@ -212,19 +254,20 @@ def run_originals_capture(
         print("=" * 55)
         return 0
 
-    # Ensure ENTRY_DATE is datetime for potential future debugging
+    # Ensure ENTRY_DATE is datetime for potential future debugging.
+    # Same parser (and cached values) as the window filter above; the old
+    # dayfirst=True re-parse swapped day and month of ISO dates.
     src_recent = src_recent.copy()
-    src_recent["ENTRY_DATE"] = pd.to_datetime(
-        src_recent["ENTRY_DATE"],
-        errors="coerce",
-        dayfirst=True,
-    )
+    src_recent["ENTRY_DATE"] = parse_dates(src_recent["ENTRY_DATE"], "ENTRY_DATE")
 
     sub(
         f"[run_originals_capture] Recent slice has {len(src_recent):,} rows "
         f"for days_back={days_back}"
     )
 
+    if originals_store_dir:
+        return _capture_into_segment_store(src_recent, originals_store_dir)
+
     # Step 4: Load Originals
     orig_df = load_csv(originals_csv)
 
@@ -278,3 +321,105 @@ def run_originals_capture(
     print("=" * 55)
 
     return written
+
+
+def _capture_into_segment_store(src_recent: pd.DataFrame, store_dir: str) -> int:
+    """
+    Steps 4-7 against the segmented Originals store: only the segments whose
+    key range and bloom filter may hold a recent DOC_KEY are opened.
+    """
+    store = OriginalsSegmentStore(store_dir)
+
+    src_recent = src_recent.copy()
+    src_recent["DOC_KEY"] = src_recent["DOC_ID"].apply(normalize_doc_id)
+    src_recent = src_recent.drop_duplicates(subset=["DOC_KEY"], keep="first")
+
+    existing = store.existing_keys(src_recent["DOC_KEY"])
+    new_rows = src_recent[~src_recent["DOC_KEY"].isin(existing)].drop(columns=["DOC_KEY"])
+
+    sub(f"[run_originals_capture] New DOC_KEYs to append: {len(new_rows):,}")
+
+    written = store.append(new_rows.reset_index(drop=True))
+    sub(f"[run_originals_capture] Capture complete. Rows written: {written}")
+    print("=" * 55)
+    return written
+
+
+def load_existing_doc_keys(originals_csv: str) -> set:
+    """
+    Read only the DOC_ID column of the Originals CSV and return its
+    normalised DOC_KEYs.
+    """
+    path = resolve_csv_path(originals_csv)
+    if not os.path.exists(path):
+        sub(f"[load_existing_doc_keys] {path} not found. No existing DOC_IDs.")
+        return set()
+
+    doc_ids = read_table(path, usecols=["DOC_ID"])["DOC_ID"]
+    keys = set(doc_ids.fillna("").str.lstrip("0"))
+    sub(f"[load_existing_doc_keys] Found {len(keys):,} existing DOC_KEYs in {path}")
+    return keys
+
+
+def run_originals_capture_from_db(
+    db,
+    originals_csv: str,
+    days_back: int = 30,
+    originals_store_dir: Optional[str] = None,
+    sql_file: str = ORIGINALS_WINDOW_SQL,
+    batch_size: int = 10000,
+) -> int:
+    """
+    Originals capture with the ENTRY_DATE window pushed down to Oracle.
+
+    Instead of loading the full Transaction Master CSV and filtering it in
+    pandas, `sql_file` is run with a bound `:cutoff_date` (today at midnight
+    minus `days_back`, the same cutoff as filter_recent_by_entry_date) and
+    only the ORIGINALS_COLUMNS projection is streamed back in batches. New
+    rows are then found with a DOC_ID-only read of Originals (or the
+    segment store's key index) and appended.
+    """
+    step_header("STEP: Originals Capture (DB window)")
+
+    # Step 0: Finish or undo any append interrupted by a previous run
+    recover_pending_append(originals_csv)
+
+    # Step 1: Stream the recent window from Oracle
+    cutoff_ts = entry_date_cutoff(days_back)
+
+    query, params = load_sql(sql_file, {"cutoff_date": cutoff_ts.to_pydatetime()})
+
+    batches = [
+        pd.DataFrame(rows, columns=columns)
+        for columns, rows in db.run_in_batches(query, batch_size=batch_size, params=params)
+    ]
+    if not batches:
+        sub(f"[run_originals_capture_from_db] No rows since {cutoff_ts.date()}. Nothing to do.")
+        print("=" * 55)
+        return 0
+
+    src_recent = to_originals_schema(pd.concat(batches, ignore_index=True))
+    src_recent["ENTRY_DATE"] = parse_dates(src_recent["ENTRY_DATE"], "ENTRY_DATE")
+
+    sub(
+        f"[run_originals_capture_from_db] Window has {len(src_recent):,} rows "
+        f"(cutoff = {cutoff_ts.date()}, {len(batches)} batch(es))"
+    )
+
+    if originals_store_dir:
+        return _capture_into_segment_store(src_recent, originals_store_dir)
+
+    # Step 2: Key lookup against Originals
+    existing_keys = load_existing_doc_keys(originals_csv)
+
+    src_recent["DOC_KEY"] = src_recent["DOC_ID"].apply(normalize_doc_id)
+    src_recent = src_recent.drop_duplicates(subset=["DOC_KEY"], keep="first")
+    new_rows = src_recent[~src_recent["DOC_KEY"].isin(existing_keys)].drop(columns=["DOC_KEY"])
+
+    sub(f"[run_originals_capture_from_db] New DOC_KEYs to append: {len(new_rows):,}")
+
+    # Step 3: Append
+    written = append_new_rows(originals_csv, new_rows)
+    sub(f"[run_originals_capture_from_db] Capture complete. Rows written: {written}")
+    print("=" * 55)
+    return written
@@ -0,0 +1,317 @@
+import json
+import math
+import os
+from typing import Dict, Iterable, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from Utils.atomic_append import atomic_append_csv, recover_pending_append
+from Utils.csv_io import read_table
+from Utils.date_parsing import parse_dates
+from Utils.pretty_print import sub
+
+# Segmented Originals store.
+#
+# Instead of one monolithic append-only CSV, Originals rows are stored in one
+# CSV segment per ENTRY_DATE month (originals_YYYY-MM.csv) inside a store
+# folder, plus a manifest.json describing each segment:
+#   - row count and file size (used to detect a stale manifest after a crash)
+#   - min/max normalised DOC_KEY
+#   - a key bloom filter persisted next to the segment (.bloom.npy)
+#
+# Capture appends only to the month segments of the new rows (in practice the
+# current month), and lookups only open segments whose key range and bloom
+# filter say they may contain one of the requested keys.
+
+MANIFEST_NAME = "manifest.json"
+UNKNOWN_MONTH = "unknown"
+BLOOM_FALSE_POSITIVE_RATE = 0.01
+MIN_BLOOM_CAPACITY = 10_000
+
+
+def _doc_keys(doc_ids: pd.Series) -> pd.Series:
+    """Vectorised normalize_doc_id: the DOC_ID as text without leading zeros."""
+    return doc_ids.astype(object).astype(str).str.lstrip("0").reset_index(drop=True)
+
+
+def _key_order(keys: pd.Series):
+    """Sort helper for DOC_KEYs: shorter numeric keys are smaller (123 < 1000)."""
+    return keys.str.len().to_numpy(), keys.to_numpy(dtype=object)
+
+
+def _in_key_range(keys: pd.Series, min_key: str, max_key: str) -> np.ndarray:
+    lengths, values = _key_order(keys)
+    above_min = (lengths > len(min_key)) | ((lengths == len(min_key)) & (values >= min_key))
+    below_max = (lengths < len(max_key)) | ((lengths == len(max_key)) & (values <= max_key))
+    return above_min & below_max
+
+
+def _min_max_key(keys: pd.Series):
+    ordered = keys.iloc[np.lexsort(_key_order(keys)[::-1])]
+    return ordered.iloc[0], ordered.iloc[-1]
+
+
+class KeyBloomFilter:
+    """
+    Vectorised bloom filter over DOC_KEY strings.
+
+    Two independent 64-bit pandas hashes are combined with double hashing
+    (h1 + i * h2) to derive the bit positions, so adding or probing a whole
+    column is a handful of NumPy operations rather than a Python loop.
+    """
+
+    def __init__(self, capacity: int, bits: Optional[np.ndarray] = None, n_hashes: Optional[int] = None):
+        self.capacity = max(int(capacity), MIN_BLOOM_CAPACITY)
+        n_bits = math.ceil(-self.capacity * math.log(BLOOM_FALSE_POSITIVE_RATE) / (math.log(2) ** 2))
+        self.n_hashes = n_hashes or max(1, round(n_bits / self.capacity * math.log(2)))
+        self.bits = bits if bits is not None else np.zeros(n_bits, dtype=bool)
+
+    def _positions(self, keys: pd.Series) -> np.ndarray:
+        values = keys.astype(str)
+        h1 = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        h2 = pd.util.hash_pandas_object(values, index=False, hash_key="originals-bloom2").to_numpy()
+        steps = np.arange(self.n_hashes, dtype=np.uint64)
+        return (h1[:, None] + steps[None, :] * (h2[:, None] | np.uint64(1))) % np.uint64(len(self.bits))
+
+    def add(self, keys: pd.Series) -> None:
+        if len(keys):
+            self.bits[self._positions(keys).ravel()] = True
+
+    def might_contain(self, keys: pd.Series) -> np.ndarray:
+        if not len(keys):
+            return np.zeros(0, dtype=bool)
+        return self.bits[self._positions(keys)].all(axis=1)
+
+    def save(self, path: str) -> None:
+        tmp = path + ".tmp.npy"
+        np.save(tmp, np.packbits(self.bits))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, capacity: int, n_hashes: int, n_bits: int) -> "KeyBloomFilter":
+        bits = np.unpackbits(np.load(path))[:n_bits].astype(bool)
+        return cls(capacity, bits=bits, n_hashes=n_hashes)
+
+
+class OriginalsSegmentStore:
+    """
+    Month-partitioned Originals store with a manifest of per-segment stats.
+    """
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        self.manifest_path = os.path.join(store_dir, MANIFEST_NAME)
+        self.segments: Dict[str, dict] = {}
+        self._blooms: Dict[str, KeyBloomFilter] = {}
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.segments = json.load(f).get("segments", {})
+            self._refresh_stale_segments()
+
+    # ------------------------------------------------------------------
+    # Paths and persistence
+    # ------------------------------------------------------------------
+    def segment_path(self, month: str) -> str:
+        return os.path.join(self.store_dir, f"originals_{month}.csv")
+
+    def _bloom_path(self, month: str) -> str:
+        return os.path.join(self.store_dir, f"originals_{month}.bloom.npy")
+
+    def _save_manifest(self) -> None:
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "segments": self.segments}, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.manifest_path)
+
+    def _bloom(self, month: str) -> KeyBloomFilter:
+        if month not in self._blooms:
+            meta = self.segments[month]
+            self._blooms[month] = KeyBloomFilter.load(
+                self._bloom_path(month),
+                capacity=meta["bloom_capacity"],
+                n_hashes=meta["bloom_hashes"],
+                n_bits=meta["bloom_bits"],
+            )
+        return self._blooms[month]
+
+    def _read_keys(self, month: str) -> pd.Series:
+        """Read only the DOC_ID column of a segment, as DOC_KEYs."""
+        df = read_table(self.segment_path(month), usecols=["DOC_ID"])
+        return _doc_keys(df["DOC_ID"])
+
+    def _rebuild_segment(self, month: str) -> None:
+        """Recompute a segment's stats and bloom filter from its CSV file."""
+        path = self.segment_path(month)
+        self.segments[month] = {"file": os.path.basename(path), "rows": 0}
+        self._blooms.pop(month, None)
+        self._update_stats(month, self._read_keys(month))
+        self.segments[month]["bytes"] = os.path.getsize(path)
+
+    def _refresh_stale_segments(self) -> None:
+        """
+        Finish interrupted appends and rebuild any segment whose file size no
+        longer matches the manifest (e.g. a crash between append and manifest save).
+        """
+        stale = []
+        for month in list(self.segments):
+            path = self.segment_path(month)
+            recover_pending_append(path)
+            if not os.path.exists(path):
+                del self.segments[month]
+                stale.append(month)
+            elif os.path.getsize(path) != self.segments[month].get("bytes"):
+                self._rebuild_segment(month)
+                stale.append(month)
+
+        if stale:
+            sub(f"[OriginalsStore] Refreshed stale manifest entries: {sorted(stale)}")
+            self._save_manifest()
+
+    def _update_stats(self, month: str, keys: pd.Series) -> None:
+        """Fold new DOC_KEYs into a segment's row count, key range and bloom filter."""
+        meta = self.segments[month]
+        rows = meta["rows"] + len(keys)
+
+        if len(keys):
+            lo, hi = _min_max_key(keys)
+            if "min_key" in meta:
+                lo = min(lo, meta["min_key"], key=lambda k: (len(k), k))
+                hi = max(hi, meta["max_key"], key=lambda k: (len(k), k))
+            meta["min_key"], meta["max_key"] = lo, hi
+
+        if "bloom_capacity" not in meta:
+            bloom = KeyBloomFilter(capacity=rows * 2)
+        elif rows > meta["bloom_capacity"]:
+            # Over capacity: rebuild a larger filter from the keys already on disk
+            bloom = KeyBloomFilter(capacity=rows * 2)
+            bloom.add(self._read_keys(month))
+        else:
+            bloom = self._bloom(month)
+
+        bloom.add(keys)
+        bloom.save(self._bloom_path(month))
+        self._blooms[month] = bloom
+
+        meta["rows"] = rows
+        meta["bloom_capacity"] = bloom.capacity
+        meta["bloom_hashes"] = bloom.n_hashes
+        meta["bloom_bits"] = len(bloom.bits)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def append(self, new_rows_df: pd.DataFrame) -> int:
+        """
+        Append rows to their ENTRY_DATE month segments. Returns rows written.
+
+        The manifest (including bloom filters) is saved before the rows are
+        appended, so after a crash it can only over-report keys, which
+        costs an extra segment read but never a missed duplicate.
+        """
+        if new_rows_df.empty:
+            return 0
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        months = entry_months(new_rows_df["ENTRY_DATE"])
+        keys = _doc_keys(new_rows_df["DOC_ID"])
+
+        written = 0
+        for month in sorted(months.unique()):
+            mask = (months == month).to_numpy()
+            self.segments.setdefault(month, {"file": os.path.basename(self.segment_path(month)), "rows": 0})
+            self._update_stats(month, keys[mask])
+            self._save_manifest()
+
+            written += atomic_append_csv(self.segment_path(month), new_rows_df[mask])
+            self.segments[month]["bytes"] = os.path.getsize(self.segment_path(month))
+            self._save_manifest()
+
+        sub(
+            f"[OriginalsStore] Appended {written:,} row(s) to "
+            f"{months.nunique()} segment(s) in '{self.store_dir}'."
+        )
+        return written
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def candidate_segments(self, keys: pd.Series) -> Dict[str, np.ndarray]:
+        """
+        Return {month: mask over `keys`} for segments that may hold any of them,
+        using the key range first and the bloom filter second.
+        """
+        candidates = {}
+        for month, meta in sorted(self.segments.items()):
+            if not meta.get("rows"):
+                continue
+            mask = _in_key_range(keys, meta["min_key"], meta["max_key"])
+            if mask.any():
+                mask[mask] = self._bloom(month).might_contain(keys[mask])
+            if mask.any():
+                candidates[month] = mask
+        return candidates
+
+    def existing_keys(self, keys: Iterable[str]) -> Set[str]:
+        """Return the subset of the given DOC_KEYs that are already stored."""
+        keys = pd.Series(pd.unique(pd.Series(list(keys), dtype=object)), dtype=object)
+        candidates = self.candidate_segments(keys) if len(keys) else {}
+
+        found: Set[str] = set()
+        for month, mask in candidates.items():
+            found.update(set(keys[mask]).intersection(self._read_keys(month)))
+
+        sub(
+            f"[OriginalsStore] {len(found):,} of {len(keys):,} DOC_KEY(s) already stored "
+            f"(opened {len(candidates)} of {len(self.segments)} segment(s))."
+        )
+        return found
+
+    def load_for_doc_ids(self, doc_ids: pd.Series) -> pd.DataFrame:
+        """Load Originals rows from only the segments that may hold these DOC_IDs."""
+        keys = pd.Series(pd.unique(_doc_keys(doc_ids)), dtype=object)
+        months = sorted(self.candidate_segments(keys))
+        if not months:
+            sub("[OriginalsStore] No segment can contain the requested DOC_IDs.")
+            return pd.DataFrame()
+
+        frames = [read_table(self.segment_path(m)) for m in months]
+        df = pd.concat(frames, ignore_index=True)
+        sub(
+            f"[OriginalsStore] Loaded {len(df):,} Originals row(s) from "
+            f"{len(months)} of {len(self.segments)} segment(s)."
+        )
+        return df
+
+    def total_rows(self) -> int:
+        return sum(meta.get("rows", 0) for meta in self.segments.values())
+
+
+def entry_months(entry_dates: pd.Series) -> pd.Series:
+    """Map ENTRY_DATE values (text or datetime) to 'YYYY-MM' segment names."""
+    parsed = parse_dates(entry_dates, "ENTRY_DATE")
+    months = parsed.dt.strftime("%Y-%m")
+    return months.astype(object).where(parsed.notna(), UNKNOWN_MONTH).reset_index(drop=True)
+
+
+def build_segments_from_csv(originals_csv: str, store_dir: str, chunksize: int = 500_000) -> int:
+    """
+    One-off migration: split a monolithic Originals CSV into month segments.
+    """
+    if os.path.exists(os.path.join(store_dir, MANIFEST_NAME)):
+        raise ValueError(
+            f"[OriginalsStore] '{store_dir}' already has a manifest. "
+            "Refusing to migrate into an existing store."
+        )
+
+    store = OriginalsSegmentStore(store_dir)
+    written = 0
+    for chunk in pd.read_csv(originals_csv, dtype=str, low_memory=False, chunksize=chunksize):
+        written += store.append(chunk.reset_index(drop=True))
+
+    sub(f"[OriginalsStore] Migrated {written:,} row(s) from '{originals_csv}' into '{store_dir}'.")
+    return written
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+# Packed string columns and stable string hashes for the numpy indexes
+# (Utils.vendor_index, Utils.duplicate_invoices, Utils.change_history).
+#
+# A packed column is the UTF-8 bytes of every value back to back in one
+# uint8 array, plus int64 start offsets (one more than the values):
+#   value i = blob[offsets[i]:offsets[i + 1]]
+# Both save to .npz as plain arrays, with no pickled objects.
+#
+# hash_packed / hash_strings give the 64-bit FNV-1a of each value. Unlike
+# hash(), the result does not depend on the run or process, so the hashes
+# can be persisted and compared across runs.
+
+FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+FNV_PRIME = np.uint64(0x100000001B3)
+
+
+def pack_strings(values):
+    """UTF-8 bytes of every value back to back, plus start offsets (len + 1)."""
+    strings = pd.Series(values, dtype=object).fillna("").astype(str).tolist()
+    # One encode of NUL-separated values; the NULs give the byte offsets
+    joined = np.frombuffer("\x00".join(strings).encode("utf-8"), dtype=np.uint8)
+    separators = np.flatnonzero(joined == 0)
+    if len(separators) != max(len(strings) - 1, 0):
+        # A value contains NUL itself: encode one at a time
+        encoded = [v.encode("utf-8") for v in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    offsets[1:-1] = separators - np.arange(len(separators))
+    offsets[-1] = len(joined) - len(separators)
+    return joined[joined != 0], offsets
+
+
+def unpack_strings(blob: np.ndarray, offsets: np.ndarray, positions) -> list:
+    """The packed values at `positions`, as str."""
+    data = blob.tobytes()
+    return [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in positions]
+
+
+def hash_packed(blob: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    64-bit FNV-1a of each packed string, vectorised one byte position at a
+    time over the strings that are still that long.
+    """
+    starts, lengths = offsets[:-1], np.diff(offsets)
+    hashes = np.full(len(starts), FNV_OFFSET, dtype=np.uint64)
+    if len(starts) == 0:
+        return hashes
+
+    # Longest first, so the strings with a byte at position j are a prefix
+    order = np.argsort(-lengths, kind="stable")
+    starts, lengths = starts[order], lengths[order]
+    for j in range(int(lengths[0])):
+        live = np.searchsorted(-lengths, -j, side="left")
+        hashes[:live] = (hashes[:live] ^ blob[starts[:live] + j]) * FNV_PRIME
+
+    result = np.empty_like(hashes)
+    result[order] = hashes
+    return result
+
+
+def hash_strings(values) -> np.ndarray:
+    """64-bit FNV-1a of each value (missing values hash as '')."""
+    return hash_packed(*pack_strings(values))
@@ -0,0 +1,157 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from Utils.pretty_print import sub
+
+# Per-job profiling for `python main.py run ... --profile`.
+#
+# profile_job() wraps one job and writes to a run directory under
+# logs/profiles/<timestamp>/:
+#   <job>.pstats      cProfile data (open with `python -m pstats` or snakeviz)
+#   <job>.txt         top functions by cumulative and own time
+#   <job>.alloc.txt   top allocation sites (tracemalloc, net growth during the job)
+#   <job>.collapsed   sampled stacks of every thread in collapsed format
+#                     ("thread;outer;...;inner count"), the input of
+#                     flamegraph.pl, speedscope and inferno
+#
+# cProfile sees only the calling thread; the stack sampler covers the worker
+# threads (async exports, sharded capture) as well. Profiling slows the job
+# down, tracemalloc most of all, so timings are for comparing hot spots, not
+# for comparing with an unprofiled run.
+
+PROFILES_DIR = os.path.join("logs", "profiles")
+DEFAULT_TOP_N = 30
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+
+
+def new_profile_dir(base_dir=PROFILES_DIR):
+    """Create and return a timestamped directory for this run's profiles."""
+    path = os.path.join(base_dir, datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Background thread that samples every other thread's Python stack with
+    sys._current_frames() and counts identical stacks.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write_collapsed(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _write_stats_report(profiler, path, top_n):
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer).strip_dirs()
+    buffer.write("== by cumulative time ==\n")
+    stats.sort_stats("cumulative").print_stats(top_n)
+    buffer.write("\n== by own time ==\n")
+    stats.sort_stats("tottime").print_stats(top_n)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(buffer.getvalue())
+    return stats
+
+
+def _write_alloc_report(before, after, path, top_n):
+    growth = after.compare_to(before, "lineno")[:top_n]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"Top {len(growth)} allocation sites by net growth\n")
+        for stat in growth:
+            f.write(f"{stat}\n")
+    return growth
+
+
+@contextmanager
+def profile_job(name, profile_dir, top_n=DEFAULT_TOP_N, trace_memory=True):
+    """
+    Profile the body of the `with` block as job `name` and write its
+    reports to `profile_dir`. The reports are written even if the job fails.
+    """
+    os.makedirs(profile_dir, exist_ok=True)
+    base = os.path.join(profile_dir, name)
+
+    started_tracemalloc = False
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started_tracemalloc = True
+    before = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+
+    sampler = StackSampler()
+    profiler = cProfile.Profile()
+    sampler.start()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - started
+        sampler.stop()
+
+        profiler.dump_stats(base + ".pstats")
+        stats = _write_stats_report(profiler, base + ".txt", top_n)
+        sampler.write_collapsed(base + ".collapsed")
+
+        growth = []
+        if before is not None:
+            growth = _write_alloc_report(before, tracemalloc.take_snapshot(), base + ".alloc.txt", top_n)
+        if started_tracemalloc:
+            tracemalloc.stop()
+
+        _print_hot_spots(name, stats, growth, elapsed, base)
+
+
+def _print_hot_spots(name, stats, growth, elapsed, base, count=5):
+    sub(f"[profile] {name}: {elapsed:.2f}s profiled, reports in {base}.*")
+    by_own_time = sorted(stats.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:count]
+    for (filename, line, function), (_, _, own, cumulative, _) in by_own_time:
+        sub(f"[profile]   {own:8.3f}s own {cumulative:8.3f}s cum  {function} ({filename}:{line})")
+    for stat in growth[:count]:
+        frame = stat.traceback[0]
+        sub(
+            f"[profile]   {stat.size_diff / 1024 / 1024:8.1f} MB  "
+            f"{os.path.basename(frame.filename)}:{frame.lineno}"
+        )
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+# Run manifest for the SQL exports: one JSON file next to the outputs
+# (Output_Files/run_manifest.json) holding, per output filename, the digest
+# of the last exported result stream plus a few facts about the file.
+#
+# The digest is a SHA-256 over the column names and the per-row hashes of
+# every batch, in fetch order. It depends only on the values the query
+# returned, not on CSV formatting or compression, so it is computed once per
+# batch from the DataFrame the exporter already builds.
+
+RUN_MANIFEST_NAME = "run_manifest.json"
+
+
+def manifest_path_for(output_path: str) -> str:
+    """Return the run manifest that describes `output_path`."""
+    return os.path.join(os.path.dirname(output_path), RUN_MANIFEST_NAME)
+
+
+def load_run_manifest(manifest_path: str) -> dict:
+    """Load the manifest; a missing or unreadable file is an empty manifest."""
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print(f"Run manifest {manifest_path} is unreadable; starting a new one.")
+        return {}
+
+
+def get_export_entry(output_path: str):
+    """Return the manifest entry for `output_path`, or None."""
+    manifest = load_run_manifest(manifest_path_for(output_path))
+    return manifest.get(os.path.basename(output_path))
+
+
+def record_export(output_path: str, **fields) -> dict:
+    """
+    Merge `fields` into the manifest entry for `output_path` and save the
+    manifest atomically (temp file + rename). Returns the updated entry.
+    """
+    manifest_path = manifest_path_for(output_path)
+    manifest = load_run_manifest(manifest_path)
+
+    entry = manifest.get(os.path.basename(output_path), {})
+    entry.update(fields)
+    manifest[os.path.basename(output_path)] = entry
+
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+    return entry
+
+
+def new_result_digest(columns):
+    """Start a result-stream digest, seeded with the column names."""
+    digest = hashlib.sha256()
+    digest.update("\x1f".join(str(c) for c in columns).encode("utf-8"))
+    return digest
+
+
+def update_result_digest(digest, df: "pd.DataFrame") -> None:
+    """Fold one batch into the digest (vectorised per-row hashes)."""
+    import pandas as pd
+
+    if df.empty:
+        return
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+
+
+def output_matches_entry(output_path: str, entry, digest_hex: str) -> bool:
+    """
+    True when the previous run exported the same result to `output_path`
+    and the file on disk is still the one it wrote.
+    """
+    if not entry or entry.get("digest") != digest_hex:
+        return False
+    if not os.path.exists(output_path):
+        return False
+    return os.path.getsize(output_path) == entry.get("bytes")
+
+
+def timestamp() -> str:
+    return datetime.now().isoformat(timespec="seconds")
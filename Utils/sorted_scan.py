@@ -0,0 +1,92 @@
+import os
+from typing import Optional
+
+import pandas as pd
+
+from Utils.csv_io import iter_table_chunks
+from Utils.date_parsing import parse_dates
+from Utils.pretty_print import sub
+from Utils.run_manifest import get_export_entry
+
+# Early-terminating scan of exports sorted newest-first.
+#
+# SQL/transaction_master.sql ends with ORDER BY ENTRY_DATE DESC, BUDAT DESC,
+# so the rows of the last N days are the head of transaction_master.csv.
+# read_recent_rows() reads the file in chunks and stops at the first chunk
+# holding a date below the cutoff, instead of parsing the whole file.
+#
+# It is only used when the export's run manifest entry (written by
+# SqlExportJob) says the file is sorted that way and still describes this
+# exact file (same size and mtime). While reading, the order is checked
+# again; any row out of order abandons the scan and the caller falls back
+# to a full read. Null dates sort first under Oracle's DESC NULLS FIRST
+# and are skipped like the full filter does.
+
+DEFAULT_SCAN_CHUNK_ROWS = 50_000
+
+
+def is_sorted_desc_by(path: str, column: str) -> bool:
+    """
+    True when the run manifest records `path` as ordered by `column` DESC
+    first, and the file on disk is the one that entry describes.
+    """
+    entry = get_export_entry(path)
+    if not entry or not os.path.exists(path):
+        return False
+    order_by = entry.get("order_by") or []
+    if not order_by or [str(v).upper() for v in order_by[0]] != [column.upper(), "DESC"]:
+        return False
+    if entry.get("bytes") != os.path.getsize(path):
+        return False
+    mtime = entry.get("mtime")
+    return mtime is not None and abs(mtime - os.path.getmtime(path)) < 1e-3
+
+
+def read_recent_rows(
+    path: str,
+    column: str,
+    cutoff: pd.Timestamp,
+    chunk_rows: int = DEFAULT_SCAN_CHUNK_ROWS,
+) -> Optional[pd.DataFrame]:
+    """
+    Return the rows of `path` whose `column` date is >= `cutoff`, reading
+    only the head of the file. Returns None when the sort order cannot be
+    confirmed (manifest or data), in which case the caller should do a
+    full scan.
+    """
+    if not is_sorted_desc_by(path, column):
+        sub(f"[sorted_scan] {os.path.basename(path)} is not known to be sorted by {column} DESC; full scan.")
+        return None
+
+    kept = []
+    rows_read = 0
+    previous_min = None
+    finished = False
+
+    for chunk in iter_table_chunks(path, chunk_rows):
+        rows_read += len(chunk)
+        dates = parse_dates(chunk[column], column)
+        valid = dates.dropna()
+
+        # The order must hold within and across chunks
+        if not valid.is_monotonic_decreasing or (
+            previous_min is not None and not valid.empty and valid.iloc[0] > previous_min
+        ):
+            sub(f"[sorted_scan] {os.path.basename(path)} is out of {column} DESC order; full scan.")
+            return None
+        if not valid.empty:
+            previous_min = valid.iloc[-1]
+
+        in_window = dates.ge(cutoff).fillna(False).to_numpy(dtype=bool)
+        kept.append(chunk[in_window])
+        if not valid.empty and valid.iloc[-1] < cutoff:
+            finished = True
+            break
+
+    result = pd.concat(kept, ignore_index=True) if kept else pd.DataFrame()
+    state = "stopped early" if finished else "reached end of file"
+    sub(
+        f"[sorted_scan] Read {rows_read:,} row(s) of {os.path.basename(path)} ({state}); "
+        f"{len(result):,} on or after {cutoff.date()}."
+    )
+    return result
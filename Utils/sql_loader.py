@@ -0,0 +1,70 @@
+import re
+
+# SQL files declare their bind variables in comment lines, optionally with a
+# default value:
+#
+#   -- :start_date = 2023-07-01
+#   -- :cutoff_date
+#
+# load_sql() strips those lines and returns the query text plus the bind
+# dict, so the SQL text sent to Oracle stays identical from run to run and
+# its cursor / plan can be reused (values only travel as binds).
+
+_PARAM_DECLARATION = re.compile(r"^\s*--\s*:(\w+)\s*(?:=\s*(.*?))?\s*$")
+
+
+def parse_sql(text: str):
+    """
+    Split SQL text into (query, declared) where declared maps each declared
+    bind name to its default value (None when no default is given).
+    """
+    declared = {}
+    query_lines = []
+
+    for line in text.splitlines():
+        match = _PARAM_DECLARATION.match(line)
+        if match:
+            name, default = match.group(1), match.group(2)
+            declared[name] = default if default else None
+        else:
+            query_lines.append(line)
+
+    return "\n".join(query_lines).strip(), declared
+
+
+def load_sql(path: str, overrides: dict = None):
+    """
+    Load a SQL file and resolve its declared bind variables.
+
+    Parameters
+    ----------
+    path : str
+        SQL file to read.
+    overrides : dict or None
+        Values that replace the declared defaults (e.g. {"start_date": "2024-01-01"}).
+
+    Returns
+    -------
+    (str, dict)
+        The query text and the bind dict to pass to OracleConnection.
+
+    Raises
+    ------
+    ValueError
+        If an override names an undeclared parameter, or a declared parameter
+        has neither a default nor an override.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        query, declared = parse_sql(f.read())
+
+    overrides = overrides or {}
+    unknown = sorted(set(overrides) - set(declared))
+    if unknown:
+        raise ValueError(f"{path} does not declare parameter(s): {', '.join(unknown)}")
+
+    params = {**declared, **overrides}
+    missing = sorted(name for name, value in params.items() if value is None)
+    if missing:
+        raise ValueError(f"{path} needs a value for parameter(s): {', '.join(missing)}")
+
+    return query, params
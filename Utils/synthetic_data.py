@@ -0,0 +1,334 @@
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from Utils.abn import make_valid_abns
+from Utils.changed_data_csv import (
+    CHANGED_COMPARE_COLUMNS,
+    build_changed_output_rows,
+    detect_changed_rows,
+    filter_posted_changes,
+)
+from Utils.originals_capture_csv import ORIGINALS_COLUMNS
+from Utils.pretty_print import sub
+
+# This module generates realistic synthetic Transaction Master, Originals and
+# Changed Data CSVs so the capture jobs can be tested and benchmarked at
+# production scale (hundreds of thousands to millions of rows) without
+# needing access to the Oracle source.
+# Key features:
+# - Deterministic output for a given seed
+# - Controllable churn rate (share of Originals whose OCR fields were corrected)
+# - Duplicate DOC_IDs by normalised key (e.g. '000000000123' vs '123')
+# - Leading-zero DOC_IDs and a configurable terminal status mix
+
+# OCR-read fields that may be corrected after capture (drives churn)
+CHURN_COLUMNS = [
+    "DOC_DATE",
+    "COMPANY_CODE",
+    "VENDOR_NUM",
+    "VENDOR_NAME_1",
+    "ABN",
+    "INVOICE_NUMBER",
+    "AMOUNT",
+]
+
+COMPANY_CODES = ["1000", "1100", "1200", "1300", "1400", "1500", "2000", "9999"]
+COMPANY_CODE_WEIGHTS = [0.30, 0.15, 0.15, 0.10, 0.10, 0.08, 0.10, 0.02]
+
+INVOICE_TYPES = ["ZPO_INV", "ZNPO_INV", "ZPO_CRN", "ZNPO_CRN"]
+INVOICE_TYPE_WEIGHTS = [0.60, 0.30, 0.06, 0.04]
+
+NON_TERMINAL_STATUSES = [
+    "Created",
+    "In workflow",
+    "Parked",
+    "Awaiting approval",
+    "Exception",
+]
+
+TERMINAL_STATUSES = [
+    "Posted",
+    "Obsolete",
+    "Cancelled",
+    "Deleted",
+    "Confirmed duplicate",
+]
+TERMINAL_STATUS_WEIGHTS = [0.80, 0.06, 0.06, 0.05, 0.03]
+
+VENDOR_WORDS = [
+    "HEALTH", "MEDICAL", "SUPPLIES", "PHARMA", "CARE", "SERVICES", "AUST",
+    "QUEENSLAND", "SURGICAL", "CLEANING", "LOGISTICS", "FOODS", "TECH",
+    "ENGINEERING", "LINEN", "DIAGNOSTICS", "LABORATORIES", "HOLDINGS",
+    "NORTHERN", "COASTAL", "PACIFIC", "BRISBANE", "GROUP", "INDUSTRIES",
+]
+VENDOR_SUFFIXES = ["PTY LTD", "P/L", "LIMITED", "PTY. LTD.", ""]
+
+DOC_ID_WIDTH = 12
+
+
+def _format_dates(base: pd.Timestamp, day_offsets: np.ndarray, with_time: bool = False) -> np.ndarray:
+    """Render day offsets before `base` in the same format the exporter writes."""
+    dates = base - pd.to_timedelta(day_offsets, unit="D")
+    if with_time:
+        return np.asarray(dates.strftime("%Y-%m-%d %H:%M:%S"), dtype=object)
+    return np.asarray(dates.strftime("%Y-%m-%d"), dtype=object)
+
+
+def _build_vendor_pool(rng: np.random.Generator, n_vendors: int) -> pd.DataFrame:
+    """Build a pool of vendors (number, names, ABN) that invoices draw from."""
+    words = np.array(VENDOR_WORDS, dtype=object)
+    suffixes = np.array(VENDOR_SUFFIXES, dtype=object)
+
+    first = words[rng.integers(0, len(words), n_vendors)]
+    second = words[rng.integers(0, len(words), n_vendors)]
+    suffix = suffixes[rng.integers(0, len(suffixes), n_vendors)]
+    name_1 = pd.Series(first + " " + second + " " + suffix).str.strip()
+
+    # Most vendors have no second name line
+    name_2 = np.where(
+        rng.random(n_vendors) < 0.15,
+        "ATTN ACCOUNTS " + pd.Series(rng.integers(1, 99, n_vendors)).astype(str),
+        None,
+    )
+
+    vendor_num = pd.Series(rng.integers(3_000_000, 3_999_999, n_vendors)).astype(str)
+    # Real ABNs pass the modulus-89 check, so only OCR churn produces invalid ones
+    abn = pd.Series(make_valid_abns(rng.integers(0, 10**9, n_vendors)))
+
+    return pd.DataFrame(
+        {
+            "VENDOR_NUM": vendor_num.to_numpy(dtype=object),
+            "VENDOR_NAME_1": name_1.to_numpy(dtype=object),
+            "VENDOR_NAME_2": name_2,
+            "ABN": abn.to_numpy(dtype=object),
+        }
+    )
+
+
+def generate_transaction_master(
+    n_rows: int,
+    seed: int = 0,
+    duplicate_rate: float = 0.001,
+    leading_zero_rate: float = 0.5,
+    terminal_rate: float = 0.85,
+    days_span: int = 900,
+    today: Optional[pd.Timestamp] = None,
+) -> pd.DataFrame:
+    """
+    Generate a synthetic Transaction Master DataFrame with string values.
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of Transaction Master rows.
+    duplicate_rate : float
+        Share of rows whose DOC_ID is a differently padded copy of another
+        row's DOC_ID (same normalised key, different raw value).
+    leading_zero_rate : float
+        Share of DOC_IDs written zero-padded to 12 characters.
+    terminal_rate : float
+        Share of rows whose current status is terminal (Posted, Cancelled, ...).
+    days_span : int
+        ENTRY_DATE values are spread over the last `days_span` days.
+
+    Rows are sorted by ENTRY_DATE DESC, POSTING_DATE DESC to match
+    SQL/transaction_master.sql.
+    """
+    rng = np.random.default_rng(seed)
+    today = (today or pd.Timestamp.today()).normalize()
+
+    # DOC_IDs: unique integers, some rendered with leading zeros
+    ids = rng.choice(np.arange(10_000_000, 10_000_000 + n_rows * 3), size=n_rows, replace=False)
+    raw_ids = pd.Series(ids).astype(str)
+    padded = rng.random(n_rows) < leading_zero_rate
+    raw_ids[padded] = raw_ids[padded].str.zfill(DOC_ID_WIDTH)
+
+    # Duplicates: replace a DOC_ID with the other rendering of another row's key
+    n_dupes = int(n_rows * duplicate_rate)
+    if n_dupes > 0:
+        picks = rng.choice(n_rows, size=n_dupes * 2, replace=False)
+        sources, targets = picks[:n_dupes], picks[n_dupes:]
+        source_ids = pd.Series(ids[sources]).astype(str)
+        source_padded = padded[sources]
+        source_ids[~source_padded] = source_ids[~source_padded].str.zfill(DOC_ID_WIDTH)
+        raw_ids.iloc[targets] = source_ids.to_numpy()
+
+    # Vendors
+    vendors = _build_vendor_pool(rng, max(50, n_rows // 200))
+    vendor_idx = rng.integers(0, len(vendors), n_rows)
+    vendor_rows = vendors.iloc[vendor_idx].reset_index(drop=True)
+
+    # Dates: ENTRY_DATE within the window, DOC_DATE a little before,
+    # POSTING_DATE a little after
+    entry_offsets = rng.integers(0, days_span, n_rows)
+    posting_offsets = np.maximum(entry_offsets - rng.integers(0, 15, n_rows), 0)
+    order = np.lexsort((posting_offsets, entry_offsets))
+    entry_offsets, posting_offsets = entry_offsets[order], posting_offsets[order]
+    doc_offsets = entry_offsets + rng.integers(0, 20, n_rows)
+
+    statuses = np.where(
+        rng.random(n_rows) < terminal_rate,
+        rng.choice(TERMINAL_STATUSES, n_rows, p=TERMINAL_STATUS_WEIGHTS),
+        rng.choice(NON_TERMINAL_STATUSES, n_rows),
+    )
+
+    amounts = pd.Series(np.round(rng.lognormal(6.5, 1.5, n_rows), 2)).map("{:.2f}".format)
+    invoice_numbers = pd.Series(rng.integers(1, 10**9, n_rows)).astype(str)
+    po_numbers = np.where(
+        rng.random(n_rows) < 0.7,
+        "43" + pd.Series(rng.integers(10**7, 10**8 - 1, n_rows)).astype(str),
+        None,
+    )
+    layout_ids = pd.Series(rng.integers(0, 2**62, n_rows, dtype=np.int64)).map("{:032x}".format)
+
+    tm = pd.DataFrame(
+        {
+            "DOC_ID": raw_ids.to_numpy(dtype=object),
+            "INVOICE_TYPE": rng.choice(INVOICE_TYPES, n_rows, p=INVOICE_TYPE_WEIGHTS),
+            "ENTRY_DATE": _format_dates(today, entry_offsets),
+            "COMPANY_CODE": rng.choice(COMPANY_CODES, n_rows, p=COMPANY_CODE_WEIGHTS),
+            "DOC_DATE": _format_dates(today, doc_offsets),
+            "POSTING_DATE": _format_dates(today, posting_offsets),
+            "INVOICE_NUMBER": invoice_numbers.to_numpy(dtype=object),
+            "AMOUNT": amounts.to_numpy(dtype=object),
+            "VENDOR_NUM": vendor_rows["VENDOR_NUM"].to_numpy(),
+            "VENDOR_NAME_1": vendor_rows["VENDOR_NAME_1"].to_numpy(),
+            "VENDOR_NAME_2": vendor_rows["VENDOR_NAME_2"].to_numpy(),
+            "PO_NUM": po_numbers,
+            "ABN": vendor_rows["ABN"].to_numpy(),
+            "DSS_DOWNLOAD_DATE": _format_dates(today, np.zeros(n_rows, dtype=int), with_time=True),
+            "STATUS_TEXT": statuses,
+            "LAYOUT_ID": layout_ids.to_numpy(dtype=object),
+            "ENTRY_DATE_AND_TIME": _format_dates(today, entry_offsets, with_time=True),
+            "PO_LAST_UPDATED": _format_dates(today, posting_offsets, with_time=True),
+        }
+    )
+    return tm
+
+
+def generate_originals(
+    tm_df: pd.DataFrame,
+    seed: int = 0,
+    churn_rate: float = 0.02,
+    uncaptured_days: int = 2,
+    today: Optional[pd.Timestamp] = None,
+) -> pd.DataFrame:
+    """
+    Generate an Originals snapshot from a synthetic Transaction Master.
+
+    - Every TM row older than `uncaptured_days` is present in Originals,
+      so the Originals capture still has a realistic number of new rows.
+    - A `churn_rate` share of Originals rows carry a different (pre-correction)
+      value in one OCR field and a non-terminal status, so they show up as
+      changed against the current Transaction Master.
+
+    `today` should be the value the Transaction Master was generated with
+    (default: the current date).
+    """
+    rng = np.random.default_rng(seed + 1)
+
+    today = (today or pd.Timestamp.today()).normalize()
+    cutoff = (today - pd.Timedelta(days=uncaptured_days)).strftime("%Y-%m-%d")
+    # ISO date strings compare correctly as text
+    captured = tm_df[tm_df["ENTRY_DATE"] < cutoff]
+    originals = captured[ORIGINALS_COLUMNS].copy().reset_index(drop=True)
+
+    n_rows = len(originals)
+    n_churn = int(n_rows * churn_rate)
+    if n_churn == 0:
+        return originals
+
+    churn_idx = rng.choice(n_rows, size=n_churn, replace=False)
+    churn_cols = rng.choice(CHURN_COLUMNS, size=n_churn)
+
+    for col in CHURN_COLUMNS:
+        rows = churn_idx[churn_cols == col]
+        if len(rows) == 0:
+            continue
+        current = originals.loc[rows, col].fillna("")
+        if col == "COMPANY_CODE":
+            originals.loc[rows, col] = "9999"
+        elif col == "DOC_DATE":
+            originals.loc[rows, col] = "2019-" + current.str[5:]
+        else:
+            # Typical OCR misread: trailing character dropped
+            originals.loc[rows, col] = current.str[:-1]
+
+    originals.loc[churn_idx, "STATUS_TEXT"] = rng.choice(NON_TERMINAL_STATUSES, n_churn)
+    return originals
+
+
+def generate_changed_data(
+    originals_df: pd.DataFrame,
+    tm_df: pd.DataFrame,
+    seed: int = 0,
+    recorded_rate: float = 0.5,
+) -> pd.DataFrame:
+    """
+    Generate an existing Changed Data history: a `recorded_rate` share of the
+    currently changed-and-terminal DOC_IDs, built through the real job logic.
+    """
+    rng = np.random.default_rng(seed + 2)
+
+    # Only DOC_IDs that occur once in Originals can be built one-to-one
+    unique_orig = originals_df.drop_duplicates(subset=["DOC_ID"], keep=False)
+    changed = detect_changed_rows(unique_orig, tm_df, CHANGED_COMPARE_COLUMNS)
+    if changed.empty:
+        return pd.DataFrame()
+
+    changed = filter_posted_changes(changed)
+    if changed.empty:
+        return pd.DataFrame()
+
+    keep = rng.random(len(changed)) < recorded_rate
+    return build_changed_output_rows(changed[keep], tm_df)
+
+
+def write_synthetic_dataset(
+    out_dir: str,
+    n_rows: int,
+    seed: int = 0,
+    churn_rate: float = 0.02,
+    duplicate_rate: float = 0.001,
+    leading_zero_rate: float = 0.5,
+    terminal_rate: float = 0.85,
+    recorded_rate: float = 0.5,
+    today: Optional[pd.Timestamp] = None,
+) -> Dict[str, str]:
+    """
+    Write Transaction Master, Originals and Changed Data CSVs to `out_dir`
+    using the production file names, and return their paths. All dates are
+    relative to `today` (default: the current date).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    paths = {
+        "transaction_master": os.path.join(out_dir, "transaction_master.csv"),
+        "originals": os.path.join(out_dir, "Original_Invoice_Data_CSV.csv"),
+        "changed": os.path.join(out_dir, "Change_Invoice_Data_CSV.csv"),
+    }
+
+    tm = generate_transaction_master(
+        n_rows,
+        seed=seed,
+        duplicate_rate=duplicate_rate,
+        leading_zero_rate=leading_zero_rate,
+        terminal_rate=terminal_rate,
+        today=today,
+    )
+    originals = generate_originals(tm, seed=seed, churn_rate=churn_rate, today=today)
+    changed = generate_changed_data(originals, tm, seed=seed, recorded_rate=recorded_rate)
+
+    tm.to_csv(paths["transaction_master"], index=False)
+    originals.to_csv(paths["originals"], index=False)
+    if not changed.empty:
+        changed.to_csv(paths["changed"], index=False)
+
+    sub(
+        f"[SyntheticData] Wrote {len(tm):,} TM rows, {len(originals):,} Originals rows "
+        f"and {len(changed):,} Changed Data rows to '{out_dir}'."
+    )
+    return paths
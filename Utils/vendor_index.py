@@ -0,0 +1,292 @@
+import os
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from Utils.csv_io import read_table, resolve_csv_path
+from Utils.packed_strings import pack_strings, unpack_strings
+from Utils.pretty_print import sub
+
+# Trigram index for matching OCR-read vendor names against Vendor Master.
+#
+# Names are normalised (accents stripped, upper case, anything but A-Z / 0-9
+# becomes a single space) and padded with one space each side. With 37
+# symbols every trigram is a number below 37**3, so the inverted lists are
+# plain CSR arrays indexed by trigram code, with no vocabulary:
+#   postings[offsets[code]:offsets[code + 1]] = vendors containing `code`
+# Trigrams held by more than STOP_TRIGRAM_FRACTION of vendors, and by at
+# least STOP_TRIGRAM_MIN_VENDORS of them (" PT", "LTD", ...), are stop
+# trigrams: they have no postings and do not count towards the similarity,
+# so they neither flood the candidate lists nor inflate scores for
+# unrelated "... PTY LTD" names.
+#
+# A query only touches the postings of its own trigrams, and candidates are
+# ranked by the Dice coefficient over non-stop trigrams:
+#   2 * shared / (query trigrams + vendor trigrams)
+#
+# The index is built with numpy in blocks, saved as an .npz file next to the
+# vendor export and rebuilt only when that export changes (size / mtime).
+
+SYMBOLS = " 0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+N_TRIGRAMS = len(SYMBOLS) ** 3
+
+# Longest (normalised) name indexed; later characters are ignored
+MAX_NAME_CHARS = 60
+
+STOP_TRIGRAM_FRACTION = 0.05
+STOP_TRIGRAM_MIN_VENDORS = 1000
+
+BUILD_BLOCK_ROWS = 200_000
+
+INDEX_VERSION = 1
+
+# byte -> symbol number, -1 for padding / anything else
+_SYMBOL_OF_BYTE = np.full(256, -1, dtype=np.int32)
+for _number, _char in enumerate(SYMBOLS):
+    _SYMBOL_OF_BYTE[ord(_char)] = _number
+
+
+def normalize_names(names: pd.Series) -> pd.Series:
+    """Upper-case ASCII words separated by single spaces ('' for missing)."""
+    text = pd.Series(names, dtype=object).fillna("").astype(str)
+    text = text.str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+    text = text.str.upper().str.replace(r"[^A-Z0-9]+", " ", regex=True).str.strip()
+    return text
+
+
+def name_trigrams(names: pd.Series):
+    """
+    Trigram codes of each name as (row, code) pairs, unique per row and
+    sorted by row then code.
+    """
+    normalized = normalize_names(names)
+    padded = (" " + normalized.str.slice(0, MAX_NAME_CHARS) + " ").where(normalized != "", "")
+
+    width = MAX_NAME_CHARS + 2
+    raw = np.asarray(padded.to_numpy(dtype=str), dtype=f"S{width}")
+    symbols = _SYMBOL_OF_BYTE[raw.view(np.uint8).reshape(len(raw), width)]
+
+    codes = symbols[:, :-2] * (37 * 37) + symbols[:, 1:-1] * 37 + symbols[:, 2:]
+    valid = (symbols[:, :-2] >= 0) & (symbols[:, 1:-1] >= 0) & (symbols[:, 2:] >= 0)
+
+    # Sort within each name (padding last) and drop repeats of the previous code
+    codes = np.sort(np.where(valid, codes, N_TRIGRAMS), axis=1)
+    keep = codes < N_TRIGRAMS
+    keep[:, 1:] &= codes[:, 1:] != codes[:, :-1]
+
+    rows = np.broadcast_to(np.arange(len(raw), dtype=np.int64)[:, None], codes.shape)[keep]
+    return rows, codes[keep].astype(np.int64)
+
+
+def _count_values(values: np.ndarray):
+    """Distinct values of `values` (ascending) and how often each occurs."""
+    values = np.sort(values)
+    if len(values) == 0:
+        return values, np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    return values[starts], np.diff(np.r_[starts, len(values)])
+
+
+class VendorNameIndex:
+    """
+    Inverted trigram lists over Vendor Master names.
+
+    Build with VendorNameIndex.build(vendors) or load a saved one with
+    VendorNameIndex.load(path); query with top_k() / best_matches().
+    Vendor numbers and names are kept as packed UTF-8 (Utils.packed_strings),
+    which is much smaller than fixed-width numpy strings at 2M+ vendors.
+    """
+
+    ARRAYS = (
+        "offsets", "postings", "trigram_counts", "stop",
+        "nums_blob", "nums_offsets", "names_blob", "names_offsets",
+    )
+
+    def __init__(self, arrays, meta=None):
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+        self.meta = dict(meta or {})
+
+    def __len__(self):
+        return len(self.trigram_counts)
+
+    @classmethod
+    def build(
+        cls,
+        vendors: pd.DataFrame,
+        stop_fraction: float = STOP_TRIGRAM_FRACTION,
+        stop_min_vendors: int = STOP_TRIGRAM_MIN_VENDORS,
+        meta=None,
+    ):
+        """
+        Index a frame with VENDOR_NUM and VENDOR_NAME_1 (first row per
+        VENDOR_NUM; Vendor Master has one row per company code).
+        """
+        missing = [c for c in ("VENDOR_NUM", "VENDOR_NAME_1") if c not in vendors.columns]
+        if missing:
+            raise ValueError(f"[VendorIndex] Vendor Master is missing columns: {missing}")
+
+        vendors = vendors.drop_duplicates(subset=["VENDOR_NUM"], keep="first").reset_index(drop=True)
+        n_vendors = len(vendors)
+
+        rows_parts, code_parts = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+        for start in range(0, n_vendors, BUILD_BLOCK_ROWS):
+            rows, codes = name_trigrams(vendors["VENDOR_NAME_1"].iloc[start:start + BUILD_BLOCK_ROWS])
+            rows_parts.append(rows + start)
+            code_parts.append(codes)
+        rows, codes = np.concatenate(rows_parts), np.concatenate(code_parts)
+
+        document_freq = np.bincount(codes, minlength=N_TRIGRAMS)
+        stop = document_freq > max(stop_min_vendors, int(stop_fraction * n_vendors))
+        keep = ~stop[codes]
+        rows, codes = rows[keep], codes[keep]
+
+        order = np.argsort(codes, kind="stable")
+        offsets = np.zeros(N_TRIGRAMS + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=N_TRIGRAMS), out=offsets[1:])
+
+        nums_blob, nums_offsets = pack_strings(vendors["VENDOR_NUM"])
+        names_blob, names_offsets = pack_strings(vendors["VENDOR_NAME_1"])
+
+        sub(
+            f"[VendorIndex] Indexed {n_vendors:,} vendor(s): {len(rows):,} postings, "
+            f"{int(stop.sum()):,} stop trigram(s)."
+        )
+        return cls(
+            {
+                "offsets": offsets,
+                "postings": rows[order].astype(np.int32),
+                "trigram_counts": np.bincount(rows, minlength=n_vendors).astype(np.int32),
+                "stop": stop,
+                "nums_blob": nums_blob,
+                "nums_offsets": nums_offsets,
+                "names_blob": names_blob,
+                "names_offsets": names_offsets,
+            },
+            meta,
+        )
+
+    def save(self, path: str) -> None:
+        """Write the index to `path` (.npz) atomically."""
+        tmp_path = path + ".tmp"
+        meta = np.array([self.meta.get(k, 0) for k in ("version", "source_bytes", "source_mtime")], dtype=float)
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=meta, **{name: getattr(self, name) for name in self.ARRAYS})
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path, allow_pickle=False) as data:
+            version, source_bytes, source_mtime = data["meta"].tolist()
+            return cls(
+                {name: data[name] for name in cls.ARRAYS},
+                {"version": int(version), "source_bytes": int(source_bytes), "source_mtime": source_mtime},
+            )
+
+    def _score(self, codes: np.ndarray):
+        """Candidate vendors and Dice scores for one query's trigram codes."""
+        codes = codes[~self.stop[codes]]
+        lists = [self.postings[self.offsets[c]:self.offsets[c + 1]] for c in codes]
+        candidates, shared = _count_values(np.concatenate(lists) if lists else np.zeros(0, dtype=np.int32))
+        return candidates, 2.0 * shared / (len(codes) + self.trigram_counts[candidates])
+
+    def top_k(self, names: Iterable, k: int = 5) -> pd.DataFrame:
+        """
+        Up to `k` candidate vendors per name, best first (ties by position
+        in Vendor Master). Columns: QUERY, RANK, VENDOR_NUM, VENDOR_NAME,
+        SCORE; QUERY is the name's position in `names`.
+        """
+        names = pd.Series(list(names), dtype=object)
+        rows, codes = name_trigrams(names)
+        bounds = np.searchsorted(rows, np.arange(len(names) + 1))
+
+        queries, ranks, vendors, scores = [], [], [], []
+        for query in range(len(names)):
+            candidates, score = self._score(codes[bounds[query]:bounds[query + 1]])
+            if len(candidates) > k:
+                top = np.argpartition(-score, k - 1)[:k]
+                candidates, score = candidates[top], score[top]
+            order = np.lexsort((candidates, -score))
+            queries.append(np.full(len(order), query))
+            ranks.append(np.arange(1, len(order) + 1))
+            vendors.append(candidates[order])
+            scores.append(score[order])
+
+        vendors = np.concatenate(vendors) if vendors else np.zeros(0, dtype=np.int64)
+        return pd.DataFrame(
+            {
+                "QUERY": np.concatenate(queries) if queries else np.zeros(0, dtype=np.int64),
+                "RANK": np.concatenate(ranks) if ranks else np.zeros(0, dtype=np.int64),
+                "VENDOR_NUM": unpack_strings(self.nums_blob, self.nums_offsets, vendors),
+                "VENDOR_NAME": unpack_strings(self.names_blob, self.names_offsets, vendors),
+                "SCORE": np.concatenate(scores) if scores else np.zeros(0),
+            }
+        )
+
+    def best_matches(self, names: Iterable) -> pd.DataFrame:
+        """
+        Best vendor per name, aligned with `names`: VENDOR_MATCH_NUM,
+        VENDOR_MATCH_NAME, VENDOR_MATCH_SCORE (empty when nothing matched).
+        """
+        names = pd.Series(list(names), dtype=object)
+        best = self.top_k(names, k=1).set_index("QUERY").reindex(range(len(names)))
+        return pd.DataFrame(
+            {
+                "VENDOR_MATCH_NUM": best["VENDOR_NUM"].to_numpy(dtype=object),
+                "VENDOR_MATCH_NAME": best["VENDOR_NAME"].to_numpy(dtype=object),
+                "VENDOR_MATCH_SCORE": best["SCORE"].astype(float).round(4).to_numpy(),
+            }
+        )
+
+
+def index_path_for(vendor_csv: str) -> str:
+    """'Output_Files/vendor_master.csv' -> 'Output_Files/vendor_master.trigram.npz'."""
+    return os.path.splitext(vendor_csv)[0] + ".trigram.npz"
+
+
+def ensure_vendor_index(vendor_csv: str, index_path: Optional[str] = None) -> Optional[VendorNameIndex]:
+    """
+    Load the saved index for `vendor_csv`, rebuilding it when missing or
+    older than the export. Returns None when there is no vendor export.
+    """
+    source = resolve_csv_path(vendor_csv)
+    if not os.path.exists(source):
+        sub(f"[VendorIndex] Vendor Master not found at '{source}'. No vendor matching.")
+        return None
+
+    index_path = index_path or index_path_for(vendor_csv)
+    meta = {"version": INDEX_VERSION, "source_bytes": os.path.getsize(source), "source_mtime": os.path.getmtime(source)}
+
+    if os.path.exists(index_path):
+        index = VendorNameIndex.load(index_path)
+        if (
+            index.meta["version"] == meta["version"]
+            and index.meta["source_bytes"] == meta["source_bytes"]
+            and abs(index.meta["source_mtime"] - meta["source_mtime"]) < 1e-3
+        ):
+            sub(f"[VendorIndex] Loaded {len(index):,} vendor(s) from '{index_path}'.")
+            return index
+        sub("[VendorIndex] Vendor Master changed since the index was built; rebuilding.")
+
+    vendors = read_table(source, usecols=["VENDOR_NUM", "VENDOR_NAME_1"])
+    index = VendorNameIndex.build(vendors, meta=meta)
+    index.save(index_path)
+    sub(f"[VendorIndex] Saved index to '{index_path}'.")
+    return index
+
+
+def add_vendor_match_columns(
+    output_rows: pd.DataFrame,
+    index: VendorNameIndex,
+    name_column: str = "O_Vend_Name",
+) -> pd.DataFrame:
+    """
+    Changed Data output rows plus the best Vendor Master match for the
+    original OCR vendor name (VENDOR_MATCH_NUM / _NAME / _SCORE).
+    """
+    matches = index.best_matches(output_rows[name_column])
+    matches.index = output_rows.index
+    matched = int(matches["VENDOR_MATCH_NUM"].notna().sum())
+    sub(f"[VendorIndex] Matched {matched:,} of {len(output_rows):,} original vendor name(s).")
+    return pd.concat([output_rows, matches], axis=1)
@@ -1,7 +1,135 @@
+import argparse
+
 from Job_Runner import orchestration_runner
+from Utils.csv_io import CSV_ENGINES, set_csv_engine
+from Utils.capture_engine import CAPTURE_ENGINES, set_capture_engine
+
+# Command line entry point.
+#
+#   python main.py
+#       Full pipeline, sequentially (what Automation_Batch.bat runs).
+#
+#   python main.py run vendor_master transaction_master --parallel 3 --format parquet --fetch-size 50000 --profile
+#       Selected jobs ("all" for every job). --parallel > 1 runs them as an
+#       asyncio job graph (Job_Runner.async_orchestration_runner) with at
+#       most N jobs at once; --format picks the export file format,
+#       --csv-engine the parser the capture jobs read CSVs with,
+#       --capture-engine whether Originals / Changed Data run in pandas or
+#       as DuckDB queries over the files (Utils.duckdb_backend),
+#       --changed-long also writes Changed Data in long format (one row per
+#       changed cell, Utils.changed_data_long), --vendor-match adds the best
+#       Vendor Master match per Changed Data row (Utils.vendor_index), and
+#       --profile writes cProfile / tracemalloc / stack-sample reports to
+#       logs/profiles/ (see Utils.profiling) and prints wall time per job.
+
+# --format choice -> SqlExportJob options
+OUTPUT_FORMATS = {
+    "csv": {"output_format": "csv", "compression": None},
+    "gzip": {"output_format": "csv", "compression": "gzip"},
+    "zstd": {"output_format": "csv", "compression": "zstd"},
+    "parquet": {"output_format": "parquet", "compression": None},
+}
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description="PIOR invoice pipeline.")
+    commands = parser.add_subparsers(dest="command")
+
+    run = commands.add_parser("run", help="Run selected jobs.")
+    run.add_argument(
+        "jobs",
+        nargs="+",
+        choices=["all", *orchestration_runner.PIPELINE_ORDER],
+        metavar="JOB",
+        help=f"Jobs to run: all, {', '.join(orchestration_runner.PIPELINE_ORDER)}.",
+    )
+    run.add_argument("--parallel", type=positive_int, default=1,
+                     help="Jobs to run at once (default 1: sequential).")
+    run.add_argument("--format", choices=list(OUTPUT_FORMATS), default="csv",
+                     help="Export file format (default csv).")
+    run.add_argument("--fetch-size", type=positive_int, default=None,
+                     help="Rows per Oracle fetch and per written batch (default 10000).")
+    run.add_argument("--csv-engine", choices=list(CSV_ENGINES), default=None,
+                     help="CSV parser for the capture jobs (default auto: pyarrow when installed).")
+    run.add_argument("--capture-engine", choices=list(CAPTURE_ENGINES), default=None,
+                     help="Engine for Originals and Changed Data capture (default pandas).")
+    run.add_argument("--changed-long", action="store_true",
+                     help="Also append Changed Data as one row per changed cell (<changed csv>_Long.csv).")
+    run.add_argument("--vendor-match", action="store_true",
+                     help="Add the best Vendor Master match (VENDOR_MATCH_*) to new Changed Data rows.")
+    run.add_argument("--upgrade-changed-schema", action="store_true",
+                     help="Add new output columns to an existing Changed Data CSV (rewrites its header once).")
+    run.add_argument("--profile", action="store_true",
+                     help="Profile each job (reports in logs/profiles/) and print wall time per job.")
+    return parser
+
+
+def export_options(args):
+    options = dict(OUTPUT_FORMATS[args.format])
+    if args.fetch_size:
+        options["fetch_size"] = args.fetch_size
+    return options
+
+
+def run_command(args):
+    if args.csv_engine:
+        set_csv_engine(args.csv_engine)
+    if args.capture_engine:
+        set_capture_engine(args.capture_engine)
+    jobs = orchestration_runner.build_jobs(args.jobs, **export_options(args))
+    if args.changed_long and "changed_data" in jobs:
+        from Utils.changed_data_long import long_csv_for
+
+        jobs["changed_data"].long_csv = long_csv_for(jobs["changed_data"].changed_csv)
+    if args.vendor_match and "changed_data" in jobs:
+        from Job_Runner.changed_data_runner import VENDOR_MASTER_CSV
+
+        jobs["changed_data"].vendor_master_csv = VENDOR_MASTER_CSV
+    if args.upgrade_changed_schema and "changed_data" in jobs:
+        jobs["changed_data"].upgrade_schema = True
+
+    if args.parallel == 1:
+        return orchestration_runner.run_jobs(jobs, profile=args.profile)
+
+    import asyncio
+
+    from Config.db_config import get_db_config
+    from Job_Runner.async_orchestration_runner import run_pipeline
+
+    pipeline = run_pipeline(
+        get_db_config(),
+        jobs,
+        max_workers=max(args.parallel, 2),
+        max_concurrency=args.parallel,
+    )
+    if args.profile:
+        # Jobs overlap here, so the run is profiled as a whole
+        from Utils.profiling import new_profile_dir, profile_job
+
+        with profile_job("pipeline", new_profile_dir()):
+            results = asyncio.run(pipeline)
+    else:
+        results = asyncio.run(pipeline)
+
+    if args.profile:
+        orchestration_runner.print_run_summary(results)
+    return results
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        orchestration_runner.main()
+        return None
+    return run_command(args)
 
-def main():
-    orchestration_runner.main()
 
 if __name__ == "__main__":
     main()
@@ -5,7 +5,7 @@ import sys
 ROOT_DIR = pathlib.Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT_DIR))
 
-from Config.db_config import DB_CONFIG
+from Config.db_config import get_db_config
 from Core.database import OracleConnection
 
 # Point to the SQL directory for later tests
@@ -23,7 +23,7 @@ def db():
     Uses your existing OracleConnection and DB_CONFIG.
     """
 
-    conn = OracleConnection(DB_CONFIG)
+    conn = OracleConnection(get_db_config())
     conn.connect()
     try:
         yield conn
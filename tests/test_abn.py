@@ -0,0 +1,81 @@
+# File: tests/test_abn.py
+
+import numpy as np
+import pandas as pd
+
+from Utils.abn import abn_invalid_flags, abn_is_valid, make_valid_abns
+from Utils.changed_data_csv import run_changed_data_capture
+from Utils.synthetic_data import write_synthetic_dataset
+
+
+def _reference_is_valid(value) -> bool:
+    """The ATO's worked algorithm, one value at a time."""
+    if not isinstance(value, str):
+        return False
+    digits = value.replace(" ", "")
+    if len(digits) != 11 or not digits.isdigit():
+        return False
+    weights = [10, 1, 3, 5, 7, 9, 11, 13, 15, 17, 19]
+    numbers = [int(d) for d in digits]
+    numbers[0] -= 1
+    return numbers[0] >= 0 and sum(n * w for n, w in zip(numbers, weights)) % 89 == 0
+
+
+def test_abn_is_valid_known_values():
+    values = [
+        "51 824 753 556",  # ATO example, spaced
+        "51824753556",
+        "53004085616",
+        "51824753557",  # last digit changed
+        "5182475355",  # trailing digit dropped
+        "01824753556",  # leading zero is never valid
+        "ABN51824753",
+        "",
+        None,
+        np.nan,
+    ]
+    assert abn_is_valid(values).tolist() == [True, True, True] + [False] * 7
+
+
+def test_abn_is_valid_matches_reference():
+    rng = np.random.default_rng(0)
+    values = pd.Series(rng.integers(10**10, 10**11, 50_000)).astype(str)
+    expected = np.array([_reference_is_valid(v) for v in values])
+    assert (abn_is_valid(values) == expected).all()
+    assert 0 < expected.sum() < len(values)
+
+
+def test_abn_invalid_flags_ignore_missing():
+    flags = abn_invalid_flags(pd.Series(["51824753556", "51824753557", None, "  ", "5182475355"]))
+    assert flags.tolist() == [0, 1, 0, 0, 1]
+
+
+def test_missing_values_of_any_dtype_are_not_flagged():
+    for values in (
+        pd.Series([None, np.nan, "", pd.NA], dtype=object),
+        pd.Series([np.nan, np.nan]),
+        [None, "", float("nan")],
+    ):
+        assert abn_invalid_flags(values).tolist() == [0] * len(values)
+        assert not abn_is_valid(values).any()
+
+
+def test_make_valid_abns():
+    abns = make_valid_abns(np.random.default_rng(1).integers(0, 10**9, 10_000))
+    assert all(len(a) == 11 for a in abns)
+    assert abn_is_valid(abns).all()
+
+
+def test_changed_data_flags_misread_abns(tmp_path):
+    paths = write_synthetic_dataset(str(tmp_path), 5_000, seed=7, churn_rate=0.2)
+    assert abn_is_valid(pd.read_csv(paths["transaction_master"], dtype=str)["ABN"]).all()
+
+    run_changed_data_capture(paths["transaction_master"], paths["originals"], paths["changed"])
+    out = pd.read_csv(paths["changed"], dtype=str)
+
+    assert (out["ABN_CURR_INVALID"] == "0").all()
+    # ABN churn drops a trailing digit from the captured value
+    misread = out["O_VENDOR_VAT_NO"].fillna("") != out["VENDOR_VAT_NO"].fillna("")
+    assert misread.any()
+    assert (out.loc[misread, "ABN_ORIG_INVALID"] == "1").all()
+    assert (out.loc[~misread, "ABN_ORIG_INVALID"] == "0").all()
@@ -0,0 +1,175 @@
+# File: tests/test_async_orchestration_runner.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from Job_Runner.async_orchestration_runner import (
+    TASK_ABANDONED,
+    TASK_CANCELLED,
+    TASK_DONE,
+    TASK_FAILED,
+    TASK_SKIPPED,
+    TASK_TIMEOUT,
+    AsyncTask,
+    build_pipeline_tasks,
+    run_job_graph,
+)
+from Job_Runner.sql_export_job import EXPORT_CHANGED, SqlExportJob
+
+
+def _sleeper(log, name, seconds, result=None, error=None):
+    async def run():
+        log.append(("start", name))
+        await asyncio.sleep(seconds)
+        if error:
+            raise error
+        log.append(("end", name))
+        return result
+    return run
+
+
+def test_dependencies_run_in_order_and_independent_tasks_overlap():
+    log = []
+    tasks = [
+        AsyncTask("a", _sleeper(log, "a", 0.2, result=1)),
+        AsyncTask("b", _sleeper(log, "b", 0.2, result=2)),
+        AsyncTask("c", _sleeper(log, "c", 0.01, result=3), depends_on=["a", "b"]),
+    ]
+
+    started = time.perf_counter()
+    results = asyncio.run(run_job_graph(tasks))
+    elapsed = time.perf_counter() - started
+
+    assert {n: r["status"] for n, r in results.items()} == {"a": TASK_DONE, "b": TASK_DONE, "c": TASK_DONE}
+    assert results["c"]["result"] == 3
+    assert log.index(("start", "c")) > log.index(("end", "a"))
+    assert log.index(("start", "c")) > log.index(("end", "b"))
+    # a and b ran concurrently
+    assert elapsed < 0.35
+
+
+def test_max_concurrency_limits_running_tasks():
+    log = []
+    tasks = [AsyncTask(n, _sleeper(log, n, 0.05)) for n in ("a", "b", "c")]
+
+    results = asyncio.run(run_job_graph(tasks, max_concurrency=1))
+
+    assert all(r["status"] == TASK_DONE and r["seconds"] >= 0.04 for r in results.values())
+    # Strictly one after another
+    assert [event for event, _ in log] == ["start", "end"] * 3
+
+
+def test_pipeline_tasks_are_limited_to_selected_jobs():
+    async def build():
+        return build_pipeline_tasks(None, None, {"transaction_master": object(), "changed_data": object()})
+
+    tasks = {t.name: t for t in asyncio.run(build())}
+
+    assert set(tasks) == {"transaction_master", "changed_data"}
+    # originals_capture is not part of the run, so changed_data has nothing to wait for
+    assert tasks["changed_data"].depends_on == ()
+
+
+def test_timeout_cancels_task_and_skips_dependents():
+    log = []
+    tasks = [
+        AsyncTask("slow", _sleeper(log, "slow", 5), timeout=0.05),
+        AsyncTask("after_slow", _sleeper(log, "after_slow", 0), depends_on=["slow"]),
+        AsyncTask("other", _sleeper(log, "other", 0.01)),
+    ]
+
+    results = asyncio.run(run_job_graph(tasks))
+
+    assert results["slow"]["status"] == TASK_TIMEOUT
+    assert results["after_slow"]["status"] == TASK_SKIPPED
+    assert results["other"]["status"] == TASK_DONE
+    assert ("start", "after_slow") not in log
+
+
+def test_thread_job_timeout_holds_dependents_until_thread_exits():
+    exited = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=2)
+
+    def slow_csv_job():
+        time.sleep(0.3)
+        exited.set()
+
+    async def after_slow():
+        raise AssertionError("dependent of an abandoned job must not run")
+
+    async def graph():
+        loop = asyncio.get_running_loop()
+        tasks = [
+            AsyncTask("slow", lambda: loop.run_in_executor(executor, slow_csv_job), timeout=0.05, in_thread=True),
+            AsyncTask("after_slow", after_slow, depends_on=["slow"]),
+        ]
+        results = await run_job_graph(tasks)
+        # The graph only finishes once the abandoned thread has exited
+        return results, exited.is_set()
+
+    try:
+        results, exited_at_return = asyncio.run(graph())
+    finally:
+        executor.shutdown(wait=True)
+
+    assert results["slow"]["status"] == TASK_ABANDONED
+    assert results["slow"]["seconds"] >= 0.3
+    assert results["after_slow"]["status"] == TASK_SKIPPED
+    assert exited_at_return
+
+
+def test_failure_with_cancel_on_failure_cancels_running_tasks():
+    log = []
+    tasks = [
+        AsyncTask("boom", _sleeper(log, "boom", 0.01, error=RuntimeError("bad"))),
+        AsyncTask("long", _sleeper(log, "long", 5)),
+    ]
+
+    results = asyncio.run(run_job_graph(tasks, cancel_on_failure=True))
+
+    assert results["boom"]["status"] == TASK_FAILED
+    assert str(results["boom"]["error"]) == "bad"
+    assert results["long"]["status"] == TASK_CANCELLED
+    assert ("end", "long") not in log
+
+
+def test_graph_rejects_cycles_and_unknown_dependencies():
+    noop = _sleeper([], "x", 0)
+    with pytest.raises(ValueError):
+        asyncio.run(run_job_graph([AsyncTask("a", noop, ["b"]), AsyncTask("b", noop, ["a"])]))
+    with pytest.raises(ValueError):
+        asyncio.run(run_job_graph([AsyncTask("a", noop, ["missing"])]))
+
+
+class FakeAsyncDB:
+    """Stands in for AsyncOracleConnection."""
+
+    def __init__(self, columns, batches):
+        self.columns = columns
+        self.batches = batches
+
+    async def get_row_count(self, query, params=None):
+        return sum(len(b) for b in self.batches)
+
+    async def run_in_batches(self, query, batch_size=10000, params=None):
+        for rows in self.batches:
+            await asyncio.sleep(0)
+            yield self.columns, rows
+
+
+def test_run_async_writes_same_output_as_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "query.sql").write_text("SELECT 1 FROM dual", encoding="utf-8")
+    batches = [[(str(i), f"V{i}")] for i in range(5)]
+
+    job = SqlExportJob("query.sql", "vendor_master.csv", "Vendor Master", "VENDOR MASTER COMPLETE")
+    outcome = asyncio.run(job.run_async(FakeAsyncDB(["VENDOR_NUM", "VENDOR_NAME_1"], batches), write_flag=False))
+
+    assert outcome == EXPORT_CHANGED
+    lines = (tmp_path / "Output_Files" / "vendor_master.csv").read_text().splitlines()
+    assert lines == ["VENDOR_NUM,VENDOR_NAME_1"] + [f"{i},V{i}" for i in range(5)]
+    assert not (tmp_path / "Output_Files" / "done.txt").exists()
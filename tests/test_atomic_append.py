@@ -0,0 +1,141 @@
+# File: tests/test_atomic_append.py
+
+import json
+
+import pandas as pd
+
+from Utils.atomic_append import (
+    JOURNAL_SUFFIX,
+    SEGMENT_SUFFIX,
+    align_to_header,
+    atomic_append_csv,
+    read_csv_header,
+    recover_pending_append,
+    upgrade_csv_header,
+)
+
+
+def _frame(ids):
+    return pd.DataFrame({"DOC_ID": ids, "AMOUNT": ["1.00"] * len(ids)})
+
+
+def _simulate_crash(path, df, torn_bytes):
+    """
+    Reproduce the on-disk state of a run that died after journalling a batch
+    and writing only `torn_bytes` of it into the live file.
+    """
+    segment = path.with_name(path.name + SEGMENT_SUFFIX)
+    journal = path.with_name(path.name + JOURNAL_SUFFIX)
+
+    df.to_csv(segment, header=False, index=False)
+    journal.write_text(
+        json.dumps(
+            {
+                "target_existed": True,
+                "original_size": path.stat().st_size,
+                "segment_size": segment.stat().st_size,
+                "rows": len(df),
+                "created_at": "2025-01-01T00:00:00",
+            }
+        ),
+        encoding="utf-8",
+    )
+    with open(path, "ab") as f:
+        f.write(segment.read_bytes()[:torn_bytes])
+
+
+def test_atomic_append_writes_header_once_and_cleans_up(tmp_path):
+    path = tmp_path / "originals.csv"
+
+    assert atomic_append_csv(str(path), _frame(["1", "2"])) == 2
+    assert atomic_append_csv(str(path), _frame(["3"])) == 1
+
+    df = pd.read_csv(path, dtype=str)
+    assert df["DOC_ID"].tolist() == ["1", "2", "3"]
+    assert not (tmp_path / ("originals.csv" + JOURNAL_SUFFIX)).exists()
+    assert not (tmp_path / ("originals.csv" + SEGMENT_SUFFIX)).exists()
+
+
+def test_recover_replays_intact_segment_after_torn_write(tmp_path):
+    path = tmp_path / "originals.csv"
+    atomic_append_csv(str(path), _frame(["1", "2"]))
+
+    _simulate_crash(path, _frame(["3", "4"]), torn_bytes=5)
+
+    assert recover_pending_append(str(path)) == "replayed"
+    df = pd.read_csv(path, dtype=str)
+    assert df["DOC_ID"].tolist() == ["1", "2", "3", "4"]
+
+
+def test_recover_rolls_back_when_segment_incomplete(tmp_path):
+    path = tmp_path / "originals.csv"
+    atomic_append_csv(str(path), _frame(["1", "2"]))
+    size_before = path.stat().st_size
+
+    _simulate_crash(path, _frame(["3", "4"]), torn_bytes=5)
+    segment = tmp_path / ("originals.csv" + SEGMENT_SUFFIX)
+    segment.write_bytes(segment.read_bytes()[:3])
+
+    assert recover_pending_append(str(path)) == "rolled_back"
+    assert path.stat().st_size == size_before
+    assert pd.read_csv(path, dtype=str)["DOC_ID"].tolist() == ["1", "2"]
+
+
+def test_recover_discards_uncommitted_segment(tmp_path):
+    path = tmp_path / "originals.csv"
+    atomic_append_csv(str(path), _frame(["1"]))
+    segment = tmp_path / ("originals.csv" + SEGMENT_SUFFIX)
+    segment.write_text("2,1.00\n", encoding="utf-8")
+
+    assert recover_pending_append(str(path)) == "clean"
+    assert not segment.exists()
+    assert pd.read_csv(path, dtype=str)["DOC_ID"].tolist() == ["1"]
+
+
+def test_append_aligns_columns_and_upgrades_header(tmp_path):
+    path = tmp_path / "changed.csv"
+    atomic_append_csv(str(path), _frame(["1", "2"]))
+
+    # Same columns in another order, then a batch with a new column
+    atomic_append_csv(str(path), _frame(["3"])[["AMOUNT", "DOC_ID"]])
+    atomic_append_csv(str(path), _frame(["4"]).assign(SCORE=["0.5"]), upgrade_header=True)
+    atomic_append_csv(str(path), _frame(["5"]))
+
+    assert path.read_text().splitlines() == [
+        "DOC_ID,AMOUNT,SCORE",
+        "1,1.00,",
+        "2,1.00,",
+        "3,1.00,",
+        "4,1.00,0.5",
+        "5,1.00,",
+    ]
+
+
+def test_new_columns_are_dropped_unless_the_upgrade_is_enabled(tmp_path, capsys):
+    path = tmp_path / "changed.csv"
+    atomic_append_csv(str(path), _frame(["1"]))
+
+    atomic_append_csv(str(path), _frame(["2"]).assign(SCORE=["0.5"]))
+
+    assert path.read_text().splitlines() == ["DOC_ID,AMOUNT", "1,1.00", "2,1.00"]
+    assert "WARNING: column(s) ['SCORE'] are not in the header" in capsys.readouterr().out
+
+
+def test_header_helpers(tmp_path, capsys):
+    path = tmp_path / "changed.csv"
+    assert read_csv_header(str(path)) == []
+    path.write_text("DOC_ID,AMOUNT\n1,1.00\n2,\n")
+    assert read_csv_header(str(path)) == ["DOC_ID", "AMOUNT"]
+
+    # Without the upgrade the batch is cut down to the file's columns
+    batch = pd.DataFrame({"SCORE": ["0.5"], "DOC_ID": ["3"]})
+    assert align_to_header(str(path), batch).columns.tolist() == ["DOC_ID", "AMOUNT"]
+    assert read_csv_header(str(path)) == ["DOC_ID", "AMOUNT"]
+
+    upgrade_csv_header(str(path), ["SCORE", "RANK"])
+    assert path.read_text().splitlines() == ["DOC_ID,AMOUNT,SCORE,RANK", "1,1.00,,", "2,,,"]
+    assert "WARNING: schema change" in capsys.readouterr().out
+
+    aligned = align_to_header(str(path), batch, upgrade_header=True)
+    assert aligned.columns.tolist() == ["DOC_ID", "AMOUNT", "SCORE", "RANK"]
+    assert aligned.iloc[0].tolist()[::2] == ["3", "0.5"]
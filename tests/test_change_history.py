@@ -0,0 +1,115 @@
+# File: tests/test_change_history.py
+
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from Utils import change_history
+from Utils.change_history import ChangeHistory, StringDictionary, record_change_history
+
+COLUMNS = ["AMOUNT", "VENDOR_NUM"]
+
+
+def _record(tmp_path, tm, day, columns=COLUMNS):
+    tm_csv = tmp_path / "transaction_master.csv"
+    tm.to_csv(tm_csv, index=False)
+    return record_change_history(
+        str(tm_csv), str(tmp_path / "history"), columns=columns, run_time=datetime(2026, 10, day, 6)
+    )
+
+
+def _three_days(tmp_path):
+    tm = pd.DataFrame({"DOC_ID": ["1", "2", "3"], "AMOUNT": ["10", "20", None], "VENDOR_NUM": ["A", "B", "C"]})
+    assert _record(tmp_path, tm, 1) == 3
+
+    tm.loc[0, "AMOUNT"] = "11"
+    tm.loc[2, "AMOUNT"] = "5"
+    tm = pd.concat([tm, pd.DataFrame({"DOC_ID": ["4"], "AMOUNT": ["1"], "VENDOR_NUM": ["A"]})])
+    assert _record(tmp_path, tm, 2) == 3  # one new DOC_ID, two changed cells
+
+    tm.iloc[0, 1] = "12"
+    assert _record(tmp_path, tm, 3) == 1
+    return ChangeHistory(str(tmp_path / "history"))
+
+
+def test_point_in_time_reconstruction(tmp_path):
+    history = _three_days(tmp_path)
+
+    day_1 = history.as_of("2026-10-01")
+    assert day_1["DOC_ID"].tolist() == ["1", "2", "3"]
+    assert day_1["AMOUNT"].tolist()[:2] == ["10", "20"] and pd.isna(day_1["AMOUNT"].iloc[2])
+
+    assert history.as_of("2026-10-02")["AMOUNT"].tolist() == ["11", "20", "5", "1"]
+    assert history.as_of(3, doc_ids=["1", "999"])[["DOC_ID", "AMOUNT"]].values.tolist() == [["1", "12"]]
+
+
+def test_changes_between(tmp_path):
+    history = _three_days(tmp_path)
+
+    changes = history.changes_between("2026-10-02", "2026-10-03").fillna("")
+    assert changes[["DOC_ID", "FIELD", "OLD_VALUE", "NEW_VALUE"]].values.tolist() == [
+        ["1", "AMOUNT", "10", "11"],
+        ["3", "AMOUNT", "", "5"],
+        ["1", "AMOUNT", "11", "12"],
+    ]
+    assert history.changes_between("2026-10-03", doc_ids=["3"]).empty
+
+
+def test_field_cleared_and_restored(tmp_path):
+    tm = pd.DataFrame({"DOC_ID": ["1", "2"], "AMOUNT": ["10", "20"], "VENDOR_NUM": ["A", "B"]})
+    _record(tmp_path, tm, 1)
+    tm.loc[0, "VENDOR_NUM"] = np.nan
+    assert _record(tmp_path, tm, 2) == 1
+    tm.loc[0, "VENDOR_NUM"] = "A"
+    assert _record(tmp_path, tm, 3) == 1
+
+    history = ChangeHistory(str(tmp_path / "history"))
+    assert pd.isna(history.as_of(2)["VENDOR_NUM"].iloc[0])
+    assert history.as_of(3)["VENDOR_NUM"].tolist() == ["A", "B"]
+    changes = history.changes_between().fillna("<null>")
+    assert changes[["FIELD", "OLD_VALUE", "NEW_VALUE"]].values.tolist() == [
+        ["VENDOR_NUM", "A", "<null>"],
+        ["VENDOR_NUM", "<null>", "A"],
+    ]
+    dictionary = StringDictionary()
+    assert dictionary.encode_columns(pd.DataFrame({"A": pd.Series([np.nan, "x"], dtype=object)})).tolist() == [[-1], [0]]
+    assert "nan" not in dictionary.strings
+
+
+def test_uncommitted_run_is_discarded(tmp_path):
+    history_dir = tmp_path / "history"
+    tm = pd.DataFrame({"DOC_ID": ["1"], "AMOUNT": ["10"], "VENDOR_NUM": ["A"]})
+    _record(tmp_path, tm, 1)
+    committed_state = (history_dir / "state.npz").read_bytes()
+
+    # Run 2 dies after writing its run file, before the state is replaced
+    tm.loc[0, "AMOUNT"] = "11"
+    _record(tmp_path, tm, 2)
+    (history_dir / "state.npz").write_bytes(committed_state)
+
+    # A reader (e.g. during a run still in progress) skips the uncommitted
+    # run file but leaves it to the writer
+    reader = ChangeHistory(str(history_dir))
+    assert reader.runs["RUN_ID"].tolist() == [1]
+    assert reader.changes_between().empty
+    assert (history_dir / "runs" / "run_000002.npz").exists()
+
+    tm.loc[0, "AMOUNT"] = "12"
+    assert _record(tmp_path, tm, 3) == 1
+
+    history = ChangeHistory(str(history_dir))
+    assert history.runs["RUN_ID"].tolist() == [1, 2]
+    assert history.changes_between()[["OLD_VALUE", "NEW_VALUE"]].values.tolist() == [["10", "12"]]
+    assert sorted(os.listdir(history_dir / "runs")) == ["run_000001.npz", "run_000002.npz"]
+
+
+def test_string_dictionary_survives_hash_collisions(monkeypatch):
+    monkeypatch.setattr(change_history, "hash_strings", lambda values: np.zeros(len(values), dtype=np.uint64))
+
+    dictionary = StringDictionary()
+    codes = dictionary.encode_columns(pd.DataFrame({"A": ["x", "y", None, "x"], "B": ["y", "z", "z", None]}))
+    assert codes.tolist() == [[0, 1], [1, 2], [-1, 2], [0, -1]]
+    assert dictionary.lookup(["z", "x", "q"]).tolist() == [2, 0, -1]
+    assert dictionary.decode(np.array([1, -1])).tolist() == ["y", None]
@@ -0,0 +1,77 @@
+# File: tests/test_changed_data_long.py
+
+import pandas as pd
+
+from Utils.changed_data_csv import run_changed_data_capture
+from Utils.changed_data_long import (
+    LONG_COLUMNS,
+    LONG_FIELD_PAIRS,
+    build_changed_long_rows,
+    long_csv_for,
+    write_changed_long_csv,
+)
+from Utils.synthetic_data import write_synthetic_dataset
+
+
+def _ior_rows(**columns):
+    n = len(next(iter(columns.values())))
+    data = {"DOCID": [str(i + 1) for i in range(n)]}
+    for original, current in LONG_FIELD_PAIRS:
+        data[original] = data[current] = ["same"] * n
+    data.update(columns)
+    return pd.DataFrame(data)
+
+
+def test_only_changed_cells_are_listed_with_their_category():
+    rows = _ior_rows(
+        O_RMWWR=["10", "10", "10"],
+        RMWWR=["10", "12", "10"],
+        O_DOCTYPE=["RE", "RE", "KR"],
+        DOCTYPE=["KR", "RE", "RE"],
+        O_Vend_Name2=[None, "A", None],
+        VEND_NAME2=[None, "B", None],
+    )
+
+    long_rows = build_changed_long_rows(rows)
+
+    assert list(long_rows.columns) == LONG_COLUMNS
+    assert long_rows.values.tolist() == [
+        ["1", "DOCTYPE", "RE", "KR", ""],
+        ["2", "VEND_NAME2", "A", "B", "ISSUE_SUPPLIER"],
+        ["2", "RMWWR", "10", "12", "ISSUE_AMOUNT"],
+        ["3", "DOCTYPE", "KR", "RE", ""],
+    ]
+
+
+def test_fields_use_their_rule_null_handling():
+    # ISSUE_COMPANY_CODE treats null and '' as the same value
+    rows = _ior_rows(O_BUKRS=[None, None, "1000"], BUKRS=["", "1000", "1000"], O_XBLNR=[None, "", "A"], XBLNR=["", "", "A"])
+
+    long_rows = build_changed_long_rows(rows).fillna("")
+
+    assert long_rows[["DOCID", "FIELD", "ORIGINAL", "CURRENT"]].values.tolist() == [
+        ["1", "XBLNR", "", ""],
+        ["2", "BUKRS", "", "1000"],
+    ]
+    assert build_changed_long_rows(_ior_rows(XBLNR=["A"]).iloc[0:0]).empty
+
+
+def test_capture_appends_long_rows_matching_a_rebuild(tmp_path):
+    paths = write_synthetic_dataset(str(tmp_path / "data"), 2_000, seed=5, churn_rate=0.1)
+    changed_csv = str(tmp_path / "changed.csv")
+    long_csv = long_csv_for(changed_csv)
+
+    rows = run_changed_data_capture(
+        transaction_master_csv=paths["transaction_master"],
+        originals_csv=paths["originals"],
+        changed_csv=changed_csv,
+        long_csv=long_csv,
+    )
+
+    appended = pd.read_csv(long_csv, dtype=str)
+    assert rows > 0 and len(appended) >= rows
+    assert set(appended["DOCID"]) == set(pd.read_csv(changed_csv, dtype=str)["DOCID"])
+
+    rebuilt_csv = str(tmp_path / "rebuilt.csv")
+    assert write_changed_long_csv(changed_csv, rebuilt_csv) == len(appended)
+    pd.testing.assert_frame_equal(pd.read_csv(rebuilt_csv, dtype=str), appended)
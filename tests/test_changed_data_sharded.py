@@ -0,0 +1,48 @@
+# File: tests/test_changed_data_sharded.py
+
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from Utils.changed_data_csv import run_changed_data_capture
+from Utils.changed_data_sharded import shard_ids
+from Utils.synthetic_data import write_synthetic_dataset
+
+
+def test_shard_ids_are_stable_and_in_range():
+    ids = pd.Series(["000000000123", "123", "456", None])
+
+    first = shard_ids(ids, 4)
+    second = shard_ids(ids.copy(), 4)
+
+    assert np.array_equal(first, second)
+    assert first.min() >= 0 and first.max() < 4
+
+
+def _run_to(tmp_path, paths, name, **kwargs):
+    changed_path = tmp_path / name
+    shutil.copy(paths["changed"], changed_path)
+    rows = run_changed_data_capture(
+        transaction_master_csv=paths["transaction_master"],
+        originals_csv=paths["originals"],
+        changed_csv=str(changed_path),
+        **kwargs,
+    )
+    return rows, changed_path.read_bytes()
+
+
+def test_sharded_output_is_byte_identical_to_serial(tmp_path):
+    """
+    Serial and sharded runs over the same inputs must append exactly the
+    same bytes to the Changed Data CSV.
+    """
+    paths = write_synthetic_dataset(str(tmp_path / "data"), 4_000, seed=11, churn_rate=0.1)
+
+    serial_rows, serial_bytes = _run_to(tmp_path, paths, "serial.csv")
+    inproc_rows, inproc_bytes = _run_to(tmp_path, paths, "inproc.csv", shards=4, max_workers=1)
+    pool_rows, pool_bytes = _run_to(tmp_path, paths, "pool.csv", shards=3, max_workers=2)
+
+    assert serial_rows > 0
+    assert serial_rows == inproc_rows == pool_rows
+    assert serial_bytes == inproc_bytes == pool_bytes
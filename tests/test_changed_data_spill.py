@@ -0,0 +1,57 @@
+# File: tests/test_changed_data_spill.py
+
+import shutil
+
+import pytest
+
+from Utils.changed_data_csv import run_changed_data_capture
+from Utils.changed_data_spill import estimate_frame_bytes, plan_partitions
+from Utils.synthetic_data import write_synthetic_dataset
+
+
+def test_plan_partitions_stays_in_memory_within_budget(tmp_path):
+    path = tmp_path / "transaction_master.csv"
+    path.write_bytes(b"x" * 1024 * 1024)
+
+    assert plan_partitions([str(path)], memory_budget_mb=64) == 1
+    assert plan_partitions([str(tmp_path / "missing.csv")], memory_budget_mb=1) == 1
+    # 4 MB estimated peak against a 1 MB budget
+    assert plan_partitions([str(path)], memory_budget_mb=1) == 4
+    with pytest.raises(ValueError):
+        plan_partitions([str(path)], memory_budget_mb=0)
+
+
+def _run_to(tmp_path, paths, name, **kwargs):
+    changed_path = tmp_path / name
+    shutil.copy(paths["changed"], changed_path)
+    rows = run_changed_data_capture(
+        transaction_master_csv=paths["transaction_master"],
+        originals_csv=paths["originals"],
+        changed_csv=str(changed_path),
+        **kwargs,
+    )
+    return rows, changed_path.read_bytes()
+
+
+def test_spilled_output_has_the_serial_rows_appended_per_partition(tmp_path, capsys):
+    """
+    A budget far below the input size forces the out-of-core join; it must
+    append the rows the in-memory run does, one partition at a time.
+    """
+    paths = write_synthetic_dataset(str(tmp_path / "data"), 4_000, seed=13, churn_rate=0.1)
+    budget_mb = estimate_frame_bytes([paths["transaction_master"], paths["originals"]]) / 8 / 1024 / 1024
+
+    serial_rows, serial_bytes = _run_to(tmp_path, paths, "serial.csv")
+    capsys.readouterr()
+    spill_rows, spill_bytes = _run_to(tmp_path, paths, "spill.csv", memory_budget_mb=budget_mb)
+
+    out = capsys.readouterr().out
+    assert "joining out of core" in out
+    assert out.count("new row(s) to Changed Data CSV") > 1
+    # Partitions run in this process, so their step logs are not swallowed
+    assert out.count("[ChangedData] Detected") > 1
+    assert serial_rows > 0
+    assert serial_rows == spill_rows
+    serial_lines, spill_lines = serial_bytes.splitlines(), spill_bytes.splitlines()
+    assert spill_lines[0] == serial_lines[0]
+    assert sorted(spill_lines) == sorted(serial_lines)
@@ -0,0 +1,84 @@
+# File: tests/test_csv_io.py
+
+import pandas as pd
+import pytest
+
+from Utils import csv_io
+from Utils.csv_io import CSV_ENGINE_ENV, read_csv_mmap, read_table, set_csv_engine, take_read_stats
+from Utils.synthetic_data import generate_transaction_master
+
+pytest.importorskip("pyarrow")
+
+
+def _reference(path, usecols=None):
+    return pd.read_csv(path, dtype=str, low_memory=False, usecols=usecols)
+
+
+def test_mmap_reader_matches_pandas_on_transaction_master(tmp_path):
+    path = tmp_path / "transaction_master.csv"
+    tm = generate_transaction_master(5_000, seed=2)
+    tm.loc[::97, "VENDOR_NAME"] = None
+    tm.to_csv(path, index=False)
+
+    pd.testing.assert_frame_equal(read_csv_mmap(str(path)), _reference(path))
+    pd.testing.assert_frame_equal(
+        read_csv_mmap(str(path), usecols=["DOC_ID", "ENTRY_DATE"]),
+        _reference(path, usecols=["DOC_ID", "ENTRY_DATE"]),
+    )
+
+
+def test_mmap_reader_keeps_strings_nulls_and_quoted_newlines(tmp_path):
+    path = tmp_path / "edge.csv"
+    lines = ["DOC_ID,TEXT,AMOUNT"]
+    lines += [f'{i:06d},"line {i}\nnext, with comma",NA' for i in range(20_000)]
+    lines += ['000001,"",NULL', "2,plain,1.50"]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    df = read_table(str(path))
+
+    pd.testing.assert_frame_equal(df, _reference(path))
+    assert df["DOC_ID"].iloc[0] == "000000"
+    assert df["AMOUNT"].isna().sum() == 20_001
+
+
+def test_mmap_reader_rejects_unknown_usecols(tmp_path):
+    path = tmp_path / "small.csv"
+    path.write_text("A,B\n1,2\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        read_csv_mmap(str(path), usecols=["C"])
+
+
+@pytest.mark.parametrize("engine", ["c", "pyarrow", "auto"])
+def test_every_engine_returns_the_same_frame_and_records_the_read(tmp_path, monkeypatch, engine):
+    monkeypatch.delenv(CSV_ENGINE_ENV, raising=False)
+    path = tmp_path / "transaction_master.csv.gz"
+    generate_transaction_master(1_000, seed=4).to_csv(path, index=False, compression="gzip")
+
+    set_csv_engine(engine)
+    take_read_stats()
+    df = read_table(str(path))
+
+    pd.testing.assert_frame_equal(df, _reference(path))
+    [stat] = take_read_stats()
+    assert stat["engine"] == ("c" if engine == "c" else "pyarrow")
+    assert stat["rows"] == 1_000 and stat["bytes"] == path.stat().st_size
+
+
+def test_pyarrow_failure_falls_back_to_c_engine(tmp_path, monkeypatch):
+    monkeypatch.setenv(CSV_ENGINE_ENV, "pyarrow")
+    path = tmp_path / "small.csv"
+    path.write_text("A,B\n01,x\n", encoding="utf-8")
+
+    def broken(*args, **kwargs):
+        raise OSError("simulated reader failure")
+
+    monkeypatch.setattr(csv_io, "_read_csv_arrow", broken)
+    take_read_stats()
+    assert read_table(str(path))["A"].tolist() == ["01"]
+    assert take_read_stats()[0]["engine"] == "c"
+
+
+def test_unknown_engine_is_rejected(monkeypatch):
+    monkeypatch.delenv(CSV_ENGINE_ENV, raising=False)
+    with pytest.raises(ValueError):
+        set_csv_engine("polars")
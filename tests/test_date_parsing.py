@@ -0,0 +1,53 @@
+# File: tests/test_date_parsing.py
+
+import pandas as pd
+import pytest
+
+from Utils import date_parsing
+from Utils.date_parsing import clear_date_cache, detect_date_format, parse_dates
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_date_cache()
+    yield
+    clear_date_cache()
+
+
+def test_iso_dates_are_never_read_day_first():
+    s = pd.Series(["2024-06-05 00:00:00", "2024-06-13 00:00:00", None, "junk"], name="ENTRY_DATE")
+
+    parsed = parse_dates(s)
+
+    assert parsed.tolist()[:2] == [pd.Timestamp("2024-06-05"), pd.Timestamp("2024-06-13")]
+    assert parsed.isna().tolist() == [False, False, True, True]
+
+
+def test_slash_dates_are_day_first_whatever_the_first_value():
+    assert detect_date_format(["05/06/2024", "13/06/2024"]) == "%d/%m/%Y"
+    parsed = parse_dates(pd.Series(["05/06/2024", "13/06/2024", "2024-01-02"]), None)
+    assert parsed.tolist() == [pd.Timestamp("2024-06-05"), pd.Timestamp("2024-06-13"), pd.Timestamp("2024-01-02")]
+
+
+def test_unique_values_are_parsed_once_per_column(monkeypatch):
+    calls = []
+    real = date_parsing._parse_unique
+
+    def counting(values, column):
+        calls.append(len(values))
+        return real(values, column)
+
+    monkeypatch.setattr(date_parsing, "_parse_unique", counting)
+    s = pd.Series(["2024-01-01", "2024-01-02"] * 5_000, name="BLDAT")
+
+    first = parse_dates(s)
+    second = parse_dates(pd.concat([s, pd.Series(["2024-01-03"])], ignore_index=True), "BLDAT")
+
+    assert calls == [2, 1]
+    assert first.equals(second[:-1])
+    assert second.iloc[-1] == pd.Timestamp("2024-01-03")
+
+
+def test_datetime_columns_pass_through():
+    s = pd.Series(pd.to_datetime(["2024-01-01"]))
+    assert parse_dates(s) is s
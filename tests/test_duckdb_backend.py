@@ -0,0 +1,96 @@
+# File: tests/test_duckdb_backend.py
+
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from Utils.capture_engine import get_capture_engine, resolve_capture_engine, set_capture_engine
+from Utils.changed_data_csv import run_changed_data_capture
+from Utils.originals_capture_csv import run_originals_capture
+from Utils.synthetic_data import write_synthetic_dataset
+
+pytest.importorskip("duckdb")
+
+
+def _run_engine(tmp_path, paths, engine, originals=None):
+    originals_copy = tmp_path / f"originals_{engine}.csv"
+    changed_copy = tmp_path / f"changed_{engine}.csv"
+    if originals is None:
+        shutil.copy(paths["originals"], originals_copy)
+    shutil.copy(paths["changed"], changed_copy)
+
+    changed_rows = run_changed_data_capture(
+        transaction_master_csv=paths["transaction_master"],
+        originals_csv=str(originals_copy),
+        changed_csv=str(changed_copy),
+        engine=engine,
+    )
+    originals_rows = run_originals_capture(
+        transaction_master_csv=paths["transaction_master"],
+        originals_csv=str(originals_copy),
+        days_back=60,
+        engine=engine,
+    )
+    return (changed_rows, originals_rows), changed_copy.read_bytes(), originals_copy.read_bytes()
+
+
+def test_duckdb_engine_writes_identical_files(tmp_path):
+    """Both capture jobs must append exactly the same bytes with either engine."""
+    paths = write_synthetic_dataset(
+        str(tmp_path / "data"), 6_000, seed=21, churn_rate=0.1, duplicate_rate=0.01
+    )
+
+    pandas_rows, pandas_changed, pandas_originals = _run_engine(tmp_path, paths, "pandas")
+    duckdb_rows, duckdb_changed, duckdb_originals = _run_engine(tmp_path, paths, "duckdb")
+
+    assert min(pandas_rows) > 0
+    assert pandas_rows == duckdb_rows
+    assert pandas_changed == duckdb_changed
+    assert pandas_originals == duckdb_originals
+
+
+def test_duckdb_engine_with_no_originals_yet(tmp_path):
+    paths = write_synthetic_dataset(str(tmp_path / "data"), 2_000, seed=3)
+
+    pandas_rows, _, pandas_originals = _run_engine(tmp_path, paths, "pandas", originals="missing")
+    duckdb_rows, _, duckdb_originals = _run_engine(tmp_path, paths, "duckdb", originals="missing")
+
+    assert pandas_rows == duckdb_rows
+    assert pandas_originals == duckdb_originals
+
+
+def test_duckdb_engine_reads_parquet_exports(tmp_path):
+    paths = write_synthetic_dataset(str(tmp_path / "data"), 2_000, seed=4, churn_rate=0.1)
+    expected_rows, expected_changed, _ = _run_engine(tmp_path, paths, "pandas")
+
+    tm_csv = paths["transaction_master"]
+    pd.read_csv(tm_csv, dtype=str).to_parquet(os.path.splitext(tm_csv)[0] + ".parquet", index=False)
+    os.remove(tm_csv)
+
+    rows, changed, _ = _run_engine(tmp_path, paths, "duckdb")
+    assert rows == expected_rows
+    assert changed == expected_changed
+
+
+def test_duckdb_engine_rejects_duplicate_transaction_master_ids(tmp_path):
+    paths = write_synthetic_dataset(str(tmp_path / "data"), 500, seed=5)
+    tm = pd.read_csv(paths["transaction_master"], dtype=str)
+    pd.concat([tm, tm.head(1)]).to_csv(paths["transaction_master"], index=False)
+
+    with pytest.raises(ValueError, match="duplicate DOC_ID"):
+        run_changed_data_capture(
+            paths["transaction_master"], paths["originals"], paths["changed"], engine="duckdb"
+        )
+
+
+def test_capture_engine_setting(monkeypatch):
+    monkeypatch.delenv("PIOR_CAPTURE_ENGINE", raising=False)
+    assert get_capture_engine() == "pandas"
+
+    set_capture_engine("duckdb")
+    assert resolve_capture_engine() == "duckdb"
+
+    with pytest.raises(ValueError):
+        set_capture_engine("spark")
@@ -0,0 +1,148 @@
+# File: tests/test_duplicate_invoices.py
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Job_Runner.orchestration_runner import build_jobs
+from Utils.duplicate_invoices import (
+    NO_KEY,
+    PENDING_SUFFIX,
+    DuplicateInvoiceIndex,
+    index_path_for,
+    invoice_keys,
+    load_duplicate_index,
+    run_duplicate_invoice_detection,
+)
+
+INVOICES = pd.DataFrame(
+    {
+        "DOC_ID": ["1", "2", "3", "4", "5", "6"],
+        "VENDOR_NUM": ["3000001", "3000001", "003000001", "3000002", "3000002", None],
+        "INVOICE_NUMBER": ["INV-00123", "inv-00123 ", "INV123", "A1", "A1", "X1"],
+        "AMOUNT": ["100.5", "100.50", "100.5", "10", "11", "5"],
+        "DOC_DATE": "2024-01-01",
+        "ENTRY_DATE": "2024-01-02",
+    }
+)
+
+
+def _run(tmp_path, tm):
+    tm_csv = tmp_path / "transaction_master.csv"
+    tm.to_csv(tm_csv, index=False)
+    candidates_csv = str(tmp_path / "candidates.csv")
+    rows = run_duplicate_invoice_detection(str(tm_csv), candidates_csv)
+    return rows, candidates_csv
+
+
+def test_invoice_keys():
+    keys = invoice_keys(INVOICES)
+    strict, relaxed = keys["STRICT"].tolist(), keys["RELAXED"].tolist()
+
+    # Case, padding and trailing amount zeros are normalised by both keys
+    assert strict[0] == strict[1] != strict[2]
+    assert relaxed[0] == relaxed[1] == relaxed[2]
+    # Different amount, no vendor
+    assert strict[3] != strict[4]
+    assert strict[5] == NO_KEY and relaxed[5] == NO_KEY
+
+
+def test_blank_keys_are_never_grouped(tmp_path):
+    blanks = pd.DataFrame(
+        {
+            "DOC_ID": ["1", "2", "3", "4"],
+            "VENDOR_NUM": pd.Series([np.nan, np.nan, "3000001", "3000001"], dtype=object),
+            "INVOICE_NUMBER": pd.Series(["A1", "A1", None, None], dtype=object),
+            "AMOUNT": ["10", "10", "10", "10"],
+        }
+    )
+    keys = invoice_keys(blanks)
+    assert (keys["STRICT"] == NO_KEY).all() and (keys["RELAXED"] == NO_KEY).all()
+
+    rows, _ = _run(tmp_path, blanks)
+    assert rows == 0
+
+
+def test_missing_key_column_is_reported(tmp_path):
+    with pytest.raises(ValueError, match="missing required columns: \\['AMOUNT'\\]"):
+        _run(tmp_path, INVOICES.drop(columns=["AMOUNT", "DOC_DATE"]))
+
+
+def test_first_run_reports_strict_and_relaxed_groups(tmp_path):
+    rows, candidates_csv = _run(tmp_path, INVOICES)
+    out = pd.read_csv(candidates_csv, dtype=str)
+
+    assert rows == 5
+    assert out["MATCH_TYPE"].tolist() == ["STRICT"] * 2 + ["RELAXED"] * 3
+    assert out["DOC_ID"].tolist() == ["1", "2", "1", "2", "3"]
+    assert out["GROUP_SIZE"].tolist() == ["2", "2", "3", "3", "3"]
+    assert (out["NEW_INVOICE"] == "1").all()
+
+
+def test_later_runs_probe_only_new_invoices(tmp_path):
+    _run(tmp_path, INVOICES)
+    rows, candidates_csv = _run(tmp_path, INVOICES)
+    assert rows == 0
+
+    late = pd.DataFrame({"DOC_ID": ["7"], "VENDOR_NUM": ["3000002"], "INVOICE_NUMBER": ["A1"], "AMOUNT": ["10.00"]})
+    rows, candidates_csv = _run(tmp_path, pd.concat([INVOICES, late], ignore_index=True))
+
+    new_rows = pd.read_csv(candidates_csv, dtype=str).tail(rows)
+    assert new_rows["DOC_ID"].tolist() == ["4", "7"]
+    assert new_rows["NEW_INVOICE"].tolist() == ["0", "1"]
+    # Details come from the Transaction Master, for indexed invoices too
+    assert new_rows["INVOICE_NUMBER"].tolist() == ["A1", "A1"]
+    assert len(DuplicateInvoiceIndex.load(index_path_for(candidates_csv))) == 7
+
+
+def test_corrected_invoices_are_probed_again(tmp_path):
+    _run(tmp_path, INVOICES)
+
+    # OCR fix after indexing: DOC_ID 5's amount now matches DOC_ID 4
+    corrected = INVOICES.copy()
+    corrected.loc[4, "AMOUNT"] = "10.00"
+    rows, candidates_csv = _run(tmp_path, corrected)
+
+    new_rows = pd.read_csv(candidates_csv, dtype=str).tail(rows)
+    assert new_rows["MATCH_TYPE"].tolist() == ["STRICT", "STRICT"]
+    assert new_rows["DOC_ID"].tolist() == ["4", "5"]
+    assert new_rows["NEW_INVOICE"].tolist() == ["0", "1"]
+    assert _run(tmp_path, corrected)[0] == 0
+
+    # DOC_ID 4 is corrected away from that key: a new invoice with its old
+    # key only matches DOC_ID 5, not the stale entry for 4
+    corrected.loc[3, "AMOUNT"] = "12"
+    late = pd.DataFrame({"DOC_ID": ["7"], "VENDOR_NUM": ["3000002"], "INVOICE_NUMBER": ["A1"], "AMOUNT": ["10"]})
+    rows, candidates_csv = _run(tmp_path, pd.concat([corrected, late], ignore_index=True))
+
+    new_rows = pd.read_csv(candidates_csv, dtype=str).tail(rows)
+    assert new_rows["DOC_ID"].tolist() == ["5", "7"]
+    index = DuplicateInvoiceIndex.load(index_path_for(candidates_csv))
+    assert len(index) == 7
+    assert index.strict[3] == invoice_keys(corrected.iloc[[3]])["STRICT"].iloc[0]
+
+
+def test_pending_index_from_interrupted_run(tmp_path):
+    candidates_csv = str(tmp_path / "candidates.csv")
+    index_path = index_path_for(candidates_csv)
+    keys = invoice_keys(INVOICES)
+    pending = DuplicateInvoiceIndex.empty().extended(INVOICES["DOC_ID"], keys)
+
+    # Died before the candidates were appended: the pending index is dropped
+    pending.write(index_path + PENDING_SUFFIX)
+    assert len(load_duplicate_index(index_path, candidates_csv)) == 0
+    assert not os.path.exists(index_path + PENDING_SUFFIX)
+
+    # Died after: the pending index is promoted
+    pending.write(index_path + PENDING_SUFFIX)
+    with open(candidates_csv, "w") as f:
+        f.write("MATCH_TYPE,DOC_ID\nSTRICT,1\n")
+    assert len(load_duplicate_index(index_path, candidates_csv)) == 6
+    assert os.path.exists(index_path)
+
+
+def test_pipeline_includes_duplicate_invoices():
+    jobs = build_jobs(["duplicate_invoices", "transaction_master"])
+    assert list(jobs) == ["transaction_master", "duplicate_invoices"]
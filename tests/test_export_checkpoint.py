@@ -0,0 +1,166 @@
+# File: tests/test_export_checkpoint.py
+
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from Job_Runner.sql_export_job import EXPORT_CHANGED, SqlExportJob
+from Utils import export_checkpoint
+from Utils.export_checkpoint import (
+    CHECKPOINT_SUFFIX,
+    ExportCheckpoint,
+    parse_order_by,
+    split_trailing_ties,
+)
+from Utils.sql_loader import load_sql
+
+SQL_DIR = Path(__file__).resolve().parents[1] / "SQL"
+
+QUERY = """SELECT
+h.DOCID AS DOC_ID,
+h.INDEX_DATE AS ENTRY_DATE,
+h.BUDAT AS POSTING_DATE
+FROM DSS.VIM_1HEAD_2HEAD_VW h
+ORDER BY ENTRY_DATE DESC, BUDAT DESC
+"""
+COLUMNS = ["DOC_ID", "ENTRY_DATE", "POSTING_DATE"]
+
+
+def _make_rows(n):
+    """Rows in ENTRY_DATE DESC, POSTING_DATE DESC (NULLS FIRST) order, with many ties."""
+    base = datetime(2024, 6, 30)
+    rows = []
+    for i in range(n):
+        entry = base - timedelta(days=i // 7)
+        posting = None if i % 7 == 0 else entry - timedelta(days=(i % 7) // 3)
+        rows.append((f"{i:08d}", entry, posting))
+    return rows
+
+
+def _sort_key(row):
+    # DESC with NULLS FIRST == ascending on (is not null, -value)
+    entry, posting = row[1], row[2]
+    return (-entry.timestamp(), posting is not None, -(posting.timestamp() if posting else 0))
+
+
+class OrderedDB:
+    """
+    Stands in for OracleConnection over an ordered result. Understands the
+    resume wrapper by filtering on the resume_k* binds, reverses tied rows on
+    each re-query (Oracle does not order ties), and can fail mid-stream.
+    Batches are `fetch_size` rows whatever the caller asks for.
+    """
+
+    def __init__(self, rows, fail_after_batches=None, fetch_size=250):
+        self.rows = sorted(rows, key=_sort_key)
+        self.fetch_size = fetch_size
+        self.fail_after_batches = fail_after_batches
+        self.queries = []
+
+    def get_row_count(self, query, params=None):
+        return len(self.rows)
+
+    def run_in_batches(self, query, batch_size=10000, params=None):
+        self.queries.append((query, dict(params or {})))
+        rows = self.rows
+        if "resume_src" in query:
+            last = (params["resume_k0"], params.get("resume_k1"))
+            last_key = _sort_key(("", last[0], last[1]))
+            rows = [r for r in rows if _sort_key(r) > last_key]
+            rows = list(reversed(rows))
+            rows.sort(key=_sort_key)  # stable: ties stay reversed
+        batch_size = self.fetch_size
+        for n, start in enumerate(range(0, len(rows), batch_size)):
+            if self.fail_after_batches is not None and n == self.fail_after_batches:
+                raise ConnectionError("ORA-03113: end-of-file on communication channel")
+            yield COLUMNS, rows[start:start + batch_size]
+
+
+def _job(tmp_path, resume=False):
+    (tmp_path / "query.sql").write_text(QUERY, encoding="utf-8")
+    return SqlExportJob("query.sql", "transaction_master.csv", "Transaction Master",
+                        "TRANSACTION MASTER COMPLETE", resume=resume)
+
+
+def test_parse_order_by_maps_repo_sql_to_output_columns():
+    tm, _ = load_sql(str(SQL_DIR / "transaction_master.sql"))
+    vendor, _ = load_sql(str(SQL_DIR / "vendor_master.sql"))
+    layout, _ = load_sql(str(SQL_DIR / "layout_master.sql"))
+
+    assert parse_order_by(tm) == [("ENTRY_DATE", "DESC"), ("POSTING_DATE", "DESC")]
+    assert parse_order_by(vendor) == [("VENDOR_NUM", "ASC"), ("COMPANY_CODE", "ASC")]
+    assert parse_order_by(layout) is None
+
+
+def test_split_trailing_ties_holds_back_last_group():
+    rows = [(1, "a"), (2, "b"), (2, "c"), (3, "d"), (3, "e")]
+    assert split_trailing_ties(rows, [0]) == ([(1, "a"), (2, "b"), (2, "c")], [(3, "d"), (3, "e")])
+    assert split_trailing_ties([(3, "d"), (3, "e")], [0]) == ([], [(3, "d"), (3, "e")])
+
+
+def test_key_flag_stays_with_its_batch_when_take_runs_ahead(tmp_path, monkeypatch):
+    """run_async takes batch N+1 before batch N is committed."""
+    monkeypatch.setattr(export_checkpoint, "MAX_CARRY_ROWS", 3)
+    partial = tmp_path / "out.csv.partial"
+    partial.write_text("", encoding="utf-8")
+    checkpoint = ExportCheckpoint(str(partial), QUERY, {})
+    day = [datetime(2024, 6, d) for d in (30, 29, 28)]
+
+    first = [("1", day[0], None), ("2", day[0], None), ("3", day[1], None), ("4", day[2], None)]
+    oversized = [(str(i), day[2], None) for i in range(5, 10)]
+    ready_1, complete_1 = checkpoint.take(COLUMNS, first)
+    ready_2, complete_2 = checkpoint.take(COLUMNS, oversized)
+    assert (len(ready_1), complete_1, len(ready_2), complete_2) == (3, True, 6, False)
+
+    checkpoint.commit(ready_1, complete_1)
+    assert checkpoint.last_key == [day[1], None]
+
+    # The tie group was released part-way: its key must not be resumed after
+    checkpoint.commit(ready_2, complete_2)
+    assert checkpoint.last_key is None
+    assert json.loads((tmp_path / ("out.csv.partial" + CHECKPOINT_SUFFIX)).read_text())["last_key"] is None
+
+
+def test_interrupted_export_resumes_from_last_key(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rows = _make_rows(2_000)
+
+    # Reference: one uninterrupted run
+    _job(tmp_path).run(OrderedDB(rows))
+    out = tmp_path / "Output_Files" / "transaction_master.csv"
+    expected = pd.read_csv(out, dtype=str)
+    out.unlink()
+    (tmp_path / "Output_Files" / "run_manifest.json").unlink()
+    (tmp_path / "Output_Files" / "done.txt").unlink()
+
+    # Fails at ~60%: the partial file and checkpoint are left behind
+    assert _job(tmp_path).run(OrderedDB(rows, fail_after_batches=5)) is None
+    partial = tmp_path / "Output_Files" / "transaction_master.csv.partial"
+    checkpoint = json.loads(Path(str(partial) + CHECKPOINT_SUFFIX).read_text())
+    assert 0 < checkpoint["rows"] < len(rows)
+    assert not out.exists()
+
+    # Resume re-queries only rows after the checkpointed key
+    db = OrderedDB(rows)
+    assert _job(tmp_path, resume=True).run(db) == EXPORT_CHANGED
+    query, params = db.queries[0]
+    assert "resume_src" in query and "resume_k0" in params
+
+    result = pd.read_csv(out, dtype=str)
+    assert len(result) == len(rows)
+    assert result["DOC_ID"].is_unique
+    assert sorted(result["DOC_ID"]) == sorted(expected["DOC_ID"])
+    assert (tmp_path / "Output_Files" / "done.txt").exists()
+    assert not partial.exists()
+    assert not Path(str(partial) + CHECKPOINT_SUFFIX).exists()
+
+
+def test_resume_without_checkpoint_starts_from_zero(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = OrderedDB(_make_rows(300))
+
+    assert _job(tmp_path, resume=True).run(db) == EXPORT_CHANGED
+    assert "resume_src" not in db.queries[0][0]
+    assert len(pd.read_csv(tmp_path / "Output_Files" / "transaction_master.csv")) == 300
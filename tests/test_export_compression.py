@@ -0,0 +1,103 @@
+# File: tests/test_export_compression.py
+
+import gzip
+import os
+
+import pandas as pd
+import pytest
+
+from Job_Runner.sql_export_job import SqlExportJob
+from Utils.changed_data_csv import load_transaction_master_dataframe
+from Utils.csv_io import resolve_csv_path
+from Utils.export import compressed_filename, export_to_csv, resolve_compression
+
+
+class FakeDB:
+    """Stands in for OracleConnection: fixed count and two batches."""
+
+    def __init__(self, columns, batches):
+        self.columns = columns
+        self.batches = batches
+
+    def get_row_count(self, query, params=None):
+        return sum(len(b) for b in self.batches)
+
+    def run_in_batches(self, query, batch_size=10000, params=None):
+        for rows in self.batches:
+            yield self.columns, rows
+
+
+def test_resolve_compression_and_filename():
+    assert resolve_compression(None) is None
+    assert resolve_compression("none") is None
+    assert compressed_filename("tm.csv", "gzip") == "tm.csv.gz"
+    with pytest.raises(ValueError):
+        resolve_compression("lzma")
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_compressed_batches_read_back_as_one_csv(tmp_path, monkeypatch, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    monkeypatch.chdir(tmp_path)
+
+    filename = compressed_filename("transaction_master.csv", compression)
+    export_to_csv(["DOC_ID", "AMOUNT"], [("0001", "1.00")], filename=filename, compression=compression)
+    export_to_csv(["DOC_ID", "AMOUNT"], [("2", "2.00")], filename=filename, append=True, compression=compression)
+
+    plain_path = os.path.join("Output_Files", "transaction_master.csv")
+    assert resolve_csv_path(plain_path) == os.path.join("Output_Files", filename)
+
+    df = load_transaction_master_dataframe(plain_path)
+    assert df["DOC_ID"].tolist() == ["0001", "2"]
+
+
+def test_sql_export_job_writes_gzip_output(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "query.sql").write_text("SELECT 1 FROM dual", encoding="utf-8")
+
+    job = SqlExportJob(
+        sql_file="query.sql",
+        output_file="vendor_master.csv",
+        label="Vendor Master",
+        flag_message="VENDOR MASTER COMPLETE",
+        compression="gzip",
+    )
+    db = FakeDB(["VENDOR_NUM", "VENDOR_NAME_1"], [[("1", "A")], [("2", "B")]])
+    job.run(db)
+
+    out = tmp_path / "Output_Files" / "vendor_master.csv.gz"
+    with gzip.open(out, "rt", encoding="utf-8") as f:
+        assert f.read().splitlines() == ["VENDOR_NUM,VENDOR_NAME_1", "1,A", "2,B"]
+    assert (tmp_path / "Output_Files" / "done.txt").exists()
+    assert pd.read_csv(out, dtype=str).shape == (2, 2)
+
+
+def test_sql_export_job_writes_parquet_read_back_as_strings(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "query.sql").write_text("SELECT 1 FROM dual", encoding="utf-8")
+
+    job = SqlExportJob(
+        sql_file="query.sql",
+        output_file="transaction_master.csv",
+        label="Transaction Master",
+        flag_message="TRANSACTION MASTER COMPLETE",
+        output_format="parquet",
+        fetch_size=1,
+        resume=True,
+    )
+    assert job.output_file == "transaction_master.parquet"
+    assert job.resume is False
+
+    db = FakeDB(["DOC_ID", "AMOUNT"], [[("0001", 1.5)], [("2", None)]])
+    job.run(db)
+
+    assert not (tmp_path / "Output_Files" / "transaction_master.parquet.partial").exists()
+    plain_path = os.path.join("Output_Files", "transaction_master.csv")
+    assert resolve_csv_path(plain_path).endswith("transaction_master.parquet")
+
+    df = load_transaction_master_dataframe(plain_path)
+    assert df["DOC_ID"].tolist() == ["0001", "2"]
+    assert df["AMOUNT"].iloc[0] == "1.5"
+    assert pd.isna(df["AMOUNT"].iloc[1])
@@ -0,0 +1,66 @@
+# File: tests/test_issue_rules.py
+
+import pandas as pd
+import pytest
+
+from Utils.issue_rules import ISSUE_RULES, IssueRule, compile_issue_rules
+
+
+def _frame(**columns):
+    rule_columns = {c for r in ISSUE_RULES for c in r.columns()}
+    n = len(next(iter(columns.values())))
+    data = {c: ["same"] * n for c in rule_columns}
+    data["BUKRS"] = data["O_BUKRS"] = ["1000"] * n
+    data["BLDAT"] = data["O_BLDAT"] = ["2024-01-15"] * n
+    data.update(columns)
+    return pd.DataFrame(data)
+
+
+def test_company_code_treats_null_as_blank_and_flags_invalid_codes():
+    df = _frame(O_BUKRS=[None, "", "1000", "1000", "1000"], BUKRS=["", None, "9999", "1100", "1000"])
+
+    flags = compile_issue_rules()(df)
+
+    assert flags["ISSUE_COMPANY_CODE"].tolist() == [1, 1, 1, 1, 0]
+
+
+def test_null_differs_from_text_but_equals_null():
+    df = _frame(O_XBLNR=[None, None, "INV1"], XBLNR=[None, "INV1", "INV1"])
+
+    assert compile_issue_rules()(df)["ISSUE_INVOICE_NUMBER"].tolist() == [0, 1, 0]
+
+
+def test_flags_follow_rule_order_and_are_counted():
+    df = _frame(
+        O_BLDAT=["2022-05-01", "2024-01-15"],
+        BLDAT=["2022-05-02", "not a date"],
+        O_Vend_Name2=["A", None],
+        VEND_NAME2=["B", None],
+    )
+
+    flags = compile_issue_rules()(df)
+
+    assert list(flags.columns) == [r.name for r in ISSUE_RULES] + ["ISSUE_COUNT"]
+    assert flags["ISSUE_DATE_RANGE"].tolist() == [1, 0]
+    assert flags["ISSUE_INVOICE_DATE"].tolist() == [1, 1]
+    assert flags["ISSUE_SUPPLIER"].tolist() == [1, 0]
+    assert flags["ISSUE_COUNT"].tolist() == [3, 1]
+
+
+def test_custom_rule_reuses_shared_columns():
+    rules = ISSUE_RULES + [IssueRule("ISSUE_OCR_BLANK_INVOICE", invalid={"XBLNR": ("", "?")}, null_as="")]
+    df = _frame(O_XBLNR=["1", "1", "1"], XBLNR=[None, "?", "1"])
+
+    flags = compile_issue_rules(rules)(df)
+
+    assert flags["ISSUE_OCR_BLANK_INVOICE"].tolist() == [1, 1, 0]
+    assert flags["ISSUE_COUNT"].tolist() == [2, 2, 0]
+
+
+def test_invalid_rule_definitions_are_rejected():
+    with pytest.raises(ValueError):
+        IssueRule("ISSUE_EMPTY")
+    with pytest.raises(ValueError):
+        compile_issue_rules([ISSUE_RULES[0], ISSUE_RULES[0]])
+    with pytest.raises(ValueError):
+        compile_issue_rules()(pd.DataFrame({"O_OBJTXT": ["a"]}))
@@ -0,0 +1,71 @@
+# File: tests/test_main_cli.py
+
+import pytest
+
+import main
+from Job_Runner import orchestration_runner
+from Job_Runner.orchestration_runner import build_jobs, resolve_job_names, run_jobs
+
+
+def test_run_command_parses_jobs_and_options():
+    args = main.build_parser().parse_args(
+        ["run", "transaction_master", "vendor_master", "--parallel", "3",
+         "--format", "parquet", "--fetch-size", "50000", "--profile"]
+    )
+    assert args.command == "run"
+    assert args.parallel == 3 and args.profile
+    assert main.export_options(args) == {
+        "output_format": "parquet", "compression": None, "fetch_size": 50000,
+    }
+    # Jobs always run in pipeline order, whatever order they were given in
+    assert resolve_job_names(args.jobs) == ["vendor_master", "transaction_master"]
+
+
+def test_changed_data_options_are_opt_in(monkeypatch):
+    monkeypatch.setattr(orchestration_runner, "run_jobs", lambda jobs, profile=False: jobs)
+
+    jobs = main.main(["run", "changed_data"])
+    assert jobs["changed_data"].vendor_master_csv is None
+    assert jobs["changed_data"].long_csv is None
+    assert not jobs["changed_data"].upgrade_schema
+
+    jobs = main.main(["run", "changed_data", "--vendor-match", "--changed-long", "--upgrade-changed-schema"])
+    assert jobs["changed_data"].vendor_master_csv.endswith("vendor_master.csv")
+    assert jobs["changed_data"].long_csv.endswith("Change_Invoice_Data_CSV_Long.csv")
+    assert jobs["changed_data"].upgrade_schema
+
+
+def test_invalid_arguments_are_rejected():
+    parser = main.build_parser()
+    with pytest.raises(SystemExit):
+        parser.parse_args(["run", "vendor_mastr"])
+    with pytest.raises(SystemExit):
+        parser.parse_args(["run", "all", "--parallel", "0"])
+
+
+def test_build_jobs_passes_export_options_to_exports_only():
+    jobs = build_jobs(["all"], output_format="parquet", fetch_size=500)
+    assert list(jobs) == list(orchestration_runner.PIPELINE_ORDER)
+    assert jobs["transaction_master"].output_file == "transaction_master.parquet"
+    assert jobs["vendor_master"].fetch_size == 500
+    assert not hasattr(jobs["changed_data"], "fetch_size")
+
+
+def test_csv_only_run_does_not_connect(monkeypatch):
+    class FakeCaptureJob:
+        def __init__(self, rows):
+            self.rows = rows
+
+        def run(self, db=None):
+            assert db is None
+            return self.rows
+
+    def no_connection(config):
+        raise AssertionError("CSV-only runs must not connect to Oracle")
+
+    monkeypatch.setattr(orchestration_runner, "OracleConnection", no_connection)
+    results = run_jobs({"originals_capture": FakeCaptureJob(3), "changed_data": FakeCaptureJob(0)}, profile=True)
+
+    assert [r["status"] for r in results.values()] == ["done", "done"]
+    assert results["originals_capture"]["result"] == 3
+    assert all(r["seconds"] >= 0 for r in results.values())
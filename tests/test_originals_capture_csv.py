@@ -2,7 +2,12 @@ from datetime import datetime ,timedelta
 from pathlib import Path
 import pandas as pd
 
-from Utils.originals_capture_csv import run_originals_capture
+from Utils.originals_capture_csv import (
+    ORIGINALS_COLUMNS,
+    run_originals_capture,
+    run_originals_capture_from_db,
+)
+from Utils.synthetic_data import write_synthetic_dataset
 
 
 def _recent_date_str(days_ago: int = 1) -> str:
@@ -249,3 +254,53 @@ def test_date_filter_skips_old_invoices(tmp_path):
     orig = pd.read_csv(originals_path, dtype=str)
     assert len(orig) == 1
     assert orig["DOC_ID"].iloc[0] == "000000000021"
+
+
+class WindowDB:
+    """
+    Stands in for OracleConnection when running SQL/originals_window.sql:
+    applies the bound cutoff to a Transaction Master frame.
+    """
+
+    def __init__(self, tm_df):
+        self.tm_df = tm_df
+        self.params = None
+
+    def run_in_batches(self, query, batch_size=10000, params=None):
+        self.params = params
+        entry = pd.to_datetime(self.tm_df["ENTRY_DATE"])
+        window = self.tm_df.loc[entry >= params["cutoff_date"], ORIGINALS_COLUMNS]
+        rows = list(window.itertuples(index=False, name=None))
+        for start in range(0, len(rows), batch_size):
+            yield ORIGINALS_COLUMNS, rows[start:start + batch_size]
+
+
+def test_db_window_capture_matches_csv_capture(tmp_path):
+    """
+    The pushed-down DB window must append the same DOC_IDs as filtering the
+    Transaction Master CSV in pandas.
+    """
+    paths = write_synthetic_dataset(str(tmp_path), 3_000, seed=11)
+    db_originals = tmp_path / "db_originals.csv"
+    db_originals.write_bytes(Path(paths["originals"]).read_bytes())
+
+    tm_df = pd.read_csv(paths["transaction_master"], dtype=str)
+    db = WindowDB(tm_df)
+
+    csv_written = run_originals_capture(paths["transaction_master"], paths["originals"], days_back=30)
+    db_written = run_originals_capture_from_db(
+        db, str(db_originals), days_back=30, sql_file=str(Path("SQL") / "originals_window.sql"),
+        batch_size=500,
+    )
+
+    assert db_written == csv_written > 0
+    assert "cutoff_date" in db.params
+
+    csv_ids = pd.read_csv(paths["originals"], dtype=str)["DOC_ID"].tolist()
+    db_ids = pd.read_csv(db_originals, dtype=str)["DOC_ID"].tolist()
+    assert db_ids == csv_ids
+
+    # A second run finds nothing new
+    assert run_originals_capture_from_db(
+        db, str(db_originals), days_back=30, sql_file=str(Path("SQL") / "originals_window.sql")
+    ) == 0
@@ -0,0 +1,129 @@
+# File: tests/test_originals_segments.py
+
+import json
+import os
+
+import pandas as pd
+
+from Utils.changed_data_csv import run_changed_data_capture
+from Utils.originals_capture_csv import run_originals_capture
+from Utils.originals_segments import (
+    MANIFEST_NAME,
+    KeyBloomFilter,
+    OriginalsSegmentStore,
+    build_segments_from_csv,
+)
+from Utils.synthetic_data import write_synthetic_dataset
+
+
+def test_bloom_filter_has_no_false_negatives():
+    keys = pd.Series([str(i) for i in range(20_000)])
+    bloom = KeyBloomFilter(capacity=len(keys))
+    bloom.add(keys)
+
+    assert bloom.might_contain(keys).all()
+
+    others = pd.Series([str(i) for i in range(1_000_000, 1_020_000)])
+    assert bloom.might_contain(others).mean() < 0.05
+
+
+def test_migration_splits_by_entry_month(tmp_path):
+    csv_path = tmp_path / "originals.csv"
+    pd.DataFrame(
+        {
+            "DOC_ID": ["0001", "2", "3", "4"],
+            "ENTRY_DATE": ["2025-01-03", "2025-01-20", "2025-02-01", None],
+        }
+    ).to_csv(csv_path, index=False)
+
+    store_dir = tmp_path / "store"
+    assert build_segments_from_csv(str(csv_path), str(store_dir)) == 4
+
+    manifest = json.loads((store_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    segments = manifest["segments"]
+    assert sorted(segments) == ["2025-01", "2025-02", "unknown"]
+    assert segments["2025-01"]["rows"] == 2
+    assert segments["2025-01"]["min_key"] == "1"
+    assert segments["2025-01"]["max_key"] == "2"
+
+    store = OriginalsSegmentStore(str(store_dir))
+    assert store.existing_keys(["1", "3", "99"]) == {"1", "3"}
+    # Key 99 is outside every segment's key range, so nothing is opened for it
+    assert store.candidate_segments(pd.Series(["99"])) == {}
+
+
+def test_stale_manifest_is_rebuilt_from_segment(tmp_path):
+    store = OriginalsSegmentStore(str(tmp_path))
+    store.append(pd.DataFrame({"DOC_ID": ["1"], "ENTRY_DATE": ["2025-01-03"]}))
+
+    # Simulate a crash after the append but before the manifest was updated
+    with open(store.segment_path("2025-01"), "a", encoding="utf-8") as f:
+        f.write("500,2025-01-04\n")
+
+    reopened = OriginalsSegmentStore(str(tmp_path))
+    assert reopened.segments["2025-01"]["rows"] == 2
+    assert reopened.existing_keys(["500"]) == {"500"}
+
+
+def test_segmented_capture_matches_csv_capture(tmp_path):
+    paths = write_synthetic_dataset(str(tmp_path / "data"), 3_000, seed=4, churn_rate=0.05)
+    store_dir = str(tmp_path / "store")
+    build_segments_from_csv(paths["originals"], store_dir)
+
+    csv_written = run_originals_capture(paths["transaction_master"], paths["originals"], days_back=30)
+    seg_written = run_originals_capture(
+        paths["transaction_master"], paths["originals"], days_back=30, originals_store_dir=store_dir
+    )
+    assert seg_written == csv_written > 0
+
+    # Second run is idempotent
+    assert run_originals_capture(
+        paths["transaction_master"], paths["originals"], days_back=30, originals_store_dir=store_dir
+    ) == 0
+
+    csv_changed = str(tmp_path / "changed_csv.csv")
+    seg_changed = str(tmp_path / "changed_seg.csv")
+    csv_rows = run_changed_data_capture(paths["transaction_master"], paths["originals"], csv_changed)
+    seg_rows = run_changed_data_capture(
+        paths["transaction_master"], paths["originals"], seg_changed, originals_store_dir=store_dir
+    )
+
+    assert seg_rows == csv_rows > 0
+    csv_ids = set(pd.read_csv(csv_changed, dtype=str)["DOCID"])
+    seg_ids = set(pd.read_csv(seg_changed, dtype=str)["DOCID"])
+    assert csv_ids == seg_ids
+    assert os.path.exists(os.path.join(store_dir, MANIFEST_NAME))
+
+
+def test_changed_data_opens_only_segments_of_candidate_doc_ids(tmp_path, monkeypatch):
+    from Utils import originals_segments
+    from Utils.changed_data_csv import CHANGED_COMPARE_COLUMNS
+
+    doc_ids = [str(i) for i in range(1, 7)]
+    originals = pd.DataFrame({c: "x" for c in CHANGED_COMPARE_COLUMNS}, index=range(6))
+    originals["DOC_ID"] = doc_ids
+    originals["ENTRY_DATE"] = ["2025-01-05", "2025-01-06", "2025-02-05", "2025-02-06", "2025-03-05", "2025-03-06"]
+    originals["STATUS_TEXT"] = "Pending"
+    store_dir = str(tmp_path / "store")
+    OriginalsSegmentStore(store_dir).append(originals)
+
+    # Every invoice changed; only "1" (already recorded) and "3" are posted
+    tm = originals.copy()
+    tm["AMOUNT"] = "y"
+    tm["STATUS_TEXT"] = ["Posted", "Pending", "Posted", "Pending", "Pending", "Pending"]
+    for col in ["LAYOUT_ID", "POSTING_DATE", "PO_LAST_UPDATED", "ENTRY_DATE_AND_TIME"]:
+        tm[col] = "2025-03-07"
+    tm_csv = str(tmp_path / "transaction_master.csv")
+    tm.to_csv(tm_csv, index=False)
+    changed_csv = str(tmp_path / "changed.csv")
+    pd.DataFrame({"DOCID": ["1"]}).to_csv(changed_csv, index=False)
+
+    opened = []
+    read_table = originals_segments.read_table
+    monkeypatch.setattr(originals_segments, "read_table", lambda path, **kw: opened.append(path) or read_table(path, **kw))
+
+    rows = run_changed_data_capture(tm_csv, str(tmp_path / "unused.csv"), changed_csv, originals_store_dir=store_dir)
+
+    assert rows == 1
+    assert pd.read_csv(changed_csv, dtype=str)["DOCID"].tolist() == ["1", "3"]
+    assert [os.path.basename(p) for p in opened] == [os.path.basename(OriginalsSegmentStore(store_dir).segment_path("2025-02"))]
@@ -0,0 +1,25 @@
+# File: tests/test_packed_strings.py
+
+import numpy as np
+
+from Utils.packed_strings import hash_packed, hash_strings, pack_strings, unpack_strings
+
+
+def test_pack_round_trips_missing_unicode_and_nul_values():
+    values = ["INV-1", None, "", "Café", "a\x00b"]
+
+    blob, offsets = pack_strings(values)
+
+    assert blob.dtype == np.uint8 and len(offsets) == len(values) + 1
+    assert unpack_strings(blob, offsets, range(len(values))) == ["INV-1", "", "", "Café", "a\x00b"]
+    assert unpack_strings(blob, offsets, [3, 0]) == ["Café", "INV-1"]
+
+
+def test_hashes_are_fnv1a_and_do_not_depend_on_neighbours():
+    # Reference 64-bit FNV-1a values
+    assert hash_strings(["", "a"]).tolist() == [0xCBF29CE484222325, 0xAF63DC4C8601EC8C]
+
+    values = ["INV123", "x", "a much longer invoice number", "INV123"]
+    hashes = hash_packed(*pack_strings(values))
+    assert hashes[0] == hashes[3] == hash_strings(["INV123"])[0]
+    assert len(set(hashes.tolist())) == 3
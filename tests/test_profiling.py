@@ -0,0 +1,51 @@
+# File: tests/test_profiling.py
+
+import pstats
+import threading
+import time
+
+import pytest
+
+from Utils.profiling import profile_job
+
+
+def _busy_worker(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(200))
+    return total
+
+
+def _allocate(n):
+    return [str(i) * 10 for i in range(n)]
+
+
+def test_profile_job_writes_all_reports(tmp_path):
+    with profile_job("demo", str(tmp_path)):
+        payload = _allocate(50_000)
+        worker = threading.Thread(target=_busy_worker, args=(0.2,), name="worker")
+        worker.start()
+        worker.join()
+
+    assert len(payload) == 50_000
+    for suffix in (".pstats", ".txt", ".alloc.txt", ".collapsed"):
+        assert (tmp_path / f"demo{suffix}").stat().st_size > 0
+
+    # pstats file is loadable and has the profiled code
+    stats = pstats.Stats(str(tmp_path / "demo.pstats"))
+    assert any(func == "_allocate" for _, _, func in stats.stats)
+
+    # collapsed stacks cover the worker thread too: "thread;frame;... count"
+    lines = (tmp_path / "demo.collapsed").read_text(encoding="utf-8").splitlines()
+    assert any(line.startswith("worker;") and "_busy_worker" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_reports_are_written_when_the_job_fails(tmp_path):
+    with pytest.raises(RuntimeError):
+        with profile_job("broken", str(tmp_path), trace_memory=False):
+            raise RuntimeError("boom")
+
+    assert (tmp_path / "broken.pstats").exists()
+    assert not (tmp_path / "broken.alloc.txt").exists()
@@ -0,0 +1,96 @@
+# File: tests/test_run_manifest.py
+
+import json
+import os
+
+from Job_Runner.sql_export_job import EXPORT_CHANGED, EXPORT_UNCHANGED, SqlExportJob
+from Utils.run_manifest import RUN_MANIFEST_NAME, new_result_digest, update_result_digest
+
+import pandas as pd
+
+
+class FakeDB:
+    """Stands in for OracleConnection: fixed count and batches."""
+
+    def __init__(self, columns, batches):
+        self.columns = columns
+        self.batches = batches
+
+    def get_row_count(self, query, params=None):
+        return sum(len(b) for b in self.batches)
+
+    def run_in_batches(self, query, batch_size=10000, params=None):
+        for rows in self.batches:
+            yield self.columns, rows
+
+
+def _make_job(tmp_path):
+    (tmp_path / "query.sql").write_text("SELECT 1 FROM dual", encoding="utf-8")
+    return SqlExportJob(
+        sql_file="query.sql",
+        output_file="vendor_master.csv",
+        label="Vendor Master",
+        flag_message="VENDOR MASTER COMPLETE",
+    )
+
+
+def test_result_digest_depends_on_values_and_order():
+    def digest_of(rows):
+        d = new_result_digest(["A", "B"])
+        update_result_digest(d, pd.DataFrame(rows, columns=["A", "B"]))
+        return d.hexdigest()
+
+    assert digest_of([("1", "x"), ("2", "y")]) == digest_of([("1", "x"), ("2", "y")])
+    assert digest_of([("1", "x"), ("2", "y")]) != digest_of([("1", "x"), ("2", "z")])
+    assert digest_of([("1", "x"), ("2", "y")]) != digest_of([("2", "y"), ("1", "x")])
+
+
+def test_unchanged_result_leaves_output_and_skips_flag(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    job = _make_job(tmp_path)
+    out = tmp_path / "Output_Files" / "vendor_master.csv"
+    done = tmp_path / "Output_Files" / "done.txt"
+
+    batches = [[("1", "A")], [("2", "B")]]
+    assert job.run(FakeDB(["VENDOR_NUM", "VENDOR_NAME_1"], batches)) == EXPORT_CHANGED
+    assert done.exists()
+    done.unlink()
+
+    mtime_before = os.path.getmtime(out)
+    os.utime(out, (mtime_before - 100, mtime_before - 100))
+    mtime_before = os.path.getmtime(out)
+
+    assert job.run(FakeDB(["VENDOR_NUM", "VENDOR_NAME_1"], batches)) == EXPORT_UNCHANGED
+    assert os.path.getmtime(out) == mtime_before
+    assert not done.exists()
+    assert not (tmp_path / "Output_Files" / "vendor_master.csv.partial").exists()
+
+    manifest = json.loads((tmp_path / "Output_Files" / RUN_MANIFEST_NAME).read_text())
+    assert manifest["vendor_master.csv"]["changed"] is False
+    assert manifest["vendor_master.csv"]["rows"] == 2
+
+
+def test_changed_result_replaces_output(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    job = _make_job(tmp_path)
+    out = tmp_path / "Output_Files" / "vendor_master.csv"
+
+    job.run(FakeDB(["VENDOR_NUM", "VENDOR_NAME_1"], [[("1", "A")]]))
+    outcome = job.run(FakeDB(["VENDOR_NUM", "VENDOR_NAME_1"], [[("1", "A")], [("3", "C")]]))
+
+    assert outcome == EXPORT_CHANGED
+    assert out.read_text().splitlines() == ["VENDOR_NUM,VENDOR_NAME_1", "1,A", "3,C"]
+    assert (tmp_path / "Output_Files" / "done.txt").exists()
+
+
+def test_output_edited_outside_the_job_is_rewritten(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    job = _make_job(tmp_path)
+    out = tmp_path / "Output_Files" / "vendor_master.csv"
+    db = FakeDB(["VENDOR_NUM", "VENDOR_NAME_1"], [[("1", "A")]])
+
+    job.run(db)
+    out.write_text("VENDOR_NUM\n")
+
+    assert job.run(db) == EXPORT_CHANGED
+    assert out.read_text().splitlines() == ["VENDOR_NUM,VENDOR_NAME_1", "1,A"]
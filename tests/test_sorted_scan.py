@@ -0,0 +1,89 @@
+# File: tests/test_sorted_scan.py
+
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from Job_Runner.transaction_master_runner import TransactionMasterJob
+from Utils.originals_capture_csv import (
+    entry_date_cutoff,
+    filter_recent_by_entry_date,
+    load_recent_transaction_master,
+)
+from Utils.run_manifest import get_export_entry
+from Utils.sorted_scan import is_sorted_desc_by, read_recent_rows
+from Utils.synthetic_data import generate_transaction_master
+
+SQL_DIR = Path(__file__).resolve().parents[1] / "SQL"
+
+
+class TMDB:
+    """Stands in for OracleConnection, returning a synthetic TM in query order."""
+
+    def __init__(self, tm):
+        self.tm = tm
+
+    def get_row_count(self, query, params=None):
+        return len(self.tm)
+
+    def run_in_batches(self, query, batch_size=10000, params=None):
+        columns = list(self.tm.columns)
+        rows = list(self.tm.itertuples(index=False, name=None))
+        for start in range(0, len(rows), batch_size):
+            yield columns, rows[start:start + batch_size]
+
+
+def _recent(df, days):
+    return df[pd.to_datetime(df["ENTRY_DATE"]) >= entry_date_cutoff(days)].reset_index(drop=True)
+
+
+def _export_tm(tmp_path, monkeypatch, n_rows=20_000):
+    monkeypatch.chdir(tmp_path)
+    shutil.copytree(SQL_DIR, tmp_path / "SQL")
+    tm = generate_transaction_master(n_rows, seed=9)
+    TransactionMasterJob().run(TMDB(tm))
+    return os.path.join("Output_Files", "transaction_master.csv")
+
+
+def test_export_records_sort_order_and_scan_stops_early(tmp_path, monkeypatch, capsys):
+    path = _export_tm(tmp_path, monkeypatch)
+    assert get_export_entry(path)["order_by"] == [["ENTRY_DATE", "DESC"], ["POSTING_DATE", "DESC"]]
+    assert is_sorted_desc_by(path, "ENTRY_DATE")
+
+    cutoff = entry_date_cutoff(30)
+    recent = read_recent_rows(path, "ENTRY_DATE", cutoff, chunk_rows=1_000)
+
+    pd.testing.assert_frame_equal(recent, _recent(pd.read_csv(path, dtype=str), 30))
+    assert "stopped early" in capsys.readouterr().out
+
+
+def test_changed_file_falls_back_to_full_scan(tmp_path, monkeypatch):
+    path = _export_tm(tmp_path, monkeypatch, n_rows=2_000)
+
+    # Rewritten outside the export: same manifest entry, different file
+    df = pd.read_csv(path, dtype=str)
+    df.iloc[::-1].to_csv(path, index=False)
+
+    assert not is_sorted_desc_by(path, "ENTRY_DATE")
+    assert read_recent_rows(path, "ENTRY_DATE", entry_date_cutoff(30)) is None
+
+    # The capture loader still returns every row for the full filter
+    loaded = load_recent_transaction_master(path, days_back=30)
+    assert len(loaded) == 2_000
+    assert len(filter_recent_by_entry_date(loaded, days=30)) == len(_recent(df, 30))
+
+
+def test_out_of_order_data_abandons_the_scan(tmp_path, monkeypatch):
+    path = _export_tm(tmp_path, monkeypatch, n_rows=2_000)
+    entry = get_export_entry(path)
+
+    # Same size and mtime as recorded, but rows swapped mid-file
+    lines = Path(path).read_text(encoding="utf-8").splitlines(keepends=True)
+    lines[1], lines[1500] = lines[1500], lines[1]
+    Path(path).write_text("".join(lines), encoding="utf-8")
+    os.utime(path, (entry["mtime"], entry["mtime"]))
+
+    assert is_sorted_desc_by(path, "ENTRY_DATE")
+    assert read_recent_rows(path, "ENTRY_DATE", entry_date_cutoff(30), chunk_rows=500) is None
@@ -0,0 +1,47 @@
+# File: tests/test_sql_loader.py
+
+from pathlib import Path
+
+import pytest
+
+from Utils.sql_loader import load_sql, parse_sql
+
+SQL_DIR = Path(__file__).resolve().parents[1] / "SQL"
+
+
+def test_parse_sql_strips_declarations_and_keeps_defaults():
+    query, declared = parse_sql(
+        "-- :start_date = 2023-07-01\n"
+        "-- :cutoff_date\n"
+        "-- a normal comment stays\n"
+        "SELECT * FROM t WHERE d >= TO_DATE(:start_date, 'YYYY-MM-DD')\n"
+    )
+
+    assert declared == {"start_date": "2023-07-01", "cutoff_date": None}
+    assert query.startswith("-- a normal comment stays\nSELECT")
+    assert ":start_date" in query
+
+
+def test_load_sql_applies_overrides_and_validates(tmp_path):
+    path = tmp_path / "q.sql"
+    path.write_text("-- :start_date = 2023-07-01\nSELECT :start_date FROM dual\n", encoding="utf-8")
+
+    assert load_sql(str(path))[1] == {"start_date": "2023-07-01"}
+    assert load_sql(str(path), {"start_date": "2024-01-01"})[1] == {"start_date": "2024-01-01"}
+
+    with pytest.raises(ValueError):
+        load_sql(str(path), {"end_date": "2024-01-01"})
+
+
+def test_load_sql_requires_values_without_defaults():
+    with pytest.raises(ValueError):
+        load_sql(str(SQL_DIR / "originals_window.sql"))
+
+
+def test_repo_sql_files_have_no_date_literals():
+    """Dates travel as binds so the statement text is stable across runs."""
+    for name in ("transaction_master.sql", "layout_master.sql"):
+        query, params = load_sql(str(SQL_DIR / name))
+        assert query.upper().startswith("SELECT")
+        assert "2023-07-01" not in query
+        assert params == {"start_date": "2023-07-01"}
@@ -1,6 +1,8 @@
 import re
 from pathlib import Path
 
+from Utils.sql_loader import load_sql
+
 TARGETS = [
     "layout_master.sql",
     "transaction_master.sql",
@@ -34,12 +36,13 @@ def test_each_sql_compiles_and_returns_one_row(db, sql_dir):
         # Repo may not have all scripts yet
         return
     for path in files:
-        sql = path.read_text(encoding="utf-8")
+        # Declared bind parameters are stripped and bound with their defaults
+        sql, params = load_sql(str(path))
         assert _is_select(sql), f"{path.name} must start with WITH or SELECT"
         smoke_sql = _limit1(sql)
         # Use a direct curosr to avoid fetching all rows via run_query
         cur = db.conn.cursor()
-        cur.execute(smoke_sql)
+        cur.execute(smoke_sql, params)
         row = cur.fetchone()
         cur.close()
         assert row is not None, f"No rows for {path.name}"
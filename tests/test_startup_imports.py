@@ -0,0 +1,48 @@
+# File: tests/test_startup_imports.py
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+RUNNERS = [
+    "Job_Runner.orchestration_runner",
+    "Job_Runner.async_orchestration_runner",
+    "Job_Runner.originals_capture_runner",
+    "Job_Runner.changed_data_runner",
+    "Job_Runner.duplicate_invoice_runner",
+    "Job_Runner.change_history_runner",
+    "Job_Runner.vendor_master_runner",
+    "Job_Runner.transaction_master_runner",
+    "Job_Runner.layout_master_runner",
+]
+
+
+def _loaded_after_import(module):
+    probe = (
+        f"import {module}, sys; "
+        "print(' '.join(m for m in ('pandas', 'numpy', 'oracledb', 'dotenv') if m in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return completed.stdout.split(), completed.stdout
+
+
+def test_runners_import_without_heavy_dependencies_or_output():
+    """Importing a runner must not load pandas/oracledb/.env or print anything."""
+    for module in RUNNERS:
+        loaded, stdout = _loaded_after_import(module)
+        assert loaded == [], f"{module} imported {loaded} at import time"
+        assert stdout.strip() == "", f"{module} printed at import: {stdout!r}"
+
+
+def test_db_config_resolves_on_first_use():
+    from Config import db_config
+
+    db_config.get_db_config.cache_clear()
+    config = db_config.DB_CONFIG
+
+    assert set(config) == {"hostname", "port", "service_name", "user", "password"}
+    assert db_config.get_db_config() is db_config.get_db_config()
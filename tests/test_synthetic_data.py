@@ -0,0 +1,80 @@
+# File: tests/test_synthetic_data.py
+
+import pandas as pd
+
+from Utils.changed_data_csv import ALLOWED_TERMINAL_STATUSES, run_changed_data_capture
+from Utils.originals_capture_csv import ORIGINALS_COLUMNS, normalize_doc_id, run_originals_capture
+from Utils.synthetic_data import (
+    generate_originals,
+    generate_transaction_master,
+    write_synthetic_dataset,
+)
+
+
+def test_generate_transaction_master_shape_and_ids():
+    """
+    Generated TM should have unique raw DOC_IDs (the Changed Data loader
+    requires this), some leading-zero IDs and some duplicate normalised keys.
+    """
+    tm = generate_transaction_master(5_000, seed=1, duplicate_rate=0.01, leading_zero_rate=0.5)
+
+    assert len(tm) == 5_000
+    assert set(ORIGINALS_COLUMNS).issubset(tm.columns)
+    assert tm["DOC_ID"].is_unique
+
+    keys = tm["DOC_ID"].map(normalize_doc_id)
+    assert keys.duplicated().sum() == 50
+    assert tm["DOC_ID"].str.startswith("0").any()
+
+
+def test_generate_transaction_master_is_sorted_and_deterministic():
+    tm1 = generate_transaction_master(2_000, seed=7)
+    tm2 = generate_transaction_master(2_000, seed=7)
+
+    pd.testing.assert_frame_equal(tm1, tm2)
+    # ENTRY_DATE DESC, like SQL/transaction_master.sql
+    assert tm1["ENTRY_DATE"].is_monotonic_decreasing
+
+
+def test_terminal_status_mix_follows_rate():
+    tm = generate_transaction_master(10_000, seed=3, terminal_rate=0.6)
+    terminal_share = tm["STATUS_TEXT"].str.upper().isin(ALLOWED_TERMINAL_STATUSES).mean()
+    assert 0.55 < terminal_share < 0.65
+
+
+def test_generate_originals_applies_churn():
+    tm = generate_transaction_master(5_000, seed=2)
+    originals = generate_originals(tm, seed=2, churn_rate=0.1)
+
+    merged = originals.merge(tm, on="DOC_ID", suffixes=("_ORIG", "_CURR"))
+    changed = (
+        merged["AMOUNT_ORIG"].fillna("") != merged["AMOUNT_CURR"].fillna("")
+    ) | (merged["STATUS_TEXT_ORIG"] != merged["STATUS_TEXT_CURR"])
+
+    assert list(originals.columns) == ORIGINALS_COLUMNS
+    assert len(originals) < len(tm)
+    assert changed.any()
+
+
+def test_synthetic_dataset_runs_through_both_capture_jobs(tmp_path):
+    paths = write_synthetic_dataset(str(tmp_path), 3_000, seed=5, churn_rate=0.05)
+
+    originals_before = len(pd.read_csv(paths["originals"], dtype=str))
+    written = run_originals_capture(paths["transaction_master"], paths["originals"], days_back=30)
+    assert written > 0
+    assert len(pd.read_csv(paths["originals"], dtype=str)) == originals_before + written
+
+    changed_written = run_changed_data_capture(
+        paths["transaction_master"], paths["originals"], paths["changed"]
+    )
+    assert changed_written > 0
+
+
+def test_originals_window_follows_the_given_today():
+    today = pd.Timestamp("2021-03-10")
+    tm = generate_transaction_master(2_000, seed=4, today=today)
+    originals = generate_originals(tm, seed=4, uncaptured_days=2, today=today)
+
+    # Everything entered before 2021-03-08 is captured, nothing after
+    assert len(originals) == (tm["ENTRY_DATE"] < "2021-03-08").sum() > 0
+    assert originals["DOC_ID"].isin(tm.loc[tm["ENTRY_DATE"] < "2021-03-08", "DOC_ID"]).all()
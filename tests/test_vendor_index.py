@@ -0,0 +1,104 @@
+# File: tests/test_vendor_index.py
+
+import os
+import shutil
+
+import pandas as pd
+
+from Utils.changed_data_csv import run_changed_data_capture
+from Utils.synthetic_data import write_synthetic_dataset
+from Utils.vendor_index import VendorNameIndex, ensure_vendor_index, index_path_for, normalize_names
+
+VENDORS = pd.DataFrame(
+    {
+        "VENDOR_NUM": ["3000001", "3000002", "3000002", "3000003", "3000004"],
+        "VENDOR_NAME_1": [
+            "Acme Medical Supplies Pty Ltd",
+            "Brisbane Linen Services",
+            "Brisbane Linen Services",  # second company code
+            "Pacific Foods P/L",
+            "Café Olé Pty Ltd",
+        ],
+    }
+)
+
+
+def test_normalize_names():
+    names = normalize_names(pd.Series(["  Café-Olé  p/l ", None]))
+    assert names.tolist() == ["CAFE OLE P L", ""]
+
+
+def test_top_k_ranks_the_closest_vendor_first():
+    index = VendorNameIndex.build(VENDORS)
+    assert len(index) == 4
+
+    result = index.top_k(["ACME MEDICL SUPPLIES", "brisbane linen", "zzzz", None], k=2)
+
+    best = result[result["RANK"] == 1].set_index("QUERY")
+    assert best.loc[0, "VENDOR_NUM"] == "3000001"
+    assert best.loc[1, "VENDOR_NUM"] == "3000002"
+    assert set(best.index) == {0, 1}
+    assert result.groupby("QUERY").size().max() <= 2
+    assert result["SCORE"].between(0, 1).all()
+
+
+def test_stop_trigrams_do_not_create_matches():
+    vendors = pd.DataFrame(
+        {"VENDOR_NUM": [str(i) for i in range(10)], "VENDOR_NAME_1": [f"V{i} PTY LTD" for i in range(10)]}
+    )
+    index = VendorNameIndex.build(vendors, stop_fraction=0.5, stop_min_vendors=1)
+
+    assert index.top_k(["XYZ PTY LTD"]).empty
+    assert index.best_matches(["V3 PTY LTD"])["VENDOR_MATCH_NUM"].tolist() == ["3"]
+
+
+def test_index_is_saved_and_rebuilt_when_vendor_master_changes(tmp_path):
+    vendor_csv = tmp_path / "vendor_master.csv"
+    VENDORS.to_csv(vendor_csv, index=False)
+
+    built = ensure_vendor_index(str(vendor_csv))
+    path = index_path_for(str(vendor_csv))
+    assert os.path.exists(path)
+    saved_at = os.path.getmtime(path)
+
+    loaded = ensure_vendor_index(str(vendor_csv))
+    assert os.path.getmtime(path) == saved_at
+    assert loaded.top_k(["Pacific Foods"]).equals(built.top_k(["Pacific Foods"]))
+
+    pd.concat([VENDORS, pd.DataFrame({"VENDOR_NUM": ["3000009"], "VENDOR_NAME_1": ["Northern Tech"]})]).to_csv(
+        vendor_csv, index=False
+    )
+    rebuilt = ensure_vendor_index(str(vendor_csv))
+    assert len(rebuilt) == 5
+
+
+def test_changed_data_rows_get_vendor_match_columns(tmp_path):
+    paths = write_synthetic_dataset(str(tmp_path / "data"), 3_000, seed=8, churn_rate=0.1)
+    tm = pd.read_csv(paths["transaction_master"], dtype=str)
+    vendor_csv = tmp_path / "vendor_master.csv"
+    tm[["VENDOR_NUM", "VENDOR_NAME_1"]].drop_duplicates().to_csv(vendor_csv, index=False)
+
+    plain = tmp_path / "plain.csv"
+    shutil.copy(paths["changed"], plain)
+    rows = run_changed_data_capture(paths["transaction_master"], paths["originals"], str(plain))
+
+    enriched = tmp_path / "enriched.csv"
+    shutil.copy(paths["changed"], enriched)
+    run_changed_data_capture(
+        paths["transaction_master"],
+        paths["originals"],
+        str(enriched),
+        vendor_master_csv=str(vendor_csv),
+        upgrade_schema=True,
+    )
+
+    before = pd.read_csv(plain, dtype=str)
+    after = pd.read_csv(enriched, dtype=str)
+    assert rows > 0
+    assert list(after.columns[-3:]) == ["VENDOR_MATCH_NUM", "VENDOR_MATCH_NAME", "VENDOR_MATCH_SCORE"]
+    pd.testing.assert_frame_equal(after[before.columns], before)
+
+    # Rows written before the upgrade have no match; new rows mostly match their own vendor
+    new_rows = after.tail(rows)
+    assert after["VENDOR_MATCH_NUM"].head(len(after) - rows).isna().all()
+    assert (new_rows["VENDOR_MATCH_NUM"] == new_rows["LIFNR"]).mean() > 0.8